@@ -19,7 +19,8 @@ from app.schemas.user import (
 )
 from app.models.auth import User
 from app.core.config import settings
-from app.schemas.token import TokenResponse
+from app.schemas.token import TokenResponse, LogoutRequest
+from app.schemas.metrics import PasswordHashingMetrics
 from app.services.auth import (
     create_user,
     authenticate_user,
@@ -29,7 +30,9 @@ from app.services.auth import (
     validate_refresh_token,
     hashing_password,
     get_current_user,
+    logout_user,
 )
+from app.services.password_hasher import password_hasher
 from shared.utils.logging import setup_logging
 import shared.utils.rabbitmq as rabbitmq
 from shared.utils import constants as rb_const
@@ -42,7 +45,7 @@ logger = setup_logging()
 async def register_user(user: UserCreate = Body(...), db: AsyncSession = Depends(get_auth_db)):
     """Register a new user and send a verification email."""
     db_user = await create_user(db, user.email, user.password, user.username)
-    token = await create_email_verify_token(db, db_user)
+    token = await create_email_verify_token(db_user)
     await rabbitmq.publish_event(
         rb_const.RABBITMQ_QUEUE_EMAIL_EVENTS,
         rb_const.EVENT_EMAIL_SEND,
@@ -83,7 +86,7 @@ async def login(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token, refresh_auth_token = await create_token_pair(db, user)
+    access_token, refresh_auth_token = await create_token_pair(user)
     logger.info("User logged in", user_id=user.id, email=user.email, username=user.username)
     return TokenResponse(access_token=access_token, refresh_token=refresh_auth_token)
 
@@ -98,6 +101,15 @@ async def refresh_token(
     return TokenResponse(access_token=new_access_token, refresh_token=new_refresh_token)
 
 
+@router.post("/logout", response_model=MessageResponse, status_code=status.HTTP_200_OK)
+async def logout(
+        tokens: LogoutRequest = Body(...),
+        token: str = Header(..., alias="Authorization")):
+    """Revoke the access token and the refresh token issued with it"""
+    await logout_user(token.split(' ')[1], tokens.refresh_token)
+    return MessageResponse(message="You have been logged out")
+
+
 @router.get("/users", response_model=list[UserResponse])
 async def get_auth_users(
         token: str = Header(..., alias="Authorization"),
@@ -112,11 +124,23 @@ async def get_auth_users(
     return all_auth_users
 
 
+@router.get("/metrics/password-hashing", response_model=PasswordHashingMetrics)
+async def get_password_hashing_metrics(
+        token: str = Header(..., alias="Authorization"),
+        db: AsyncSession = Depends(get_auth_db)):
+    """Bcrypt pool load: queue depth now and at peak, average wait for a worker"""
+    user = await get_current_user(token.split(' ')[1], db)
+    if not user.is_superadmin:
+        logger.error("User is not superadmin")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return password_hasher.stats()
+
+
 @router.post("/restore-request", response_model=MessageResponse, status_code=status.HTTP_200_OK)
 async def restore_request(email: RestoreRequest = Body(...), db: AsyncSession = Depends(get_auth_db)):
     db_user = await db.scalar(select(User).where(User.email == email.email))
     if db_user:
-        token = await create_email_verify_token(db, db_user)
+        token = await create_email_verify_token(db_user)
         await rabbitmq.publish_event(
             rb_const.RABBITMQ_QUEUE_EMAIL_EVENTS,
             rb_const.EVENT_EMAIL_SEND,
@@ -3,6 +3,7 @@ from sqlalchemy import select
 from app.models.auth import User
 from app.db.database import async_session
 from app.services.auth import create_user, create_email_verify_token, publish_event
+from app.services import token_audit
 from shared.utils import constants as rb_const
 from app.core.config import settings
 import asyncio
@@ -41,7 +42,7 @@ async def async_create_superuser(email: str, password: str, username: str, user_
             await db.commit()
             await db.refresh(db_user)
 
-            token = await create_email_verify_token(db, db_user)
+            token = await create_email_verify_token(db_user)
 
             await publish_event(
                 rb_const.RABBITMQ_QUEUE_EMAIL_EVENTS,
@@ -69,6 +70,8 @@ async def async_create_superuser(email: str, password: str, username: str, user_
             raise
         finally:
             await db.close()
+            # asyncio.run would cancel the audit write of the verify token
+            await token_audit.drain()
 
 
 @app.command()
@@ -7,10 +7,28 @@ class Settings(BaseSettings):
     refresh_token_secret_key: str
     email_verify_secret_key: str
     algorithm: str
-    access_token_expire_hours: int = 24
+    access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
     email_verify_expire_hours: int = 1
 
+    # REDIS (token state by jti)
+    redis_scheme: str
+    redis_host: str
+    redis_port: int
+    redis_db_index: int
+
+    # TOKEN AUDIT (active_tokens/blacklisted_tokens rows, also read by clean_expired_tokens
+    # to drop unverified users, so leave enabled unless that cleanup is not needed)
+    token_audit_enabled: bool = True
+
+    # ACCESS TOKEN REVOCATION (revoked jtis reach other replicas within rebuild + refresh seconds)
+    revocation_filter_rebuild_seconds: float = 30
+    revocation_filter_refresh_seconds: float = 5
+
+    # PASSWORD HASHING (bcrypt thread pool, logins beyond workers + max_queue get 503)
+    password_hash_workers: int = 4
+    password_hash_max_queue: int = 64
+
     # DB
     mysql_user: str
     mysql_password: str
@@ -22,6 +40,13 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(case_sensitive=False)
 
+    @property
+    def redis_url(self) -> str:
+        return (
+            f"{self.redis_scheme}://{self.redis_host}"
+            f":{self.redis_port}/{self.redis_db_index}"
+        )
+
     @property
     def auth_db_url(self) -> str:
         return (
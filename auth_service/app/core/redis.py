@@ -0,0 +1,4 @@
+import redis.asyncio as redis
+from app.core.config import settings
+
+redis_client = redis.from_url(settings.redis_url, decode_responses=True)
@@ -4,6 +4,11 @@ from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy import text
 from app.api.auth import router as auth_router
 from app.core.config import settings
+from app.services import token_audit
+from app.services.password_hasher import password_hasher
+from app.services.token_store import revocation_filter
+from app.core.redis import redis_client
+from shared.utils.revocation import run_filter_builder
 from shared.utils.logging import setup_logging
 import asyncio
 import os
@@ -39,9 +44,18 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("Migration failed")
     logger.info("Alembic migrations applied.")
 
+    filter_builder = asyncio.create_task(run_filter_builder(
+        redis_client, settings.revocation_filter_rebuild_seconds, logger
+    ))
+    filter_refresher = asyncio.create_task(revocation_filter.run(settings.revocation_filter_refresh_seconds, logger))
+
     yield
 
+    filter_builder.cancel()
+    filter_refresher.cancel()
     logger.info("Auth Service is shutting down...")
+    await token_audit.drain()
+    password_hasher.shutdown()
 
 app = FastAPI(
     title="Auth Service",
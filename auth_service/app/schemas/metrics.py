@@ -0,0 +1,13 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class PasswordHashingMetrics(BaseModel):
+    workers: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    calls: int
+    rejected: int
+    avg_wait_ms: float
+
+    model_config = ConfigDict(from_attributes=True)
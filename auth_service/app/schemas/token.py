@@ -6,3 +6,7 @@ class TokenResponse(BaseModel):
     refresh_token: str
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str
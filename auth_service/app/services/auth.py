@@ -1,22 +1,29 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status, Depends
 from jose import jwt, JWTError
 from jose.exceptions import ExpiredSignatureError
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.config import settings
 from app.db.database import get_auth_db
-from app.models.auth import User, ActiveToken, BlacklistedToken, TokenType
+from app.models.auth import User, TokenType
+from app.services.password_hasher import password_hasher, pwd_context
+from app.services.token_audit import record_issued, record_revoked, write_revoked
+from app.services.token_store import token_store, revocation_filter
 from shared.utils import publish_event, setup_logging, constants as rb_const
 
 logger = setup_logging()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+TOKEN_SECRETS = {
+    TokenType.AUTH_ACCESS: settings.access_token_secret_key,
+    TokenType.AUTH_REFRESH: settings.refresh_token_secret_key,
+    TokenType.EMAIL_VERIFY: settings.email_verify_secret_key,
+}
 
 
 async def hashing_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
 
 
 async def create_user(db: AsyncSession, email: str, password: str, username: str) -> User:
@@ -38,7 +45,7 @@ async def create_user(db: AsyncSession, email: str, password: str, username: str
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> User | None:
     """Verify data for login"""
     user = await db.scalar(select(User).where(User.email == email))
-    if not user or not pwd_context.verify(password, user.password_hash) or not user.is_active:
+    if not user or not await password_hasher.verify(password, user.password_hash) or not user.is_active:
         return None
     return user
 
@@ -49,19 +56,13 @@ async def get_user_by_id(db: AsyncSession, user_id: int) -> User | None:
     return user
 
 
-async def decode_token(token: str, secret_key: str, algorithm: str) -> int:
+async def decode_claims(token: str, secret_key: str, algorithm: str) -> dict:
     """Decoding the token"""
     try:
         payload = jwt.decode(token, secret_key, algorithms=algorithm)
         if payload.get('sub') is None:
             logger.error(f"Invalid token: {token}")
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="You need to be logged")
-        user_id: int = int(payload.get("sub"))
-        if not user_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User ID not found."
-            )
     except ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired.")
     except JWTError as e:
@@ -70,45 +71,49 @@ async def decode_token(token: str, secret_key: str, algorithm: str) -> int:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"You need to be logged."
         )
+    return payload
+
+
+async def decode_token(token: str, secret_key: str, algorithm: str) -> int:
+    """Decoding the token, return user id"""
+    payload = await decode_claims(token, secret_key, algorithm)
+    user_id: int = int(payload.get("sub"))
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User ID not found."
+        )
     return user_id
 
 
-async def create_tokens(token_type: TokenType, expire_at: int, email: str, pk: int, db: AsyncSession) -> str:
+async def create_tokens(token_type: TokenType, expire_at: int, email: str, pk: int) -> str:
     """Generate a new token"""
     if token_type == TokenType.AUTH_ACCESS:
-        expire = datetime.now(timezone.utc) + timedelta(hours=expire_at)
-        secret = settings.access_token_secret_key
-        token_type = TokenType.AUTH_ACCESS
+        expire = datetime.now(timezone.utc) + timedelta(minutes=expire_at)
     elif token_type == TokenType.AUTH_REFRESH:
         expire = datetime.now(timezone.utc) + timedelta(days=expire_at)
-        secret = settings.refresh_token_secret_key
-        token_type = TokenType.AUTH_REFRESH
     elif token_type == TokenType.EMAIL_VERIFY:
         expire = datetime.now(timezone.utc) + timedelta(hours=expire_at)
-        secret = settings.email_verify_secret_key
-        token_type = TokenType.EMAIL_VERIFY
     else:
         logger.error(f"Invalid token type: {token_type}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail='Something went wrong.'
         )
 
+    jti = uuid.uuid4().hex
     to_encode = {
         "sub": str(pk),
         "email": email,
+        "jti": jti,
         "time": str(datetime.now(timezone.utc)),
         "exp": expire
     }
-    token = jwt.encode(to_encode, secret, algorithm=settings.algorithm)
+    token = jwt.encode(to_encode, TOKEN_SECRETS[token_type], algorithm=settings.algorithm)
 
-    db_token = ActiveToken(
-        token=token,
-        user_id=pk,
-        token_type=token_type,
-        expires_at=expire,
-    )
-    db.add(db_token)
-    await db.commit()
+    # Access tokens are short-lived and stateless, nothing is stored for them
+    if token_type != TokenType.AUTH_ACCESS:
+        await token_store.issue(jti, token_type, pk, expire)
+        record_issued(token, token_type, pk, expire)
     return token
 
 
@@ -121,13 +126,7 @@ async def get_current_user(
         detail="Could not validate credentials",
     )
 
-    await token_checker(db, token, credentials_exception, TokenType.AUTH_ACCESS)
-
-    user_id = await decode_token(
-        token,
-        settings.access_token_secret_key,
-        settings.algorithm
-    )
+    user_id = await token_checker(token, credentials_exception, TokenType.AUTH_ACCESS)
 
     user = await get_user_by_id(db, user_id)
 
@@ -137,70 +136,76 @@ async def get_current_user(
     return user
 
 
-async def create_token_pair(db: AsyncSession, user: User) -> tuple[str, str]:
+async def create_token_pair(user: User) -> tuple[str, str]:
     """Create a new token pair"""
     access_token = await create_tokens(
         TokenType.AUTH_ACCESS,
-        settings.access_token_expire_hours,
+        settings.access_token_expire_minutes,
         user.email,
         user.id,
-        db,
     )
     refresh_token = await create_tokens(
         TokenType.AUTH_REFRESH,
         settings.refresh_token_expire_days,
         user.email,
         user.id,
-        db,
     )
 
     return access_token, refresh_token
 
 
-async def create_email_verify_token(db: AsyncSession, user: User) -> str:
+async def create_email_verify_token(user: User) -> str:
     """Create an email verification token."""
     return await create_tokens(
         TokenType.EMAIL_VERIFY,
         settings.email_verify_expire_hours,
         user.email,
         user.id,
-        db
     )
 
 
-async def token_to_blacklist(db: AsyncSession, token: ActiveToken) -> None:
-    blacklisted = BlacklistedToken(
-        token=token.token,
-    )
-    db.add(blacklisted)
-    await db.commit()
+async def token_checker(token: str, credentials, token_type: TokenType, consume: bool = False) -> int:
+    """Verify the signature locally, return user id.
+    Access tokens are then only looked up in the in-process revocation filter, other types
+    cost one Redis call; with consume that call also revokes them, for one-time tokens."""
+    payload = await decode_claims(token, TOKEN_SECRETS[token_type], settings.algorithm)
+    jti = payload.get("jti")
+    if not jti:
+        raise credentials
 
+    if token_type == TokenType.AUTH_ACCESS:
+        if await revocation_filter.is_revoked(jti):
+            raise credentials
+        return int(payload["sub"])
 
-async def token_checker(db: AsyncSession, token:str, credentials, token_type: TokenType) -> ActiveToken | None:
-    blacklisted_token = await db.scalar(select(BlacklistedToken).where(BlacklistedToken.token == token))
+    if consume:
+        user_id = await token_store.consume(jti, token_type)
+    else:
+        user_id = await token_store.check(jti, token_type)
 
-    if blacklisted_token:
+    if user_id is None or str(user_id) != payload["sub"]:
         raise credentials
 
-    db_token = await db.scalar(select(ActiveToken).where(
-        ActiveToken.token == token,
-        ActiveToken.token_type == token_type
-    ))
+    return user_id
 
-    if not db_token:
-        raise credentials
 
-    expires_at = db_token.expires_at
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
+async def revoke_access_token(token: str) -> None:
+    """Reject this access token everywhere until it expires"""
+    payload = await decode_claims(token, settings.access_token_secret_key, settings.algorithm)
+    if payload.get("jti"):
+        await revocation_filter.revoke(payload["jti"], payload["exp"])
 
-    if expires_at < datetime.now(timezone.utc):
-        await token_to_blacklist(db, db_token)
-        await db.delete(db_token)
-        await db.commit()
-        raise credentials
 
-    return db_token
+async def logout_user(access_token: str, refresh_token: str) -> None:
+    """Revoke the access token and spend the refresh token, so neither outlives the session"""
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Something wrong. Try again or relogin.",
+    )
+
+    await revoke_access_token(access_token)
+    await token_checker(refresh_token, credentials_exception, TokenType.AUTH_REFRESH, consume=True)
+    record_revoked(refresh_token)
 
 
 async def verify_email(db: AsyncSession, token: str, task: str | None = None) -> User:
@@ -210,15 +215,14 @@ async def verify_email(db: AsyncSession, token: str, task: str | None = None) ->
         detail="You need register again.",
     )
 
-    db_token = await token_checker(db, token, credentials_exception, TokenType.EMAIL_VERIFY)
-    user_id = await decode_token(db_token.token, settings.email_verify_secret_key, settings.algorithm)
+    user_id = await token_checker(token, credentials_exception, TokenType.EMAIL_VERIFY, consume=True)
     user: User | None = await db.scalar(select(User).where(User.id == user_id))
 
     if not user:
         raise credentials_exception
     user.is_active = True
-    await token_to_blacklist(db, db_token)
-    await db.delete(db_token)
+    # Committed with the activation: clean_expired_tokens deletes accounts whose verify row expires
+    await write_revoked(db, token)
     await db.commit()
     await db.refresh(user)
 
@@ -239,15 +243,12 @@ async def validate_refresh_token(db: AsyncSession, refresh_token: str) -> tuple[
         detail="Something wrong. Try again or relogin.",
     )
 
-    db_token = await token_checker(db, refresh_token, credentials_exception, TokenType.AUTH_REFRESH)
-    user_id = await decode_token(db_token.token, settings.refresh_token_secret_key, settings.algorithm)
+    user_id = await token_checker(refresh_token, credentials_exception, TokenType.AUTH_REFRESH, consume=True)
     user: User | None = await get_user_by_id(db, user_id)
 
     if user is None:
         raise credentials_exception
-    await token_to_blacklist(db, db_token)
-    await db.delete(db_token)
+    record_revoked(refresh_token)
 
-    new_access_token, new_refresh_token = await create_token_pair(db, user)
-    await db.commit()
+    new_access_token, new_refresh_token = await create_token_pair(user)
     return user, new_access_token, new_refresh_token
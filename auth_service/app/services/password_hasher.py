@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from app.core.config import settings
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+@dataclass(frozen=True)
+class HasherStats:
+    workers: int
+    in_flight: int
+    queue_depth: int
+    max_queue_depth: int
+    calls: int
+    rejected: int
+    avg_wait_ms: float
+
+
+class PasswordHasher:
+    """bcrypt on a dedicated thread pool, so a login never blocks the event loop.
+    bcrypt releases the GIL, so workers hash in parallel with request handling."""
+
+    def __init__(
+            self,
+            workers: int = settings.password_hash_workers,
+            max_queue: int = settings.password_hash_max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        # Counters are only touched on the event loop thread
+        self._in_flight = 0
+        self._max_queue_depth = 0
+        self._calls = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Hashing pool, started on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls submitted but not picked up by a worker yet"""
+        return max(0, self._in_flight - self.workers)
+
+    def stats(self) -> HasherStats:
+        return HasherStats(
+            workers=self.workers,
+            in_flight=self._in_flight,
+            queue_depth=self.queue_depth,
+            max_queue_depth=self._max_queue_depth,
+            calls=self._calls,
+            rejected=self._rejected,
+            avg_wait_ms=self._wait_seconds / self._calls * 1000 if self._calls else 0.0,
+        )
+
+    async def _run(self, func, *args):
+        if self.queue_depth >= self.max_queue:
+            self._rejected += 1
+            logger.error(f"Password hashing queue is full ({self.queue_depth} waiting)")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many requests, try again later")
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            return started - submitted, func(*args)
+
+        self._in_flight += 1
+        self._max_queue_depth = max(self._max_queue_depth, self.queue_depth)
+        try:
+            wait, result = await asyncio.get_running_loop().run_in_executor(self.executor, timed)
+        finally:
+            self._in_flight -= 1
+        self._calls += 1
+        self._wait_seconds += wait
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(pwd_context.verify, password, password_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
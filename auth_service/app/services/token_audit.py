@@ -0,0 +1,58 @@
+import asyncio
+from datetime import datetime
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.db.database import async_session
+from app.models.auth import ActiveToken, BlacklistedToken, TokenType
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+# Strong references, the event loop only keeps weak ones to running tasks
+_pending: set[asyncio.Task] = set()
+
+
+async def _write_issued(db: AsyncSession, token: str, token_type: TokenType, user_id: int, expires_at: datetime) -> None:
+    db.add(ActiveToken(token=token, user_id=user_id, token_type=token_type, expires_at=expires_at))
+
+
+async def write_revoked(db: AsyncSession, token: str) -> None:
+    """Move the token to blacklisted_tokens inside the caller's transaction,
+    for revokes whose loss would change data rather than just the audit trail"""
+    db.add(BlacklistedToken(token=token))
+    await db.execute(delete(ActiveToken).where(ActiveToken.token == token))
+
+
+async def _run(write, *args) -> None:
+    try:
+        async with async_session() as db:
+            await write(db, *args)
+            await db.commit()
+    except Exception as e:
+        # Token state lives in Redis, a lost audit row never affects validation
+        logger.error(f"Error writing token audit: {str(e)}")
+
+
+def _schedule(write, *args) -> None:
+    if not settings.token_audit_enabled:
+        return
+    task = asyncio.create_task(_run(write, *args))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def record_issued(token: str, token_type: TokenType, user_id: int, expires_at: datetime) -> None:
+    """Write the active_tokens row in the background"""
+    _schedule(_write_issued, token, token_type, user_id, expires_at)
+
+
+def record_revoked(token: str) -> None:
+    """Move the token to blacklisted_tokens in the background"""
+    _schedule(write_revoked, token)
+
+
+async def drain() -> None:
+    """Wait for audit writes still in flight, called on shutdown"""
+    if _pending:
+        await asyncio.gather(*_pending, return_exceptions=True)
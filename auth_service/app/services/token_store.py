@@ -0,0 +1,58 @@
+import math
+from functools import cached_property
+from datetime import datetime, timezone
+from redis.asyncio import Redis
+from app.core.redis import redis_client
+from app.models.auth import TokenType
+from shared.utils.revocation import RevocationFilter
+
+TOKEN_KEY = "token:{}"
+ACTIVE = "active"
+REVOKED = "revoked"
+
+# Check and revoke in one step, so a refresh or verify token is accepted exactly once.
+# HSET on the existing hash keeps its TTL, the revoked marker expires with the token.
+CONSUME_SCRIPT = """
+local token = redis.call('HMGET', KEYS[1], 'state', 'type', 'user_id')
+if token[1] ~= ARGV[1] or token[2] ~= ARGV[2] then
+    return false
+end
+redis.call('HSET', KEYS[1], 'state', ARGV[3])
+return token[3]
+"""
+
+
+class TokenStore:
+    """Refresh and verify token state by jti in Redis, every key expires together with its token.
+    Access tokens are stateless and only checked against revocation_filter."""
+
+    def __init__(self, client: Redis = redis_client):
+        self.client = client
+
+    @cached_property
+    def _consume_script(self):
+        return self.client.register_script(CONSUME_SCRIPT)
+
+    async def issue(self, jti: str, token_type: TokenType, user_id: int, expires_at: datetime) -> None:
+        ttl = math.ceil((expires_at - datetime.now(timezone.utc)).total_seconds())
+        key = TOKEN_KEY.format(jti)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"state": ACTIVE, "type": token_type.value, "user_id": user_id})
+            pipe.expire(key, max(ttl, 1))
+            await pipe.execute()
+
+    async def check(self, jti: str, token_type: TokenType) -> int | None:
+        """Owner of an active token of this type, one HMGET"""
+        state, stored_type, user_id = await self.client.hmget(TOKEN_KEY.format(jti), "state", "type", "user_id")
+        if state != ACTIVE or stored_type != token_type.value:
+            return None
+        return int(user_id)
+
+    async def consume(self, jti: str, token_type: TokenType) -> int | None:
+        """Like check, but the token is revoked by the same call"""
+        user_id = await self._consume_script(keys=[TOKEN_KEY.format(jti)], args=[ACTIVE, token_type.value, REVOKED])
+        return int(user_id) if user_id is not None else None
+
+
+token_store = TokenStore()
+revocation_filter = RevocationFilter(redis_client)
@@ -0,0 +1,97 @@
+"""Load test concurrent logins against an unrelated endpoint.
+
+Fires concurrent POST /api-auth/login requests with real bcrypt hashes while a
+probe requests /openapi.json every 10 ms, once with bcrypt inline on the event
+loop (the old pwd_context.verify call) and once through the password_hasher pool.
+Reports login throughput and the probe's p50/p99 latency.
+The app runs in process over ASGI; the DB session and token issuing are
+replaced by stand-ins so only password verification does real work.
+
+Run from auth_service/ with the service env loaded:
+    poetry run python -m benchmarks.login_load
+"""
+import asyncio
+import statistics
+import time
+from unittest.mock import AsyncMock, patch
+from httpx import ASGITransport, AsyncClient
+from app.core.config import settings
+from app.db.database import get_auth_db
+from app.main import app
+from app.models.auth import User
+from app.services.password_hasher import PasswordHasher, pwd_context
+
+LOGINS = 64
+CONCURRENCY = 16
+PROBE_INTERVAL_SECONDS = 0.01
+PASSWORD = "Te7sP@ss"
+
+
+class InlineHasher:
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return pwd_context.verify(password, password_hash)
+
+
+def override_db(user: User):
+    session = AsyncMock()
+    session.scalar.return_value = user
+
+    async def _override():
+        yield session
+    return _override
+
+
+async def probe(client: AsyncClient, stop: asyncio.Event, latencies: list[float]) -> None:
+    # Latency counts from when the request was due, so time spent waiting for a blocked loop is included
+    while not stop.is_set():
+        due = time.perf_counter() + PROBE_INTERVAL_SECONDS
+        await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+        await client.get("/openapi.json")
+        latencies.append(time.perf_counter() - due)
+
+
+async def measure(name: str, client: AsyncClient, hasher) -> None:
+    queue = iter(range(LOGINS))
+
+    async def worker():
+        for _ in queue:
+            response = await client.post("/api-auth/login", json={"email": "load@example.com", "password": PASSWORD})
+            assert response.status_code == 200, response.text
+
+    stop = asyncio.Event()
+    latencies: list[float] = []
+    with patch("app.services.auth.password_hasher", hasher):
+        probe_task = asyncio.create_task(probe(client, stop, latencies))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else latencies[0]
+    print(
+        f"{name:>6}: {LOGINS / elapsed:6.1f} logins/s | "
+        f"probe p50 {statistics.median(latencies) * 1000:7.1f} ms | "
+        f"probe p99 {p99 * 1000:7.1f} ms | {len(latencies)} probes"
+    )
+
+
+async def main() -> None:
+    user = User(id=1, email="load@example.com", username="Load", is_active=True, is_superadmin=False,
+                password_hash=pwd_context.hash(PASSWORD))
+    app.dependency_overrides[get_auth_db] = override_db(user)
+    hasher = PasswordHasher(workers=settings.password_hash_workers, max_queue=LOGINS)
+    try:
+        with patch("app.api.auth.create_token_pair", AsyncMock(return_value=("access", "refresh"))):
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                await client.get("/openapi.json")
+                await measure("inline", client, InlineHasher())
+                await measure("pool", client, hasher)
+        print(f"pool stats: {hasher.stats()}")
+    finally:
+        hasher.shutdown()
+        app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,3 @@
-from datetime import datetime, timezone, timedelta
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
@@ -6,7 +5,7 @@ from unittest.mock import AsyncMock
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_auth_db
 from app.main import app
-from app.models.auth import User, ActiveToken, TokenType
+from app.models.auth import User
 from app.schemas.user import UserCreate
 
 
@@ -70,36 +69,3 @@ def user_factory():
         else:
             return None
     return _create_user
-
-
-@pytest.fixture
-def token_factory():
-    def _create_token(token_type: str):
-        if token_type == "access":
-            return ActiveToken(
-                id=1,
-                token_type=TokenType.AUTH_ACCESS,
-                token="test_access_token",
-                user_id=1,
-                expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-            )
-        elif token_type == "refresh":
-            return ActiveToken(
-                id=2,
-                token_type=TokenType.AUTH_REFRESH,
-                token="test_refresh_token",
-                user_id=1,
-                expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-            )
-        elif token_type == 'verify':
-            return ActiveToken(
-                id=3,
-                token_type=TokenType.EMAIL_VERIFY,
-                token="test_verify_token",
-                user_id=1,
-                expires_at=datetime.now(timezone.utc) + timedelta(hours=1)
-            )
-        else:
-            return None
-
-    return _create_token
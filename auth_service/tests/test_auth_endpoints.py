@@ -73,6 +73,20 @@ async def test_refresh_token_success(client, mock_db, user_factory):
         assert response.json() == {"access_token": "new_access_token", "refresh_token": "new_refresh_token"}
 
 
+@pytest.mark.asyncio
+async def test_logout(client):
+    with patch("app.api.auth.logout_user", AsyncMock()) as mock_logout:
+        response = await client.post(
+            "/api-auth/logout",
+            headers={"Authorization": "Bearer access_token"},
+            json={"refresh_token": "refresh_token"}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "You have been logged out"}
+    mock_logout.assert_awaited_once_with("access_token", "refresh_token")
+
+
 @pytest.mark.asyncio
 async def test_get_users_success(client, mock_db, user_factory):
     mock_user = user_factory('test_admin_user')
@@ -113,6 +127,21 @@ async def test_get_users_failure(client, mock_db, user_factory):
         assert response.json() == {"detail": "Forbidden"}
 
 
+@pytest.mark.asyncio
+async def test_get_password_hashing_metrics(client, mock_db, user_factory):
+    mock_user = user_factory('test_admin_user')
+    with patch("app.api.auth.get_current_user", AsyncMock(return_value=mock_user)):
+        response = await client.get(
+            "/api-auth/metrics/password-hashing",
+            headers={"Authorization": "Bearer admin_token"}
+        )
+
+        assert response.status_code == 200
+        assert set(response.json()) == {
+            "workers", "in_flight", "queue_depth", "max_queue_depth", "calls", "rejected", "avg_wait_ms"
+        }
+
+
 @pytest.mark.asyncio
 async def test_restore_request_success(client, mock_db, user_factory):
     mock_user = user_factory('test_active_user')
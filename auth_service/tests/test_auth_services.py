@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timezone, timedelta
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
@@ -12,12 +13,17 @@ from app.services.auth import (
     decode_token,
     create_tokens,
     get_current_user,
-    token_to_blacklist,
     token_checker,
     verify_email,
-    validate_refresh_token
+    validate_refresh_token,
+    create_token_pair,
+    logout_user
 )
-from app.models.auth import User, TokenType, ActiveToken, BlacklistedToken
+from app.models.auth import User, TokenType
+from app.services.password_hasher import PasswordHasher
+from app.services.token_audit import record_revoked
+from app.services.token_store import TokenStore
+from shared.utils.revocation import BloomFilter, RevocationFilter
 
 
 @pytest.mark.asyncio
@@ -175,17 +181,19 @@ async def test_decode_token_invalid():
 @pytest.mark.parametrize(
     "token_type,secret_key,duration",
     [
-        (TokenType.AUTH_ACCESS, settings.access_token_secret_key, settings.access_token_expire_hours),
+        (TokenType.AUTH_ACCESS, settings.access_token_secret_key, settings.access_token_expire_minutes),
         (TokenType.AUTH_REFRESH, settings.refresh_token_secret_key, settings.refresh_token_expire_days),
         (TokenType.EMAIL_VERIFY, settings.email_verify_secret_key, settings.email_verify_expire_hours),
     ]
 )
-async def test_create_tokens_all_types(token_type, secret_key, duration, mock_db):
+async def test_create_tokens_all_types(token_type, secret_key, duration):
     email = "test@example.com"
     user_id = 42
     expire_at = duration
 
-    token = await create_tokens(token_type, expire_at, email, user_id, mock_db)
+    with patch("app.services.auth.token_store.issue", new_callable=AsyncMock) as mock_issue:
+        with patch("app.services.auth.record_issued") as mock_record_issued:
+            token = await create_tokens(token_type, expire_at, email, user_id)
 
     assert isinstance(token, str)
 
@@ -193,8 +201,16 @@ async def test_create_tokens_all_types(token_type, secret_key, duration, mock_db
     assert decoded["sub"] == str(user_id)
     assert decoded["email"] == email
 
-    mock_db.add.assert_called_once()
-    mock_db.commit.assert_awaited_once()
+    if token_type == TokenType.AUTH_ACCESS:
+        assert decoded["jti"]
+        mock_issue.assert_not_awaited()
+        mock_record_issued.assert_not_called()
+        return
+
+    args, kwargs = mock_issue.call_args
+    assert args[:3] == (decoded["jti"], token_type, user_id)
+    assert int(args[3].timestamp()) == decoded["exp"]
+    mock_record_issued.assert_called_once_with(token, token_type, user_id, args[3])
 
 
 @pytest.mark.asyncio
@@ -202,186 +218,302 @@ async def test_get_current_user_success(mock_db, user_factory):
     mock_token = "mock_token"
     mock_user = user_factory('test_active_user')
 
-    with patch("app.services.auth.token_checker", return_value=None) as mock_checker:
-        with patch("app.services.auth.decode_token", return_value=2) as mock_decoder:
-            with patch("app.services.auth.get_user_by_id", return_value=mock_user) as mock_get_user:
+    with patch("app.services.auth.token_checker", return_value=2) as mock_checker:
+        with patch("app.services.auth.get_user_by_id", return_value=mock_user) as mock_get_user:
 
-                result = await get_current_user(mock_token, mock_db)
-                assert result == mock_user
-
-                args, kwargs = mock_checker.call_args
+            result = await get_current_user(mock_token, mock_db)
+            assert result == mock_user
 
-                assert args[0] == mock_db
-                assert args[1] == mock_token
-                assert isinstance(args[2], HTTPException)
-                assert args[2].status_code == 401
-                assert args[2].detail == "Could not validate credentials"
-                assert args[3] == TokenType.AUTH_ACCESS
+            args, kwargs = mock_checker.call_args
 
-                mock_decoder.assert_called_once_with(
-                    mock_token,
-                    settings.access_token_secret_key,
-                    settings.algorithm
-                )
+            assert args[0] == mock_token
+            assert isinstance(args[1], HTTPException)
+            assert args[1].status_code == 401
+            assert args[1].detail == "Could not validate credentials"
+            assert args[2] == TokenType.AUTH_ACCESS
 
-                mock_get_user.assert_called_once_with(mock_db, mock_user.id)
+            mock_get_user.assert_called_once_with(mock_db, mock_user.id)
 
 
 @pytest.mark.asyncio
-async def test_token_to_blacklist(mock_db):
-    token = ActiveToken(token="test-token")
-
-    await token_to_blacklist(mock_db, token)
+@pytest.mark.parametrize("consume", [False, True])
+async def test_token_checker_success(consume):
+    credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
+    token = jwt.encode({"sub": "2", "jti": "abc"}, settings.refresh_token_secret_key, algorithm=settings.algorithm)
 
-    added_token = mock_db.add.call_args[0][0]
-    assert isinstance(added_token, BlacklistedToken)
-    assert added_token.token == "test-token"
+    with patch("app.services.auth.token_store.check", AsyncMock(return_value=2)) as mock_check:
+        with patch("app.services.auth.token_store.consume", AsyncMock(return_value=2)) as mock_consume:
+            result = await token_checker(token, credentials, TokenType.AUTH_REFRESH, consume=consume)
 
-    mock_db.commit.assert_awaited_once()
+    assert result == 2
+    called, skipped = (mock_consume, mock_check) if consume else (mock_check, mock_consume)
+    called.assert_awaited_once_with("abc", TokenType.AUTH_REFRESH)
+    skipped.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-async def test_token_checker_success(mock_db, token_factory):
+@pytest.mark.parametrize(
+    "claims,stored_user_id",
+    [
+        ({"sub": "2"}, 2),
+        ({"sub": "2", "jti": "abc"}, None),
+        ({"sub": "2", "jti": "abc"}, 3),
+    ]
+)
+async def test_token_checker_failure(claims, stored_user_id):
     credentials = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
+    token = jwt.encode(claims, settings.refresh_token_secret_key, algorithm=settings.algorithm)
 
-    mock_db_token = token_factory('access')
+    with patch("app.services.auth.token_store.check", AsyncMock(return_value=stored_user_id)):
+        with pytest.raises(HTTPException) as exc:
+            await token_checker(token, credentials, TokenType.AUTH_REFRESH)
 
-    mock_db.scalar = AsyncMock(side_effect=[None, mock_db_token])
+    assert exc.value.status_code == 401
+    assert "Could not validate credentials" in str(exc.value.detail)
 
-    result = await token_checker(mock_db, mock_db_token.token, credentials, mock_db_token.token_type)
 
-    assert result == mock_db_token
-    assert mock_db.scalar.await_count == 2
+@pytest.mark.asyncio
+@pytest.mark.parametrize("revoked", [False, True])
+async def test_token_checker_access_is_stateless(revoked):
+    credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+    )
+    token = jwt.encode({"sub": "2", "jti": "abc"}, settings.access_token_secret_key, algorithm=settings.algorithm)
+
+    with patch("app.services.auth.revocation_filter.is_revoked", AsyncMock(return_value=revoked)) as mock_revoked:
+        with patch("app.services.auth.token_store.check", AsyncMock()) as mock_check:
+            if revoked:
+                with pytest.raises(HTTPException) as exc:
+                    await token_checker(token, credentials, TokenType.AUTH_ACCESS)
+                assert exc.value.status_code == 401
+            else:
+                assert await token_checker(token, credentials, TokenType.AUTH_ACCESS) == 2
+
+    mock_revoked.assert_awaited_once_with("abc")
+    mock_check.assert_not_awaited()
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    "blacklisted_token,mock_db_token",
-    [
-        (True, None),
-        (None, None, ),
-        (None, ActiveToken(
-            id=1,
-            token_type=TokenType.AUTH_ACCESS,
-            token="test-token",
-            user_id=1,
-            expires_at=datetime.now(timezone.utc) - timedelta(hours=1)
-    )),
-    ]
-)
-async def test_token_checker_failure(mock_db, blacklisted_token, mock_db_token):
-    token = "test-token"
+async def test_token_checker_rejects_other_token_type():
     credentials = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
-    token_type = TokenType.AUTH_ACCESS
+    token = jwt.encode({"sub": "2", "jti": "abc"}, settings.access_token_secret_key, algorithm=settings.algorithm)
 
-    mock_db.scalar = AsyncMock(side_effect=[blacklisted_token, mock_db_token])
-    mock_db.commit = AsyncMock()
-    mock_db.delete = AsyncMock()
+    with pytest.raises(HTTPException) as exc:
+        await token_checker(token, credentials, TokenType.AUTH_REFRESH)
 
-    with patch("app.services.auth.token_to_blacklist", new_callable=AsyncMock):
-        with pytest.raises(HTTPException) as exc:
-            await token_checker(mock_db, token, credentials, token_type)
-
-        assert exc.value.status_code == 401
-        assert "Could not validate credentials" in str(exc.value.detail)
+    assert exc.value.status_code == 401
 
 
 @pytest.mark.asyncio
-async def test_verify_email_create_user(mock_db, user_factory, token_factory):
+@pytest.mark.parametrize("task", ['create_user', None])
+async def test_verify_email(mock_db, user_factory, task):
     mock_user = user_factory('test_inactive_user')
-    mock_db_token = token_factory('verify')
-    with patch("app.services.auth.token_checker", return_value=mock_db_token) as mock_checker:
-        with patch("app.services.auth.decode_token", return_value=1) as mock_decoder:
+    with patch("app.services.auth.token_checker", return_value=1) as mock_checker:
+        with patch("app.services.auth.write_revoked", AsyncMock()) as mock_write_revoked:
             with patch("app.services.auth.publish_event", return_value=None) as mock_publish_event:
 
                 mock_db.scalar = AsyncMock(return_value=mock_user)
-                result = await verify_email(mock_db, mock_db_token.token, 'create_user')
+                result = await verify_email(mock_db, "verify_token", task)
                 assert result == mock_user
+                assert result.is_active is True
 
                 args, kwargs = mock_checker.call_args
 
-                assert args[0] == mock_db
-                assert args[1] == mock_db_token.token
-                assert isinstance(args[2], HTTPException)
-                assert args[2].status_code == 401
-                assert args[2].detail == "You need register again."
-                assert args[3] == TokenType.EMAIL_VERIFY
-
-                mock_decoder.assert_called_once_with(
-                    mock_db_token.token,
-                    settings.email_verify_secret_key,
-                    settings.algorithm
-                )
+                assert args[0] == "verify_token"
+                assert isinstance(args[1], HTTPException)
+                assert args[1].status_code == 401
+                assert args[1].detail == "You need register again."
+                assert args[2] == TokenType.EMAIL_VERIFY
+                assert kwargs == {"consume": True}
 
-                mock_publish_event.assert_called_once()
+                mock_db.commit.assert_awaited_once()
+                mock_write_revoked.assert_awaited_once_with(mock_db, "verify_token")
+                assert mock_publish_event.call_count == (1 if task else 0)
 
 
 @pytest.mark.asyncio
-async def test_verify_email_restore_pass(mock_db, user_factory, token_factory):
-    mock_user = user_factory('test_inactive_user')
-    mock_db_token = token_factory('verify')
-    with patch("app.services.auth.token_checker", return_value=mock_db_token) as mock_checker:
-        with patch("app.services.auth.decode_token", return_value=1) as mock_decoder:
-                mock_db.scalar = AsyncMock(return_value=mock_user)
-                result = await verify_email(mock_db, mock_db_token.token)
-                assert result == mock_user
+async def test_validate_refresh_token(mock_db, user_factory):
+    mock_user = user_factory('test_active_user')
+    with patch("app.services.auth.token_checker", return_value=2) as mock_checker:
+        with patch("app.services.auth.get_user_by_id", return_value=mock_user) as mock_get_user_by_id:
+            with patch("app.services.auth.record_revoked") as mock_record_revoked:
+                with patch("app.services.auth.create_token_pair", return_value=("new_access", "new_refresh")) as mock_create_token_pair:
 
-                args, kwargs = mock_checker.call_args
+                    result = await validate_refresh_token(mock_db, "refresh_token")
+                    assert result == (mock_user, "new_access", "new_refresh")
 
-                assert args[0] == mock_db
-                assert args[1] == mock_db_token.token
-                assert isinstance(args[2], HTTPException)
-                assert args[2].status_code == 401
-                assert args[2].detail == "You need register again."
-                assert args[3] == TokenType.EMAIL_VERIFY
+                    args, kwargs = mock_checker.call_args
 
-                mock_decoder.assert_called_once_with(
-                    mock_db_token.token,
-                    settings.email_verify_secret_key,
-                    settings.algorithm
-                )
+                    assert args[0] == "refresh_token"
+                    assert isinstance(args[1], HTTPException)
+                    assert args[1].status_code == 401
+                    assert args[1].detail == "Something wrong. Try again or relogin."
+                    assert args[2] == TokenType.AUTH_REFRESH
+                    assert kwargs == {"consume": True}
+
+                    mock_get_user_by_id.assert_called_once_with(mock_db, 2)
+                    mock_record_revoked.assert_called_once_with("refresh_token")
+                    mock_create_token_pair.assert_called_once_with(mock_user)
+                    mock_db.commit.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_validate_refresh_token(mock_db, user_factory, token_factory):
-    mock_db_token = token_factory('refresh')
+async def test_refresh_fails_after_logout(mock_db, user_factory):
     mock_user = user_factory('test_active_user')
-    mock_new_access_token = token_factory('access')
-    mock_new_refresh_token = token_factory('refresh')
-    with patch("app.services.auth.token_checker", return_value=mock_db_token) as mock_checker:
-        with patch("app.services.auth.decode_token", return_value=2) as mock_decoder:
-            with patch("app.services.auth.get_user_by_id", return_value=mock_user) as mock_get_user_by_id:
-                 with patch("app.services.auth.token_to_blacklist", return_value=None) as mock_token_to_blacklist:
-                    with patch("app.services.auth.create_token_pair", return_value=(mock_new_access_token, mock_new_refresh_token)) as mock_create_token_pair:
-
-                        result = await validate_refresh_token(mock_db, mock_db_token.token)
-                        assert result == (mock_user, mock_new_access_token, mock_new_refresh_token)
-
-                        args, kwargs = mock_checker.call_args
-
-                        assert args[0] == mock_db
-                        assert args[1] == mock_db_token.token
-                        assert isinstance(args[2], HTTPException)
-                        assert args[2].status_code == 401
-                        assert args[2].detail == "Something wrong. Try again or relogin."
-                        assert args[3] == TokenType.AUTH_REFRESH
-
-                        mock_decoder.assert_called_once_with(
-                            mock_db_token.token,
-                            settings.refresh_token_secret_key,
-                            settings.algorithm
-                        )
-
-                        mock_get_user_by_id.assert_called_once_with(mock_db, mock_decoder.return_value)
-
-                        mock_token_to_blacklist.assert_called_once_with(mock_db, mock_db_token)
-                        mock_db.delete.assert_called_once_with(mock_db_token)
-
-                        mock_create_token_pair.assert_called_once_with(mock_db, mock_user)
-                        mock_db.commit.assert_called_once()
+    stored = {}
+
+    async def issue(jti, token_type, user_id, expires_at):
+        stored[jti] = (token_type, user_id)
+
+    async def consume(jti, token_type):
+        stored_type, user_id = stored.pop(jti, (None, None))
+        return user_id if stored_type == token_type else None
+
+    with patch("app.services.auth.token_store.issue", side_effect=issue), \
+            patch("app.services.auth.token_store.consume", side_effect=consume), \
+            patch("app.services.auth.revocation_filter.revoke", AsyncMock()) as mock_revoke, \
+            patch("app.services.auth.record_issued"), \
+            patch("app.services.auth.record_revoked") as mock_record_revoked, \
+            patch("app.services.auth.get_user_by_id", AsyncMock(return_value=mock_user)):
+        access_token, refresh_token = await create_token_pair(mock_user)
+        await logout_user(access_token, refresh_token)
+
+        with pytest.raises(HTTPException) as exc:
+            await validate_refresh_token(mock_db, refresh_token)
+
+    assert exc.value.status_code == 401
+    assert stored == {}
+    mock_revoke.assert_awaited_once()
+    mock_record_revoked.assert_called_once_with(refresh_token)
+
+
+@pytest.mark.asyncio
+async def test_token_store_check():
+    mock_client = AsyncMock()
+    store = TokenStore(mock_client)
+
+    mock_client.hmget.return_value = ["active", "auth_access", "2"]
+    assert await store.check("abc", TokenType.AUTH_ACCESS) == 2
+    mock_client.hmget.assert_awaited_once_with("token:abc", "state", "type", "user_id")
+
+    assert await store.check("abc", TokenType.AUTH_REFRESH) is None
+
+    mock_client.hmget.return_value = ["revoked", "auth_access", "2"]
+    assert await store.check("abc", TokenType.AUTH_ACCESS) is None
+
+    mock_client.hmget.return_value = [None, None, None]
+    assert await store.check("abc", TokenType.AUTH_ACCESS) is None
+
+
+@pytest.mark.asyncio
+async def test_token_store_consume():
+    mock_client = AsyncMock()
+    consume_script = AsyncMock(return_value="2")
+    mock_client.register_script = MagicMock(return_value=consume_script)
+    store = TokenStore(mock_client)
+
+    assert await store.consume("abc", TokenType.AUTH_REFRESH) == 2
+    consume_script.assert_awaited_once_with(keys=["token:abc"], args=["active", "auth_refresh", "revoked"])
+
+    consume_script.return_value = None
+    assert await store.consume("abc", TokenType.AUTH_REFRESH) is None
+    mock_client.register_script.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_token_audit_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "token_audit_enabled", False)
+    with patch("app.services.token_audit.asyncio.create_task") as mock_create_task:
+        record_revoked("token")
+    mock_create_task.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_round_trip():
+    hasher = PasswordHasher(workers=2, max_queue=4)
+    try:
+        password_hash = await hasher.hash("Te7sP@ss")
+        assert await hasher.verify("Te7sP@ss", password_hash)
+        assert not await hasher.verify("wrong", password_hash)
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert (stats.calls, stats.in_flight, stats.queue_depth, stats.rejected) == (3, 0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_is_full():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def blocking_verify(password, password_hash):
+        asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+        return True
+
+    try:
+        with patch("app.services.password_hasher.pwd_context.verify", side_effect=blocking_verify):
+            running = asyncio.create_task(hasher.verify("a", "hash"))
+            queued = asyncio.create_task(hasher.verify("b", "hash"))
+            await asyncio.sleep(0.05)
+            assert hasher.queue_depth == 1
+
+            with pytest.raises(HTTPException) as exc:
+                await hasher.verify("c", "hash")
+            assert exc.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+            release.set()
+            assert await running and await queued
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert (stats.calls, stats.rejected, stats.max_queue_depth) == (2, 1, 1)
+
+
+def test_bloom_filter_round_trip():
+    bloom = BloomFilter(capacity=1000, error_rate=0.001)
+    revoked = [f"revoked-{i}" for i in range(1000)]
+    for jti in revoked:
+        bloom.add(jti)
+
+    loaded = BloomFilter.loads(bloom.dumps())
+    assert all(jti in loaded for jti in revoked)
+    false_positives = sum(f"active-{i}" in loaded for i in range(10000))
+    assert false_positives < 50
+
+
+@pytest.mark.asyncio
+async def test_revocation_filter():
+    bloom = BloomFilter(capacity=10)
+    bloom.add("revoked")
+    bloom.add("false-positive")
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = ["1", bloom.dumps()]
+    revocation = RevocationFilter(mock_client)
+
+    assert not await revocation.is_revoked("revoked")
+    await revocation.refresh()
+
+    mock_client.zscore.return_value = 1700000000
+    assert await revocation.is_revoked("revoked")
+    mock_client.zscore.return_value = None
+    assert not await revocation.is_revoked("false-positive")
+    mock_client.zscore.reset_mock()
+    assert not await revocation.is_revoked("active")
+    mock_client.zscore.assert_not_awaited()
+
+    await revocation.revoke("new", datetime.now(timezone.utc).timestamp() + 60)
+    mock_client.zadd.assert_awaited_once()
+    assert await revocation.is_revoked("new")
@@ -17,6 +17,7 @@ from app.schemas.car import (
 from app.schemas.listing import MessageResponse
 from app.models.user import User
 from app.models.car import Brand as BrandModel, CarModel
+from app.models.normalization import normalize_name
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.permissions_checker import permission_checker
@@ -38,7 +39,7 @@ async def create_brand(
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db)):
     await permission_checker(user, 'manage_cars')
-    if await db.scalar(select(BrandModel).where(BrandModel.name == brand.name)):
+    if await db.scalar(select(BrandModel.id).where(BrandModel.name_normalized == normalize_name(brand.name))):
         raise HTTPException(status.HTTP_409_CONFLICT, detail="Brand already exists")
     db_brand = BrandModel(
         name=brand.name,
@@ -86,11 +87,13 @@ async def create_model(
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db)):
     await permission_checker(user, 'manage_cars')
-    checker_model_name: BrandWithModels | None = await db.scalar(select(BrandModel).options(selectinload(BrandModel.car_models)).where(BrandModel.id == model.brand_id))
-    if not checker_model_name:
+    if not await db.get(BrandModel, model.brand_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Brand not found")
-    model_names = [m.name.lower() for m in checker_model_name.car_models]
-    if model.name.lower() in model_names:
+    if await db.scalar(
+        select(CarModel.id)
+        .where(CarModel.brand_id == model.brand_id)
+        .where(CarModel.name_normalized == normalize_name(model.name))
+    ):
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Model with this name already exists for the brand"
@@ -0,0 +1,20 @@
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query,
+    status
+)
+from app.schemas.exchange_rate import ExchangeRate as ExchangeRateResponse
+from app.db.database import get_listing_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.price_conversion import get_rate_history
+
+router = APIRouter(prefix="/exchange-rates", tags=["exchange-rates"])
+
+
+@router.get('', response_model=list[ExchangeRateResponse], status_code=status.HTTP_200_OK)
+async def get_exchange_rate_history(
+        days: int = Query(30, ge=1, le=366),
+        db: AsyncSession = Depends(get_listing_db)):
+    """Stored daily exchange rates, oldest first"""
+    return await get_rate_history(db, days)
@@ -1,4 +1,5 @@
 from datetime import date, timedelta
+from functools import partial
 from pathlib import Path
 from fastapi import (
     APIRouter,
@@ -7,7 +8,9 @@ from fastapi import (
     status,
     Form,
     File,
-    UploadFile
+    UploadFile,
+    BackgroundTasks,
+    Query
 )
 from sqlalchemy import select, func, delete
 from app.core.redis import redis_client as redis
@@ -16,8 +19,12 @@ from app.schemas.listing import (
     ListingCreate,
     Listing as ListingResponse,
     ListingPremium as ListingPremiumResponse,
+    ListingBulkModeration,
+    ListingBulkModerationResult,
     MessageResponse,
 )
+from app.schemas.listing_import import ListingImportReport
+from app.schemas.exchange_rate import ListingPrice, ListingPriceHistory, PriceHistoryPoint
 from app.schemas.additional_request import (
     AddEntityRequest,
     AddCountry,
@@ -31,8 +38,21 @@ from app.models.listing import Listing as ListingModel, Currency
 from app.models.user import User
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.listing import validate_references, create_listing_service, check_profanity_attempts
-from app.services.permissions_checker import permission_checker
+from app.services.listing import (
+    validate_references,
+    create_listing_service,
+    check_profanity_attempts,
+    bulk_moderate_listings
+)
+from app.services.image_variants import build_image_variants
+from app.services.listing_images import claim_images, replace_listing_images, release_images
+from app.services.media_gc import enqueue_media_deletion
+from app.services.exchange_rates import exchange_rate_provider
+from app.services.price_conversion import convert_prices, get_rate_history, price_uah_series
+from app.services.listing_quota import reserve_listing_slot, release_listing_slots
+from app.services.listing_import import detect_import_format, read_import_file, parse_import_rows, import_listings
+from app.core.config import settings
+from app.services.permissions_checker import permission_checker, has_permission
 from app.services.admin_notification_event import notification_event, creating_event
 from app.utils.additional_checker import additional_checker
 from app.utils.create_price_uah import create_price_uah
@@ -59,6 +79,7 @@ async def get_all_active_listings(db: AsyncSession = Depends(get_listing_db)):
 
 @router.post("", response_model=ListingResponse | MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_listing(
+        background_tasks: BackgroundTasks,
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db),
         brand_id: int = Form(...),
@@ -74,14 +95,7 @@ async def create_listing(
         dealership_id: int | None = Form(None)
 ):
     await permission_checker(user, 'manage_listings')
-    listings_result = await db.execute(select(ListingModel).filter(ListingModel.user_id == user.id))
-    listings =  listings_result.scalars().all()
-    if  user.role.name != 'admin':
-        if not user.is_premium and len(listings) >= 1:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You need to be a premium user for creating more than 1 listing"
-            )
+    await reserve_listing_slot(db, user)
 
     await validate_references(db, brand_id, car_model_id, country_id, region_id, city_id)
 
@@ -113,6 +127,8 @@ async def create_listing(
     )
 
     listing: ListingResponse = await create_listing_service(db, listing_data, user.id, images)
+    if listing.image_urls:
+        background_tasks.add_task(build_image_variants, listing.id, listing.image_urls)
 
     if not listing.is_active:
         await notification_event(listing)
@@ -121,6 +137,25 @@ async def create_listing(
     return listing
 
 
+@router.post('/import', response_model=ListingImportReport, status_code=status.HTTP_200_OK)
+async def bulk_import_listings(
+        file: UploadFile = File(...),
+        user: User = Depends(get_user_from_token),
+        db: AsyncSession = Depends(get_listing_db)):
+    """Import many listings from a CSV or NDJSON file, invalid rows are reported and skipped"""
+    await permission_checker(user, 'manage_listings')
+    import_format = detect_import_format(file.filename, file.content_type)
+    raw_rows = parse_import_rows(await read_import_file(file), import_format)
+    if not raw_rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import file is empty")
+    if len(raw_rows) > settings.listing_import_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.listing_import_max_rows} rows allowed"
+        )
+    return await import_listings(db, user, raw_rows)
+
+
 @router.get('/all_listings', response_model=list[ListingResponse], status_code=status.HTTP_200_OK)
 async def get_all_listings(
         user: User= Depends(get_user_from_token),
@@ -140,6 +175,41 @@ async def get_moderating_listings(
     return inactive_listings.scalars().all()
 
 
+@router.get('/prices', response_model=list[ListingPrice], status_code=status.HTTP_200_OK)
+async def get_listing_prices(
+        currency: Currency = Query(Currency.UAH),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=1000),
+        db: AsyncSession = Depends(get_listing_db)):
+    """A page of active listing prices converted to the requested currency"""
+    rates = await exchange_rate_provider.get_vector(db)
+    if rates is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Exchange rates are not available")
+    rows = (await db.execute(
+        select(ListingModel.id, ListingModel.original_price, ListingModel.original_currency)
+        .where(ListingModel.is_active == True)
+        .order_by(ListingModel.id)
+        .offset(skip)
+        .limit(limit)
+    )).all()
+    prices = convert_prices(
+        [row.original_price for row in rows],
+        [row.original_currency for row in rows],
+        currency,
+        rates
+    )
+    return [
+        ListingPrice(
+            id=row.id,
+            original_price=row.original_price,
+            original_currency=row.original_currency.value,
+            price=float(price),
+            currency=currency.value
+        )
+        for row, price in zip(rows, prices)
+    ]
+
+
 @router.post('/additional-request', response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_sub_info(
         request: AddEntityRequest,
@@ -149,6 +219,18 @@ async def create_sub_info(
     return MessageResponse(message=f"Successfully created request for adding new {request.type}")
 
 
+@router.post('/bulk-moderation', response_model=ListingBulkModerationResult, status_code=status.HTTP_200_OK)
+async def bulk_moderate(
+        request: ListingBulkModeration,
+        user: User = Depends(get_user_from_token),
+        db: AsyncSession = Depends(get_listing_db)):
+    """Activate, deactivate or delete many listings at once"""
+    await permission_checker(user, 'moderate_listings')
+    affected, _, orphaned_urls = await bulk_moderate_listings(db, request.ids, request.action)
+    await enqueue_media_deletion(orphaned_urls)
+    return ListingBulkModerationResult(action=request.action, requested=len(request.ids), affected=affected)
+
+
 @router.patch('/{current_listing_id}', response_model=ListingResponse, status_code=status.HTTP_200_OK)
 async def toggle_listing_status(
         current_listing_id: int,
@@ -157,7 +239,7 @@ async def toggle_listing_status(
     listing = await db.get(ListingModel, current_listing_id)
     if not listing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
-    is_moderator = any(p.name == 'moderate_listings' for p in user.role.permissions)
+    is_moderator = await has_permission(user, 'moderate_listings')
     if listing.user_id != user.id and not is_moderator:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can't manage this listing")
     listing.is_active = not listing.is_active
@@ -166,6 +248,28 @@ async def toggle_listing_status(
     return listing
 
 
+@router.get('/{current_listing_id}/price-history', response_model=ListingPriceHistory, status_code=status.HTTP_200_OK)
+async def get_listing_price_history(
+        current_listing_id: int,
+        days: int = Query(30, ge=1, le=366),
+        db: AsyncSession = Depends(get_listing_db)):
+    """Daily price in UAH of an active listing over the stored exchange-rate history"""
+    listing = await db.get(ListingModel, current_listing_id)
+    if not listing or not listing.is_active:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
+    history = await get_rate_history(db, days)
+    series = price_uah_series(listing.original_price, listing.original_currency, history)
+    return ListingPriceHistory(
+        listing_id=listing.id,
+        original_price=listing.original_price,
+        original_currency=listing.original_currency.value,
+        points=[
+            PriceHistoryPoint(date=rates.created_at, price_uah=float(price))
+            for rates, price in zip(history, series)
+        ]
+    )
+
+
 @router.get("/{current_listing_id}", response_model=ListingResponse | ListingPremiumResponse, status_code=status.HTTP_200_OK)
 async def get_active_listing_by_id(
         current_listing_id: int,
@@ -175,7 +279,7 @@ async def get_active_listing_by_id(
     listing_base: ListingModel | None = await db.get(ListingModel, current_listing_id)
     is_moderator = None
     if user:
-        is_moderator = any(p.name == 'moderate_listings' for p in user.role.permissions)
+        is_moderator = await has_permission(user, 'moderate_listings')
     if not listing_base or (not listing_base.is_active and not is_moderator):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
     if not user or user.id != listing_base.user_id:
@@ -187,7 +291,7 @@ async def get_active_listing_by_id(
         db.add(db_listing_view)
         await db.commit()
 
-    if not user or (not user.is_premium and not is_moderator):
+    if not user or (not user.has_active_premium and not is_moderator):
         return listing_base
 
     today = date.today()
@@ -263,6 +367,7 @@ async def get_active_listing_by_id(
 @router.put("/{current_listing_id}", response_model=ListingResponse | MessageResponse, status_code=status.HTTP_200_OK)
 async def update_listing(
         current_listing_id: int,
+        background_tasks: BackgroundTasks,
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db),
         brand_id: int = Form(None),
@@ -280,7 +385,7 @@ async def update_listing(
     listing: ListingModel | None = await db.get(ListingModel, current_listing_id)
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
-    if listing.user_id != user.id and not any([p.name == 'moderate_listings' for p in user.role.permissions]):
+    if listing.user_id != user.id and not await has_permission(user, 'moderate_listings'):
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can't update this listing")
 
     price_uah = await create_price_uah(db, original_price, original_currency, listing)
@@ -316,12 +421,16 @@ async def update_listing(
             setattr(listing, field, value)
 
     if images:
-        storage.delete_images(listing.image_urls)
-        image_urls = await storage.save_images(listing.id, images)
-        listing.image_urls = image_urls
+        image_urls = await storage.save_images(images, claim=partial(claim_images, db))
+        orphaned_urls = await replace_listing_images(db, listing, image_urls)
+        missing_variants = [url for url in image_urls if url not in (listing.image_variants or {})]
+        if missing_variants:
+            background_tasks.add_task(build_image_variants, listing.id, missing_variants)
 
     await db.commit()
     await db.refresh(listing)
+    if images:
+        await enqueue_media_deletion(orphaned_urls)
 
     if not listing.is_active:
         await notification_event(listing)
@@ -343,9 +452,12 @@ async def delete_listing(
     )
     if not listing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Listing not found")
-    is_moderator = any(p.name == 'moderate_listings' for p in user.role.permissions)
+    is_moderator = await has_permission(user, 'moderate_listings')
     if listing.user_id != user.id and not is_moderator:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You can't delete this listing")
     await db.delete(listing)
+    await release_listing_slots(db, listing.user_id)
+    orphaned_urls = await release_images(db, listing.image_urls or [])
     await db.commit()
+    await enqueue_media_deletion(orphaned_urls)
     return MessageResponse(message=f"Listing {current_listing_id} deleted")
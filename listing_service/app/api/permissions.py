@@ -14,7 +14,7 @@ from app.schemas.listing import MessageResponse
 from app.models.user import User, Permission as PermissionModel
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.permissions_checker import permission_checker
+from app.services.permissions_checker import permission_checker, permissions_changed
 from app.utils.token_utils import get_user_from_token
 
 router = APIRouter(prefix="/permissions", tags=["permissions"])
@@ -76,6 +76,7 @@ async def get_permission_by_id(
     permission.name = permission_data.name or permission.name
     permission.description = permission_data.description or permission.description
     await db.commit()
+    await permissions_changed()
     return permission
 
 
@@ -90,4 +91,5 @@ async def delete_role_by_id(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Permission not found')
     await db.delete(permission)
     await db.commit()
+    await permissions_changed()
     return MessageResponse(message=f"Permission {permission_id} deleted")
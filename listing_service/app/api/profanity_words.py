@@ -5,20 +5,27 @@ from fastapi import (
     status
 )
 from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert
 from app.schemas.profanity_word import (
     ProfanityWordsBase,
-    ProfanityWords as ProfanityWordsResponse
+    ProfanityWords as ProfanityWordsResponse,
+    ProfanityWordsImport,
+    ProfanityWordsImportReport
 )
 from app.schemas.listing import MessageResponse
 from app.models.user import User
 from app.models.profanity_words import ProfanityWords as ProfanityWordsModel
 from app.db.database import get_listing_db
+from app.core.config import settings
+from app.core.redis import redis_client
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.permissions_checker import permission_checker
 from app.utils.token_utils import get_user_from_token
 
 router = APIRouter(prefix="/profanity", tags=["profanity"])
 
+IMPORT_CHUNK_SIZE = 1000
+
 
 @router.get('', response_model=list[ProfanityWordsResponse], status_code=status.HTTP_200_OK)
 async def get_profanity_words(
@@ -39,9 +46,36 @@ async def create_profanity_word(
     db.add(db_profanity_word)
     await db.commit()
     await db.refresh(db_profanity_word)
+    await redis_client.add_words([db_profanity_word.word])
     return db_profanity_word
 
 
+@router.post('/import', response_model=ProfanityWordsImportReport, status_code=status.HTTP_200_OK)
+async def import_profanity_words(
+        data: ProfanityWordsImport,
+        user: User = Depends(get_user_from_token),
+        db: AsyncSession = Depends(get_listing_db)):
+    """Add many words at once with multi-row inserts, words already stored are skipped"""
+    await permission_checker(user, 'manage_profanity_words')
+    if len(data.words) > settings.profanity_import_max_words:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Maximum {settings.profanity_import_max_words} words allowed"
+        )
+    added = 0
+    for start in range(0, len(data.words), IMPORT_CHUNK_SIZE):
+        # INSERT IGNORE counts inserted rows only, ON DUPLICATE KEY UPDATE would count
+        # matched duplicates too because the driver connects with CLIENT_FOUND_ROWS
+        stmt = insert(ProfanityWordsModel).prefix_with("IGNORE").values(
+            [{"word": word} for word in data.words[start:start + IMPORT_CHUNK_SIZE]]
+        )
+        result = await db.execute(stmt)
+        added += result.rowcount
+    await db.commit()
+    await redis_client.add_words(data.words)
+    return ProfanityWordsImportReport(total=len(data.words), added=added)
+
+
 @router.delete('/{profanity_id}', response_model=MessageResponse, status_code=status.HTTP_200_OK)
 async def delete_profanity_word(
         profanity_id: int,
@@ -51,6 +85,8 @@ async def delete_profanity_word(
     db_profanity_word = await db.get(ProfanityWordsModel, profanity_id)
     if not db_profanity_word:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Profanity word not found')
+    word = db_profanity_word.word
     await db.delete(db_profanity_word)
     await db.commit()
+    await redis_client.remove_words(list({word, word.lower()}))
     return MessageResponse(message=f'Profanity_word {profanity_id} deleted')
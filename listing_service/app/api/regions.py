@@ -19,6 +19,7 @@ from app.schemas.region import (
 from app.schemas.listing import MessageResponse
 from app.models.user import User
 from app.models.region import Country as CountryModel, Region as RegionModel, City as CityModel
+from app.models.normalization import normalize_name
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.permissions_checker import permission_checker
@@ -40,8 +41,7 @@ async def create_country(
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db)):
     await permission_checker(user, 'manage_regions')
-    country_check = await db.execute(select(CountryModel).where(CountryModel.name == country.name))
-    if country_check.scalars().first():
+    if await db.scalar(select(CountryModel.id).where(CountryModel.name_normalized == normalize_name(country.name))):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Country already exists')
     db_country = CountryModel(name=country.name)
     db.add(db_country)
@@ -91,15 +91,14 @@ async def create_region(
         user: User = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db)):
     await permission_checker(user, 'manage_regions')
-    country_with_regions: CountryWithRegions | None = await db.scalar(
-        select(CountryModel)
-        .options(selectinload(CountryModel.regions))
-        .where(CountryModel.id == region.country_id)
-    )
-    if not country_with_regions:
+    if not await db.get(CountryModel, region.country_id):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Country not found')
 
-    if any(r.name == region.name for r in country_with_regions.regions):
+    if await db.scalar(
+        select(RegionModel.id)
+        .where(RegionModel.country_id == region.country_id)
+        .where(RegionModel.name_normalized == normalize_name(region.name))
+    ):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Region already exists')
 
     db_region = RegionModel(
@@ -156,6 +155,12 @@ async def create_city(
     region_check = await db.get(RegionModel, city.region_id)
     if not region_check:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Region not found')
+    if await db.scalar(
+        select(CityModel.id)
+        .where(CityModel.region_id == city.region_id)
+        .where(CityModel.name_normalized == normalize_name(city.name))
+    ):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='City already exists')
     db_city = CityModel(
         name=city.name,
         region_id=city.region_id,
@@ -13,7 +13,7 @@ from app.schemas.listing import MessageResponse
 from app.models.user import User, RolePermission as RolePermissionModel
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.permissions_checker import permission_checker
+from app.services.permissions_checker import permission_checker, permissions_changed
 from app.utils.token_utils import get_user_from_token
 
 router = APIRouter(prefix="/role-permissions", tags=["role_permissions"])
@@ -51,6 +51,7 @@ async def create_role_permission(
     db.add(db_role_permission)
     await db.commit()
     await db.refresh(db_role_permission)
+    await permissions_changed()
     return db_role_permission
 
 
@@ -77,4 +78,5 @@ async def delete_role_permission(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role_Permission pair not found")
     await db.delete(role_permission)
     await db.commit()
+    await permissions_changed()
     return MessageResponse(message=f"Role_Permission_Pair {role_permission_id} deleted")
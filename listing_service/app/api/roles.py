@@ -13,7 +13,7 @@ from app.schemas.listing import MessageResponse
 from app.models.user import User, Role as RoleModel
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.permissions_checker import permission_checker
+from app.services.permissions_checker import permission_checker, permissions_changed
 from app.utils.token_utils import get_user_from_token
 
 router = APIRouter(prefix="/roles", tags=["roles"])
@@ -70,4 +70,5 @@ async def delete_role_by_id(
         raise HTTPException(status_code=404, detail='Role not found')
     await db.delete(role)
     await db.commit()
+    await permissions_changed()
     return MessageResponse(message=f"Role {role_id} deleted")
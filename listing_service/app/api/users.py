@@ -14,6 +14,7 @@ from app.models.user import User as UserModel, Role as RoleModel
 from app.db.database import get_listing_db
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.permissions_checker import permission_checker
+from app.services.principal_cache import principal_cache
 from app.services.user_manager import user_manager
 from app.utils.token_utils import get_user_from_token
 from shared.utils.logging import setup_logging
@@ -36,11 +37,14 @@ async def get_all_users(
 async def become_premium_user(
         user: UserModel = Depends(get_user_from_token),
         db: AsyncSession = Depends(get_listing_db)):
-    user.is_premium = True
-    user.premium_expires_at = date.today()+ timedelta(days=30)
+    # The authenticated user may come from the principal cache, detached from this session
+    db_user = await db.get(UserModel, user.id)
+    db_user.is_premium = True
+    db_user.premium_expires_at = date.today()+ timedelta(days=30)
     await db.commit()
-    await db.refresh(user)
-    return user
+    await db.refresh(db_user)
+    await principal_cache.invalidate([db_user.auth_user_id])
+    return db_user
 
 
 @router.get('/me', response_model=UserResponse, status_code=status.HTTP_200_OK)
@@ -71,6 +75,7 @@ async def banned_user_by_id(
     if await user_manager(user, target, db, 'toggle_ban_status'):
         target.is_banned = not target.is_banned
         await db.commit()
+        await principal_cache.invalidate([target.auth_user_id])
         return target
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
@@ -90,5 +95,6 @@ async def change_user_role(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
         target.role_id = role_id.role_id
         await db.commit()
+        await principal_cache.invalidate([target.auth_user_id])
         return target
     raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
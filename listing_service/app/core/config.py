@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,6 +9,65 @@ class Settings(BaseSettings):
 
     media_root: str
     media_url: str
+    serve_media: bool = True
+
+    # MEDIA STORAGE (media_root stays the scratch directory for the s3 backend)
+    storage_backend: Literal['local', 's3'] = 'local'
+    s3_bucket: str | None = None
+    s3_public_url: str | None = None
+    s3_endpoint_url: str | None = None
+    s3_region: str | None = None
+    s3_access_key_id: str | None = None
+    s3_secret_access_key: str | None = None
+    s3_max_pool_connections: int = 20
+    s3_multipart_threshold: int = 8 * 1024 * 1024
+    s3_part_size: int = 8 * 1024 * 1024
+
+    # IMAGE PROCESSING
+    image_workers: int = 2
+    image_max_concurrency: int = 4
+    image_timeout_seconds: float = 30.0
+    image_max_upload_bytes: int = 10 * 1024 * 1024
+    image_max_pixels: int = 50_000_000
+    image_upload_chunk_size: int = 64 * 1024
+
+    # MEDIA GC
+    media_gc_interval_seconds: int = 3600
+    media_gc_batch_size: int = 1000
+    media_gc_grace_seconds: int = 3600
+
+    # EXCHANGE RATES (safety net if a rate-updated event is missed)
+    exchange_rates_cache_seconds: float = 3600
+
+    # LISTING QUOTA (None means unlimited)
+    listing_quota_base: int = 1
+    listing_quota_premium: int | None = None
+    listing_quota_admin: int | None = None
+
+    # LISTING IMPORT
+    listing_import_max_rows: int = 5000
+    listing_import_chunk_size: int = 500
+    listing_import_max_upload_bytes: int = 5 * 1024 * 1024
+
+    # PROFANITY (words match whole tokens, only embeddable words also match inside run-together text)
+    # Stems no common word contains, "cunt" stays out for Scunthorpe and "ass" for classic
+    profanity_embeddable_words: set[str] = {
+        "fuck", "shit", "bitch", "asshole", "bullshit", "dickhead", "wanker", "blowjob",
+    }
+    profanity_max_text_length: int = 20000
+    profanity_import_max_words: int = 10000
+    profanity_verdict_cache_size: int = 10000
+
+    # PRINCIPAL CACHE (local copies outlive a missed invalidation event by at most principal_cache_local_seconds)
+    principal_cache_size: int = 10000
+    principal_cache_local_seconds: float = 5
+    principal_cache_seconds: int = 60
+
+    # PERMISSIONS (role masks are reloaded on change events, this is the safety net)
+    permission_registry_seconds: float = 300
+
+    # ACCESS TOKEN REVOCATION (filter published by the auth service)
+    revocation_filter_refresh_seconds: float = 5
 
     # REDIS
     redis_scheme: str
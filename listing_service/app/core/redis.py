@@ -1,23 +1,70 @@
+import uuid
+from functools import cached_property
 import redis.asyncio as redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.models.profanity_words import ProfanityWords
 
+# Only touch a live set: adding to an expired key would leave a partial set that get_cache trusts
+ADD_WORDS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('SADD', KEYS[1], unpack(ARGV))
+end
+return redis.call('INCR', KEYS[2])
+"""
+REMOVE_WORDS_SCRIPT = """
+redis.call('SREM', KEYS[1], unpack(ARGV))
+return redis.call('INCR', KEYS[2])
+"""
+SCRIPT_CHUNK_SIZE = 1000
+
 
 class RedisClient:
     def __init__(self, redis_url: str = settings.redis_url):
         self.client = redis.from_url(redis_url, decode_responses=True)
         self.key = "profanity_words"
+        self.version_key = "profanity_words:version"
         self.ttl = 3600  # seconds
 
+    @cached_property
+    def _add_words_script(self):
+        return self.client.register_script(ADD_WORDS_SCRIPT)
+
+    @cached_property
+    def _remove_words_script(self):
+        return self.client.register_script(REMOVE_WORDS_SCRIPT)
+
     async def set_cache(self, db: AsyncSession) -> None:
         """Saving bad words in Redis"""
         words = await self._get_profanity_words_from_db(db)
-        if words:
+        if not words:
             await self.client.delete(self.key)
-            await self.client.sadd(self.key, *words)
-            await self.client.expire(self.key, self.ttl)
+            return
+        # Build aside and swap in with RENAME so readers never see an empty or half-filled set
+        staging_key = f"{self.key}:staging:{uuid.uuid4().hex}"
+        for start in range(0, len(words), SCRIPT_CHUNK_SIZE):
+            await self.client.sadd(staging_key, *words[start:start + SCRIPT_CHUNK_SIZE])
+        await self.client.expire(staging_key, self.ttl)
+        await self.client.rename(staging_key, self.key)
+
+    async def add_words(self, words: list[str]) -> None:
+        """Add words to the cached set and move the version"""
+        for start in range(0, len(words), SCRIPT_CHUNK_SIZE):
+            await self._add_words_script(
+                keys=[self.key, self.version_key], args=words[start:start + SCRIPT_CHUNK_SIZE]
+            )
+
+    async def remove_words(self, words: list[str]) -> None:
+        """Remove words from the cached set and move the version"""
+        for start in range(0, len(words), SCRIPT_CHUNK_SIZE):
+            await self._remove_words_script(
+                keys=[self.key, self.version_key], args=words[start:start + SCRIPT_CHUNK_SIZE]
+            )
+
+    async def get_version(self) -> int:
+        """Word-set version, moved on every change so processes know to rebuild their matcher"""
+        return int(await self.client.get(self.version_key) or 0)
 
     async def get_cache(self, db: AsyncSession) -> set[str]:
         """Get words from Redis"""
@@ -1,6 +1,5 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.config import settings
@@ -12,6 +11,12 @@ from app.api.users import router as users_router
 from app.api.regions import router as regions_router
 from app.api.profanity_words import router as profanity_words_router
 from app.api.cars import router as cars_router
+from app.api.exchange_rates import router as exchange_rates_router
+from app.utils.storage import storage
+from app.media import MediaFiles
+from app.services.exchange_rates import listen_exchange_rate_events
+from app.services.principal_cache import listen_principal_events
+from app.utils.token_utils import revocation_filter
 import asyncio
 import os
 from shared.utils.logging import setup_logging
@@ -47,8 +52,18 @@ async def lifespan(app: FastAPI):
         raise RuntimeError("Migration failed")
     logger.info("Alembic migrations applied.")
 
+    exchange_rate_listener = asyncio.create_task(listen_exchange_rate_events())
+    principal_listener = asyncio.create_task(listen_principal_events())
+    revocation_refresher = asyncio.create_task(
+        revocation_filter.run(settings.revocation_filter_refresh_seconds, logger)
+    )
+
     yield
 
+    exchange_rate_listener.cancel()
+    principal_listener.cancel()
+    revocation_refresher.cancel()
+    await storage.shutdown()
     logger.info("Auth Service is shutting down...")
 
 app = FastAPI(
@@ -67,9 +82,11 @@ app.include_router(users_router, prefix="/api-listings")
 app.include_router(regions_router, prefix="/api-listings")
 app.include_router(profanity_words_router, prefix="/api-listings")
 app.include_router(cars_router, prefix="/api-listings")
+app.include_router(exchange_rates_router, prefix="/api-listings")
 
-app.mount(
-    settings.media_url,
-    StaticFiles(directory=settings.media_root),
-    name="media"
-)
+if settings.storage_backend == "local" and settings.serve_media:
+    app.mount(
+        settings.media_url,
+        MediaFiles(directory=settings.media_root),
+        name="media"
+    )
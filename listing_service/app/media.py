@@ -0,0 +1,47 @@
+from pathlib import Path
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope, Receive, Send
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ZERO_COPY_EXTENSIONS = ("http.response.zerocopysend", "http.response.pathsend")
+
+
+class MediaFileResponse(FileResponse):
+    """FileResponse that lets the server do zero-copy transfer when it offers an ASGI extension for it"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        zero_copy = next((extension for extension in ZERO_COPY_EXTENSIONS if extension in extensions), None)
+        if zero_copy is None or scope["method"].upper() == "HEAD" or "range" in Headers(scope=scope):
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if zero_copy == "http.response.pathsend":
+            await send({"type": "http.response.pathsend", "path": str(self.path)})
+        else:
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file})
+        if self.background is not None:
+            await self.background()
+
+
+class MediaFiles(StaticFiles):
+    """Media files never change under a given name: cache them forever and use the file name as a strong ETag.
+    The extension stays in it, the same content hash is stored in several formats."""
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if any(part.startswith(".") for part in Path(path).parts):
+            # Scratch space such as .uploads is not public
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result, scope: Scope, status_code: int = 200) -> Response:
+        headers = {"cache-control": IMMUTABLE_CACHE_CONTROL, "etag": f'"{Path(full_path).name}"'}
+        response = MediaFileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
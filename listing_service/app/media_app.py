@@ -0,0 +1,9 @@
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from app.core.config import settings
+from app.media import MediaFiles
+
+# Standalone media server, run next to the API with: uvicorn app.media_app:app
+app = Starlette(routes=[
+    Mount(settings.media_url, app=MediaFiles(directory=settings.media_root), name="media")
+])
@@ -0,0 +1,27 @@
+import asyncio
+from app.core.config import settings
+from app.db.database import get_listing_session
+from app.services.media_gc import collect_orphaned_media
+from app.utils.storage import storage
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+
+async def run_media_gc():
+    """Runs the orphaned media collector every media_gc_interval_seconds."""
+    logger.info("Starting media GC...")
+    try:
+        while True:
+            try:
+                async with get_listing_session() as session:
+                    await collect_orphaned_media(session)
+            except Exception as e:
+                logger.error(f"Media GC pass failed: {str(e)}")
+            await asyncio.sleep(settings.media_gc_interval_seconds)
+    finally:
+        await storage.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_media_gc())
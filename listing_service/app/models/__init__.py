@@ -6,3 +6,4 @@ from .statistic_for_premium import ListingView
 from .profanity_words import ProfanityWords
 from .car import Brand, CarModel
 from .listing import Listing
+from .stored_image import StoredImage
@@ -1,18 +1,24 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from .normalization import normalized_name_default
 
 
 class Brand(Base):
     __tablename__ = 'brands'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
+    name_normalized = Column(String(100), unique=True, nullable=False, index=True, default=normalized_name_default)
     car_models = relationship("CarModel", back_populates="brand")
 
 
 class CarModel(Base):
     __tablename__ = 'car_models'
+    __table_args__ = (
+        Index('ux_car_models_brand_name_normalized', 'brand_id', 'name_normalized', unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
+    name_normalized = Column(String(100), nullable=False, default=normalized_name_default)
     brand_id = Column(Integer, ForeignKey('brands.id'), nullable=False)
     brand = relationship("Brand", back_populates="car_models")
@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime, timezone
-from sqlalchemy import ForeignKey, Column, Integer, String, Boolean, DateTime, Float, Enum, Text
+from sqlalchemy import ForeignKey, Column, Integer, String, Boolean, DateTime, Float, Enum, Text, Index, text
 from sqlalchemy.dialects.mysql import JSON
 from .base import Base
 
@@ -13,8 +13,12 @@ class Currency(enum.Enum):
 
 class Listing(Base):
     __tablename__ = 'listings'
+    __table_args__ = (
+        # Multi-valued index, lets the media GC count an image's listings without a table scan
+        Index('ix_listings_image_urls', text('(CAST(image_urls AS CHAR(255) ARRAY))')),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     brand_id = Column(Integer, ForeignKey('brands.id'), nullable=False)
     car_model_id = Column(Integer, ForeignKey('car_models.id'), nullable=False, index=True)
     country_id = Column(Integer, ForeignKey('countries.id'), nullable=False, index=True)
@@ -24,6 +28,7 @@ class Listing(Base):
     original_currency = Column(Enum(Currency), nullable=False)
     price_uah = Column(Float, nullable=True, index=True)
     image_urls = Column(JSON, nullable=True)
+    image_variants = Column(JSON, nullable=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
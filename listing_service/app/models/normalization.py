@@ -0,0 +1,16 @@
+import re
+import unicodedata
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_name(name: str) -> str:
+    """Casefold, strip diacritics and collapse whitespace of a catalog name"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE_RE.sub(" ", stripped).strip().casefold()
+
+
+def normalized_name_default(context) -> str:
+    """Column default which fills `name_normalized` from the inserted `name`"""
+    return normalize_name(context.get_current_parameters()["name"])
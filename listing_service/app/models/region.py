@@ -1,19 +1,25 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
+from .normalization import normalized_name_default
 
 
 class Country(Base):
     __tablename__ = 'countries'
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), unique=True, nullable=False, index=True)
+    name_normalized = Column(String(100), unique=True, nullable=False, index=True, default=normalized_name_default)
     regions = relationship("Region", back_populates="country")
 
 
 class Region(Base):
     __tablename__ = 'regions_or_states'
+    __table_args__ = (
+        Index('ux_regions_or_states_country_name_normalized', 'country_id', 'name_normalized', unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
+    name_normalized = Column(String(100), nullable=False, default=normalized_name_default)
     country_id = Column(Integer, ForeignKey('countries.id'), nullable=False)
     country = relationship("Country", back_populates="regions")
     cities = relationship("City", back_populates="region")
@@ -21,7 +27,11 @@ class Region(Base):
 
 class City(Base):
     __tablename__ = 'cities'
+    __table_args__ = (
+        Index('ux_cities_region_name_normalized', 'region_id', 'name_normalized', unique=True),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, index=True)
+    name_normalized = Column(String(100), nullable=False, default=normalized_name_default)
     region_id = Column(Integer, ForeignKey('regions_or_states.id'), nullable=False)
     region = relationship("Region", back_populates="cities")
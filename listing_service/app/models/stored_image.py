@@ -0,0 +1,9 @@
+from sqlalchemy import Column, String, Integer
+from .base import Base
+
+
+class StoredImage(Base):
+    __tablename__ = 'stored_images'
+    id = Column(Integer, primary_key=True)
+    url = Column(String(255), unique=True, nullable=False, index=True)
+    ref_count = Column(Integer, nullable=False, default=0)
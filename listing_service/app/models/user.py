@@ -1,3 +1,4 @@
+from datetime import date
 from .base import Base
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Date
 from sqlalchemy.orm import relationship
@@ -12,10 +13,16 @@ class User(Base):
     is_superadmin = Column(Boolean, nullable=False)
     is_banned = Column(Boolean, default=False, nullable=False)
     is_premium = Column(Boolean, default=False, nullable=False)
-    premium_expires_at = Column(Date, nullable=True)
+    premium_expires_at = Column(Date, nullable=True, index=True)
+    listings_count = Column(Integer, default=0, nullable=False)
     role_id = Column(Integer, ForeignKey('roles.id'), nullable=False)
     role = relationship("Role", back_populates="users")
 
+    @property
+    def has_active_premium(self) -> bool:
+        """Premium checked against today, the stored flag is cleared later by clean_expired_premium_status"""
+        return bool(self.is_premium) and (self.premium_expires_at is None or self.premium_expires_at >= date.today())
+
 
 class Role(Base):
     __tablename__ = 'roles'
@@ -11,3 +11,23 @@ class ExchangeRate(BaseModel):
     created_at: date
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ListingPrice(BaseModel):
+    id: int
+    original_price: float
+    original_currency: str
+    price: float
+    currency: str
+
+
+class PriceHistoryPoint(BaseModel):
+    date: date
+    price_uah: float
+
+
+class ListingPriceHistory(BaseModel):
+    listing_id: int
+    original_price: float
+    original_currency: str
+    points: list[PriceHistoryPoint]
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Literal
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 from datetime import datetime
 from enum import Enum
 
@@ -28,11 +29,36 @@ class ListingCreate(ListingBase):
     price_uah: float | None
 
 
+class ListingImage(BaseModel):
+    url: str
+    srcset: str | None = None
+    webp_srcset: str | None = None
+
+
 class Listing(ListingBase):
     id: int
     is_active: bool
     created_at: datetime
     updated_at: datetime
+    image_variants: dict[str, dict[str, dict]] | None = None
+
+    @computed_field
+    @property
+    def images(self) -> list[ListingImage]:
+        """Original image urls with srcset strings once the derivatives are ready"""
+        images = []
+        for url in self.image_urls or []:
+            variants = (self.image_variants or {}).get(url)
+            if not variants:
+                images.append(ListingImage(url=url))
+                continue
+            ordered = sorted(variants.values(), key=lambda variant: variant["width"])
+            images.append(ListingImage(
+                url=url,
+                srcset=", ".join(f"{variant['src']} {variant['width']}w" for variant in ordered),
+                webp_srcset=", ".join(f"{variant['webp']} {variant['width']}w" for variant in ordered)
+            ))
+        return images
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -48,5 +74,16 @@ class ListingPremium(Listing):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ListingBulkModeration(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=5000)
+    action: Literal['activate', 'deactivate', 'delete']
+
+
+class ListingBulkModerationResult(BaseModel):
+    action: str
+    requested: int
+    affected: int
+
+
 class MessageResponse(BaseModel):
     message: str
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field, field_validator
+from app.schemas.listing import Currency
+
+
+class ListingImportRow(BaseModel):
+    brand_id: int
+    car_model_id: int
+    country_id: int
+    region_id: int
+    city_id: int | None = None
+    original_price: float = Field(gt=0)
+    original_currency: Currency
+    title: str = Field(min_length=1, max_length=255)
+    description: str | None = None
+    dealership_id: int | None = None
+
+    @field_validator('city_id', 'description', 'dealership_id', mode='before')
+    @classmethod
+    def empty_to_none(cls, value):
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+class ListingImportRowResult(BaseModel):
+    row: int
+    created: bool
+    error: str | None = None
+
+
+class ListingImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    rows: list[ListingImportRowResult]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class ProfanityWordsBase(BaseModel):
@@ -9,3 +9,24 @@ class ProfanityWords(ProfanityWordsBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ProfanityWordsImport(BaseModel):
+    words: list[str] = Field(min_length=1)
+
+    @field_validator('words')
+    @classmethod
+    def normalize_words(cls, words: list[str]) -> list[str]:
+        """Strip, lowercase and deduplicate, the DB compares words case-insensitively anyway"""
+        normalized = list(dict.fromkeys(w.strip().lower() for w in words if w.strip()))
+        if not normalized:
+            raise ValueError('No words to import')
+        too_long = next((w for w in normalized if len(w) > 100), None)
+        if too_long:
+            raise ValueError(f'Word is longer than 100 characters: {too_long[:20]}...')
+        return normalized
+
+
+class ProfanityWordsImportReport(BaseModel):
+    total: int
+    added: int
@@ -1,6 +1,6 @@
 from datetime import date
 from typing import Annotated
-from pydantic import BaseModel, EmailStr, StringConstraints, ConfigDict
+from pydantic import AliasChoices, BaseModel, EmailStr, Field, StringConstraints, ConfigDict
 
 UsernameStr = Annotated[
     str,
@@ -23,7 +23,8 @@ class User(UserBase):
     id: int
     is_banned: bool
     role_id: int
-    is_premium: bool
+    # Expired premium reads as False before the nightly job clears the stored flag
+    is_premium: bool = Field(validation_alias=AliasChoices('has_active_premium', 'is_premium'))
     premium_expires_at: date | None
 
     model_config = ConfigDict(from_attributes=True)
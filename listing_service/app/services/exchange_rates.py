@@ -0,0 +1,115 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from datetime import date
+import aio_pika
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.exchange_rate import ExchangeRate as ExchangeRateModel
+from app.models.listing import Currency
+from shared.utils.logging import setup_logging
+from shared.utils.rabbitmq import get_rabbitmq_connection
+from shared.utils import constants as rb_const
+
+logger = setup_logging()
+
+# Order of the cached rate vector
+CURRENCIES = (Currency.UAH, Currency.USD, Currency.EUR)
+
+
+@dataclass(frozen=True)
+class ExchangeRates:
+    buy_usd: float
+    sell_usd: float
+    buy_eur: float
+    sell_eur: float
+    created_at: date
+
+
+class ExchangeRateProvider:
+    """Latest exchange rates kept in process, reloaded when the rate-updated event arrives"""
+
+    def __init__(self, max_age_seconds: float = settings.exchange_rates_cache_seconds):
+        self.max_age_seconds = max_age_seconds
+        self._rates: ExchangeRates | None = None
+        self._vector: np.ndarray | None = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._rates is not None and time.monotonic() - self._loaded_at < self.max_age_seconds
+
+    async def get(self, db: AsyncSession) -> ExchangeRates | None:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._load(db)
+        return self._rates
+
+    async def get_vector(self, db: AsyncSession) -> np.ndarray | None:
+        """UAH per unit of each of CURRENCIES, built once per loaded rate set"""
+        rates = await self.get(db)
+        if rates is None:
+            return None
+        if self._vector is None:
+            self._vector = np.array([1.0, rates.sell_usd, rates.sell_eur])
+        return self._vector
+
+    async def _load(self, db: AsyncSession) -> None:
+        row = await db.scalar(
+            select(ExchangeRateModel)
+            .order_by(ExchangeRateModel.created_at.desc(), ExchangeRateModel.id.desc())
+            .limit(1)
+        )
+        self._loaded_at = time.monotonic()
+        self._vector = None
+        if row is None:
+            self._rates = None
+            return
+        self._rates = ExchangeRates(
+            buy_usd=row.buy_usd,
+            sell_usd=row.sell_usd,
+            buy_eur=row.buy_eur,
+            sell_eur=row.sell_eur,
+            created_at=row.created_at
+        )
+        if row.created_at != date.today():
+            logger.warning(f"No exchange rates for today, using rates from {row.created_at}")
+
+    def invalidate(self) -> None:
+        self._rates = None
+        self._vector = None
+        self._loaded_at = 0.0
+
+
+exchange_rate_provider = ExchangeRateProvider()
+
+
+async def listen_exchange_rate_events():
+    """Drops the cached rates whenever the task service stores new ones."""
+    while True:
+        try:
+            connection = await get_rabbitmq_connection()
+            async with connection:
+                channel = await connection.channel()
+                exchange = await channel.declare_exchange(
+                    rb_const.RABBITMQ_EXCHANGE_RATE_EVENTS, aio_pika.ExchangeType.FANOUT, durable=True
+                )
+                queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+                await queue.bind(exchange)
+                async with queue.iterator() as queue_iter:
+                    async for message in queue_iter:
+                        async with message.process():
+                            payload = json.loads(message.body.decode())
+                            if payload.get("type") == rb_const.EVENT_EXCHANGE_RATES_UPDATED:
+                                exchange_rate_provider.invalidate()
+                                logger.info(f"Exchange rates updated: {payload.get('data')}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error consuming exchange rate events: {str(e)}")
+            # Without events the cache still expires after exchange_rates_cache_seconds
+            await asyncio.sleep(5)
@@ -0,0 +1,27 @@
+from app.db.database import get_listing_session
+from app.models.listing import Listing
+from app.utils.storage import storage
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+
+async def build_image_variants(listing_id: int, image_urls: list[str]) -> None:
+    """Background job: generate image derivatives and attach them to the listing"""
+    try:
+        image_variants = await storage.build_derivatives(image_urls)
+    except Exception as e:
+        logger.error(f"Failed to build image derivatives for listing {listing_id}: {e}")
+        return
+
+    async with get_listing_session() as session:
+        listing = await session.get(Listing, listing_id)
+        if not listing:
+            return
+        current_variants = {
+            url: variants for url, variants in image_variants.items() if url in (listing.image_urls or [])
+        }
+        if not current_variants:
+            return
+        listing.image_variants = {**(listing.image_variants or {}), **current_variants}
+        await session.commit()
@@ -1,17 +1,26 @@
+from collections import Counter
+from functools import partial
 from fastapi import HTTPException, status, UploadFile
+from sqlalchemy import select, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.listing import Listing
+from app.models.statistic_for_premium import ListingView
 from app.models.car import Brand as BrandModel, CarModel
 from app.models.region import Country as CountryModel, Region as RegionModel, City as CityModel
 from app.schemas.listing import ListingCreate
+from app.services.listing_images import claim_images, acquire_images, release_images
+from app.services.listing_quota import release_listing_slots
 from app.utils.profanity_filter import profanity_filter
 from app.utils.storage import storage
 from app.core.redis import redis_client as redis
 from shared.utils.logging import setup_logging
+from shared.utils.rate_limit import fixed_window
 from datetime import datetime, timezone
 
 logger = setup_logging()
 
+PROFANITY_ATTEMPTS_WINDOW_SECONDS = 24 * 60 * 60
+
 
 async def validate_references(
         db: AsyncSession,
@@ -37,14 +46,8 @@ async def validate_references(
 
 
 async def check_profanity_attempts(redis_key: str, max_attempts: int = 2) -> bool:
-    attempts = await redis.client.get(redis_key)
-    attempts = int(attempts) if attempts else 0
-    if attempts >= max_attempts:
-        return False
-
-    await redis.client.incr(redis_key)
-    await redis.client.expire(redis_key, 24 * 60 * 60)
-    return True
+    result = await fixed_window(redis.client, redis_key, max_attempts, PROFANITY_ATTEMPTS_WINDOW_SECONDS)
+    return result.allowed
 
 
 async def create_listing_service(
@@ -85,10 +88,61 @@ async def create_listing_service(
     await db.flush()
 
     if images:
-        image_urls = await storage.save_images(listing.id, images)
+        image_urls = await storage.save_images(images, claim=partial(claim_images, db))
         listing.image_urls = image_urls
+        await acquire_images(db, image_urls)
         await db.merge(listing)
 
     await db.commit()
     await db.refresh(listing)
     return listing
+
+
+BULK_MODERATION_CHUNK_SIZE = 1000
+
+
+async def bulk_moderate_listings(
+        db: AsyncSession,
+        listing_ids: list[int],
+        action: str
+) -> tuple[int, list[int], list[str]]:
+    """Apply a moderation action with set-based statements, return affected count, deleted ids and orphaned images"""
+    listing_ids = list(dict.fromkeys(listing_ids))
+    affected = 0
+    deleted_ids: list[int] = []
+    orphaned_urls: list[str] = []
+
+    for start in range(0, len(listing_ids), BULK_MODERATION_CHUNK_SIZE):
+        chunk = listing_ids[start:start + BULK_MODERATION_CHUNK_SIZE]
+        if action in ('activate', 'deactivate'):
+            result = await db.execute(
+                update(Listing)
+                .where(Listing.id.in_(chunk))
+                .values(is_active=action == 'activate', updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            affected += result.rowcount
+        elif action == 'delete':
+            owners = (await db.execute(
+                select(Listing.id, Listing.user_id, Listing.image_urls).where(Listing.id.in_(chunk))
+            )).all()
+            if not owners:
+                continue
+            found_ids = [listing_id for listing_id, _, _ in owners]
+            await db.execute(delete(ListingView).where(ListingView.listing_id.in_(found_ids)))
+            result = await db.execute(
+                delete(Listing)
+                .where(Listing.id.in_(found_ids))
+                .execution_options(synchronize_session=False)
+            )
+            for user_id, amount in Counter(user_id for _, user_id, _ in owners).items():
+                await release_listing_slots(db, user_id, amount)
+            orphaned_urls.extend(
+                await release_images(db, [url for _, _, image_urls in owners for url in image_urls or []])
+            )
+            affected += result.rowcount
+            deleted_ids.extend(found_ids)
+        await db.commit()
+
+    logger.info(f'Bulk moderation {action}: {affected} of {len(listing_ids)} listings affected')
+    return affected, deleted_ids, orphaned_urls
@@ -0,0 +1,68 @@
+from collections import Counter, defaultdict
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.listing import Listing
+from app.models.stored_image import StoredImage
+
+
+async def claim_images(db: AsyncSession, urls: list[str]) -> None:
+    """Lock the images' rows until commit, recreating any the media GC removed, before their files are reused"""
+    if not urls:
+        return
+    stmt = insert(StoredImage).values([{"url": url, "ref_count": 0} for url in urls])
+    await db.execute(stmt.on_duplicate_key_update(ref_count=StoredImage.ref_count))
+
+
+async def acquire_images(db: AsyncSession, urls: list[str]) -> None:
+    """Add one reference per url, registering images stored for the first time"""
+    if not urls:
+        return
+    stmt = insert(StoredImage).values([{"url": url, "ref_count": 1} for url in urls])
+    await db.execute(stmt.on_duplicate_key_update(ref_count=StoredImage.ref_count + 1))
+
+
+async def release_images(db: AsyncSession, urls: list[str]) -> list[str]:
+    """Drop one reference per url occurrence, return urls whose files are no longer used"""
+    if not urls:
+        return []
+
+    urls_by_amount = defaultdict(list)
+    for url, amount in Counter(urls).items():
+        urls_by_amount[amount].append(url)
+    for amount, chunk in urls_by_amount.items():
+        await db.execute(
+            update(StoredImage)
+            .where(StoredImage.url.in_(chunk))
+            .values(ref_count=StoredImage.ref_count - amount)
+            .execution_options(synchronize_session=False)
+        )
+
+    unique_urls = list(dict.fromkeys(urls))
+    tracked = (await db.execute(
+        select(StoredImage.url, StoredImage.ref_count)
+        .where(StoredImage.url.in_(unique_urls))
+        .with_for_update()
+    )).all()
+    orphaned = [url for url, ref_count in tracked if ref_count <= 0]
+    if orphaned:
+        await db.execute(delete(StoredImage).where(StoredImage.url.in_(orphaned)))
+
+    # Images uploaded before content addressing live in a per-listing folder and have a single owner
+    tracked_urls = {url for url, _ in tracked}
+    return orphaned + [url for url in unique_urls if url not in tracked_urls]
+
+
+async def replace_listing_images(db: AsyncSession, listing: Listing, image_urls: list[str]) -> list[str]:
+    """Point the listing at new images, touching only the ones that changed, return orphaned urls"""
+    previous_urls = listing.image_urls or []
+    if image_urls == previous_urls:
+        return []
+
+    await acquire_images(db, [url for url in image_urls if url not in previous_urls])
+    orphaned_urls = await release_images(db, [url for url in previous_urls if url not in image_urls])
+    listing.image_urls = image_urls
+    listing.image_variants = {
+        url: variants for url, variants in (listing.image_variants or {}).items() if url in image_urls
+    } or None
+    return orphaned_urls
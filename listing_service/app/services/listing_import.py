@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.listing import Listing, Currency
+from app.models.car import Brand as BrandModel, CarModel
+from app.models.region import Country as CountryModel, Region as RegionModel, City as CityModel
+from app.models.user import User
+from app.schemas.listing_import import ListingImportRow, ListingImportRowResult, ListingImportReport
+from app.services.listing_quota import listing_limit, listing_limit_error, reserve_listing_slots
+from app.utils.create_price_uah import get_exchange_rates, convert_to_uah
+from app.utils.profanity_filter import get_profanity_matcher
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+IMPORT_READ_CHUNK_SIZE = 64 * 1024
+IMPORT_FORMATS_BY_SUFFIX = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+IMPORT_FORMATS_BY_CONTENT_TYPE = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+REFERENCES = {
+    'brand_id': (BrandModel, "Brand does not exist"),
+    'car_model_id': (CarModel, "Model does not exist"),
+    'country_id': (CountryModel, "Country does not exist"),
+    'region_id': (RegionModel, "Region does not exist"),
+    'city_id': (CityModel, "City does not exist"),
+}
+
+
+def detect_import_format(filename: str | None, content_type: str | None) -> str:
+    suffix = Path(filename or '').suffix.lower()
+    import_format = IMPORT_FORMATS_BY_SUFFIX.get(suffix) or IMPORT_FORMATS_BY_CONTENT_TYPE.get(content_type or '')
+    if not import_format:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Import file must be CSV or NDJSON"
+        )
+    return import_format
+
+
+async def read_import_file(file: UploadFile) -> bytes:
+    """Read the upload in chunks, refusing it as soon as it grows past the size cap"""
+    max_bytes = settings.listing_import_max_upload_bytes
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Import file is too large")
+    content = bytearray()
+    while chunk := await file.read(IMPORT_READ_CHUNK_SIZE):
+        content += chunk
+        if len(content) > max_bytes:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Import file is too large")
+    return bytes(content)
+
+
+def parse_import_rows(content: bytes, import_format: str) -> list[dict | None]:
+    """Split an import file into raw rows, unparsable NDJSON lines become None"""
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Import file must be UTF-8 encoded")
+
+    if import_format == 'csv':
+        return list(csv.DictReader(io.StringIO(text)))
+
+    rows = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            rows.append(None)
+    return rows
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in exc.errors())
+
+
+async def _existing_ids(db: AsyncSession, model, ids: set[int]) -> set[int]:
+    if not ids:
+        return set()
+    result = await db.scalars(select(model.id).where(model.id.in_(ids)))
+    return set(result.all())
+
+
+async def import_listings(db: AsyncSession, user: User, raw_rows: list[dict | None]) -> ListingImportReport:
+    """Validate rows in batch and insert valid ones in chunked multi-row transactions"""
+    results: dict[int, ListingImportRowResult] = {}
+    valid_rows: list[tuple[int, ListingImportRow]] = []
+
+    for number, raw_row in enumerate(raw_rows, start=1):
+        if not isinstance(raw_row, dict):
+            results[number] = ListingImportRowResult(row=number, created=False, error="Invalid row format")
+            continue
+        try:
+            valid_rows.append((number, ListingImportRow.model_validate(raw_row)))
+        except ValidationError as e:
+            results[number] = ListingImportRowResult(row=number, created=False, error=_validation_message(e))
+
+    existing_ids = {
+        field: await _existing_ids(
+            db,
+            model,
+            {getattr(row, field) for _, row in valid_rows if getattr(row, field) is not None}
+        )
+        for field, (model, _) in REFERENCES.items()
+    }
+    profanity_matcher = await get_profanity_matcher(db)
+    exchange_rates = await get_exchange_rates(db)
+    now = datetime.now(timezone.utc)
+
+    to_insert: list[tuple[int, dict]] = []
+    for number, row in valid_rows:
+        error = next(
+            (
+                message for field, (_, message) in REFERENCES.items()
+                if getattr(row, field) is not None and getattr(row, field) not in existing_ids[field]
+            ),
+            None
+        )
+        if not error and not (profanity_matcher.is_clean(row.title) and profanity_matcher.is_clean(row.description)):
+            error = "Profanity check failed"
+        if error:
+            results[number] = ListingImportRowResult(row=number, created=False, error=error)
+            continue
+
+        original_currency = Currency(row.original_currency.value)
+        to_insert.append((number, {
+            "user_id": user.id,
+            "brand_id": row.brand_id,
+            "car_model_id": row.car_model_id,
+            "country_id": row.country_id,
+            "region_id": row.region_id,
+            "city_id": row.city_id,
+            "original_price": row.original_price,
+            "original_currency": original_currency,
+            "price_uah": convert_to_uah(row.original_price, original_currency, exchange_rates),
+            "title": row.title,
+            "description": row.description,
+            "image_urls": [],
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+            "dealership_id": row.dealership_id,
+        }))
+
+    chunk_size = settings.listing_import_chunk_size
+    for start in range(0, len(to_insert), chunk_size):
+        chunk = to_insert[start:start + chunk_size]
+        reserved = await reserve_listing_slots(db, user, len(chunk))
+        limit_reached = reserved < len(chunk)
+        if limit_reached:
+            # The tier limit falls inside this chunk: its first rows still go in, the rest fail
+            error = listing_limit_error(user, listing_limit(user)).detail
+            for number, _ in to_insert[start + reserved:]:
+                results[number] = ListingImportRowResult(row=number, created=False, error=error)
+            chunk = chunk[:reserved]
+
+        if not chunk:
+            await db.rollback()
+            break
+        try:
+            await db.execute(insert(Listing), [values for _, values in chunk])
+            await db.commit()
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f'Listing import chunk for user {user.id} failed: {e}')
+            for number, _ in chunk:
+                results[number] = ListingImportRowResult(row=number, created=False, error="Failed to save listing")
+        else:
+            for number, _ in chunk:
+                results[number] = ListingImportRowResult(row=number, created=True)
+        if limit_reached:
+            break
+
+    rows = [results[number] for number in sorted(results)]
+    created = sum(1 for row in rows if row.created)
+    logger.info(f'User {user.id} imported {created} of {len(rows)} listings')
+    return ListingImportReport(total=len(rows), created=created, failed=len(rows) - created, rows=rows)
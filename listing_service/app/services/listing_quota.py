@@ -0,0 +1,75 @@
+from fastapi import HTTPException, status
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.user import User
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+
+def listing_limit(user: User) -> int | None:
+    """Maximum number of listings the user's tier may own, None means unlimited"""
+    if user.role and user.role.name == 'admin':
+        return settings.listing_quota_admin
+    if user.has_active_premium:
+        return settings.listing_quota_premium
+    return settings.listing_quota_base
+
+
+async def reserve_listing_slot(db: AsyncSession, user: User, amount: int = 1) -> None:
+    """Atomically bump the owner's listing counter, refusing once the tier limit is reached"""
+    limit = listing_limit(user)
+    stmt = (
+        update(User)
+        .where(User.id == user.id)
+        .values(listings_count=User.listings_count + amount)
+        .execution_options(synchronize_session=False)
+    )
+    if limit is not None:
+        stmt = stmt.where(User.listings_count <= limit - amount)
+
+    result = await db.execute(stmt)
+    if result.rowcount == 0:
+        logger.error(f'User {user.id} reached listing limit {limit}')
+        raise listing_limit_error(user, limit)
+
+
+async def reserve_listing_slots(db: AsyncSession, user: User, amount: int) -> int:
+    """Bump the owner's listing counter by as many of amount slots as the tier limit leaves,
+    return how many were reserved. The counter row stays locked until the caller commits."""
+    limit = listing_limit(user)
+    if limit is not None:
+        current = await db.scalar(select(User.listings_count).where(User.id == user.id).with_for_update())
+        amount = max(0, min(amount, limit - (current or 0)))
+    if amount:
+        await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(listings_count=User.listings_count + amount)
+            .execution_options(synchronize_session=False)
+        )
+    return amount
+
+
+def listing_limit_error(user: User, limit: int | None) -> HTTPException:
+    if not user.has_active_premium:
+        return HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You need to be a premium user for creating more than 1 listing"
+        )
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"You can't create more than {limit} listings"
+    )
+
+
+async def release_listing_slots(db: AsyncSession, user_id: int, amount: int = 1) -> None:
+    """Give back listing slots after the owner's listings were deleted"""
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        # A counter that drifted low still goes down, to zero rather than skipping the release
+        .values(listings_count=func.greatest(User.listings_count - amount, 0))
+        .execution_options(synchronize_session=False)
+    )
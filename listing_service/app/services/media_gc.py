@@ -0,0 +1,174 @@
+import json
+import time
+from collections import defaultdict
+from pathlib import PurePosixPath
+from sqlalchemy import select, update, delete, text, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.redis import redis_client as redis
+from app.models.listing import Listing
+from app.models.stored_image import StoredImage
+from app.utils.image_processing import DERIVATIVE_SIZES
+from app.utils.storage import storage
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+PENDING_DELETIONS_KEY = "media:pending_deletions"
+GC_LOCK_KEY = "media:gc_lock"
+ORIGINAL_EXTENSIONS = ("jpg", "png")
+
+
+async def enqueue_media_deletion(urls: list[str]) -> None:
+    """Hand image urls to the media GC instead of deleting files in the request path"""
+    if urls:
+        await redis.client.sadd(PENDING_DELETIONS_KEY, *urls)
+
+
+def original_stem(key: str) -> str:
+    """Stem of the original image a stored file belongs to, derivatives included"""
+    stem = PurePosixPath(key).stem
+    for name in DERIVATIVE_SIZES:
+        if stem.endswith(f"_{name}"):
+            return stem[:-len(name) - 1]
+    return stem
+
+
+async def drain_pending_deletions(db: AsyncSession, batch_size: int = settings.media_gc_batch_size) -> int:
+    """Delete queued images in batches, skipping any that were referenced again meanwhile"""
+    deleted = 0
+    while urls := await redis.client.spop(PENDING_DELETIONS_KEY, batch_size):
+        referenced = set((await db.scalars(
+            select(StoredImage.url).where(StoredImage.url.in_(urls)).with_for_update()
+        )).all())
+        orphaned = [url for url in urls if url not in referenced]
+        await storage.delete_images(orphaned)
+        # The locks keep uploads from claiming these urls until their files are gone
+        await db.commit()
+        deleted += len(orphaned)
+    return deleted
+
+
+REFERENCE_COUNTS = text("""
+    SELECT image.url, COUNT(DISTINCT listings.id)
+    FROM listings
+    JOIN JSON_TABLE(listings.image_urls, '$[*]' COLUMNS (url VARCHAR(255) PATH '$')) AS image
+    WHERE JSON_OVERLAPS(listings.image_urls, CAST(:urls AS JSON)) AND image.url IN :url_list
+    GROUP BY image.url
+""").bindparams(bindparam("url_list", expanding=True))
+
+
+async def reconcile_reference_counts(db: AsyncSession, batch_size: int = settings.media_gc_batch_size) -> int:
+    """Repair stored_images.ref_count drift left by listing deletions outside this service"""
+    repaired = 0
+    last_id = 0
+    while rows := (await db.execute(
+            select(StoredImage.id, StoredImage.url, StoredImage.ref_count)
+            .where(StoredImage.id > last_id)
+            .order_by(StoredImage.id)
+            .limit(batch_size)
+            .with_for_update()
+    )).all():
+        # Counted through the multi-valued index on listings.image_urls, only listings using this batch are read
+        urls = [row.url for row in rows]
+        counts = dict((await db.execute(REFERENCE_COUNTS, {"urls": json.dumps(urls), "url_list": urls})).all())
+        updates = defaultdict(list)
+        unused = []
+        for row in rows:
+            ref_count = counts.get(row.url, 0)
+            if ref_count == row.ref_count:
+                continue
+            if ref_count:
+                updates[ref_count].append(row.id)
+            else:
+                unused.append(row.url)
+            repaired += 1
+        for ref_count, ids in updates.items():
+            await db.execute(
+                update(StoredImage)
+                .where(StoredImage.id.in_(ids))
+                .values(ref_count=ref_count)
+                .execution_options(synchronize_session=False)
+            )
+        if unused:
+            await db.execute(delete(StoredImage).where(StoredImage.url.in_(unused)))
+        await db.commit()
+        await enqueue_media_deletion(unused)
+        last_id = rows[-1].id
+    return repaired
+
+
+async def _orphaned_image_keys(db: AsyncSession, keys: list[str]) -> list[str]:
+    candidates = {
+        key: [
+            storage.backend.url(f"{PurePosixPath(key).parent}/{original_stem(key)}.{extension}")
+            for extension in ORIGINAL_EXTENSIONS
+        ]
+        for key in keys
+    }
+    all_candidates = [url for urls in candidates.values() for url in urls]
+    referenced = set((await db.scalars(
+        select(StoredImage.url).where(StoredImage.url.in_(all_candidates)).with_for_update()
+    )).all())
+    return [key for key, urls in candidates.items() if not referenced.intersection(urls)]
+
+
+async def _orphaned_legacy_keys(db: AsyncSession, keys: list[str]) -> list[str]:
+    """Files uploaded before content addressing, stored under listings/<id>/"""
+    listing_ids = {int(key.split("/")[1]) for key in keys if key.split("/")[1].isdigit()}
+    rows = (await db.execute(select(Listing.id, Listing.image_urls).where(Listing.id.in_(listing_ids)))).all()
+    stems = {
+        listing_id: {PurePosixPath(url).stem for url in image_urls or []}
+        for listing_id, image_urls in rows
+    }
+    orphaned = []
+    for key in keys:
+        listing_id = key.split("/")[1]
+        if not listing_id.isdigit() or original_stem(key) not in stems.get(int(listing_id), ()):
+            orphaned.append(key)
+    return orphaned
+
+
+async def sweep_media_tree(
+        db: AsyncSession,
+        batch_size: int = settings.media_gc_batch_size,
+        grace_seconds: int = settings.media_gc_grace_seconds
+) -> int:
+    """Stream the stored files and delete unreferenced ones in batches"""
+    cutoff = time.time() - grace_seconds
+    deleted = 0
+    for prefix, find_orphans in (("images/", _orphaned_image_keys), ("listings/", _orphaned_legacy_keys)):
+        batch = []
+        async for key, modified_at in storage.backend.iter_keys(prefix):
+            # Fresh files may belong to an upload whose transaction has not committed yet
+            if modified_at > cutoff:
+                continue
+            batch.append(key)
+            if len(batch) >= batch_size:
+                orphaned = await find_orphans(db, batch)
+                await storage.backend.delete(orphaned)
+                await db.commit()
+                deleted += len(orphaned)
+                batch = []
+        if batch:
+            orphaned = await find_orphans(db, batch)
+            await storage.backend.delete(orphaned)
+            await db.commit()
+            deleted += len(orphaned)
+    return deleted
+
+
+async def collect_orphaned_media(db: AsyncSession) -> bool:
+    """One GC pass, skipped when another replica holds the lock"""
+    if not await redis.client.set(GC_LOCK_KEY, "1", nx=True, ex=settings.media_gc_interval_seconds):
+        return False
+
+    started = time.perf_counter()
+    repaired = await reconcile_reference_counts(db)
+    drained = await drain_pending_deletions(db)
+    swept = await sweep_media_tree(db)
+    logger.info(
+        f"Media GC: {repaired} reference counts repaired, {drained} queued images deleted, "
+        f"{swept} orphaned files swept in {time.perf_counter() - started:.1f}s"
+    )
+    return True
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Iterable
+from sqlalchemy import select
+from app.core.config import settings
+from app.db.database import get_listing_session
+from app.models.user import Role, Permission, RolePermission
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+
+class PermissionRegistry:
+    """Permission names mapped to bits and every role to the mask of its permissions"""
+
+    def __init__(self, max_age_seconds: float = settings.permission_registry_seconds):
+        self.max_age_seconds = max_age_seconds
+        self._bits: dict[str, int] = {}
+        self._role_masks: dict[int, int] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age_seconds
+
+    def compile(self, permission_names: Iterable[str], role_permissions: dict[int, Iterable[str]]) -> None:
+        bits = {name: 1 << position for position, name in enumerate(sorted(set(permission_names)))}
+        role_masks = {}
+        for role_id, names in role_permissions.items():
+            role_masks[role_id] = 0
+            for name in names:
+                role_masks[role_id] |= bits.get(name, 0)
+        self._bits = bits
+        self._role_masks = role_masks
+        self._loaded_at = time.monotonic()
+
+    async def _load(self) -> None:
+        async with get_listing_session() as db:
+            permission_names = (await db.scalars(select(Permission.name))).all()
+            rows = (await db.execute(
+                select(Role.id, Permission.name)
+                .join(RolePermission, RolePermission.role_id == Role.id)
+                .join(Permission, Permission.id == RolePermission.permission_id)
+            )).all()
+        role_permissions = defaultdict(list)
+        for role_id, name in rows:
+            role_permissions[role_id].append(name)
+        self.compile(permission_names, role_permissions)
+        logger.info(f"Permission registry loaded: {len(self._bits)} permissions, {len(self._role_masks)} roles")
+
+    async def role_mask(self, role_id: int) -> int:
+        if not self._is_fresh():
+            async with self._lock:
+                if not self._is_fresh():
+                    await self._load()
+        return self._role_masks.get(role_id, 0)
+
+    async def has(self, role_id: int, name: str) -> bool:
+        """One AND against the role mask, reloading first only when the masks are stale"""
+        mask = await self.role_mask(role_id)
+        return bool(mask & self._bits.get(name, 0))
+
+    def invalidate(self) -> None:
+        """Reload on the next check, after roles, permissions or role_permissions changed"""
+        self._loaded_at = None
+
+
+permission_registry = PermissionRegistry()
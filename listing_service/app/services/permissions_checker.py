@@ -1,11 +1,23 @@
 from fastapi import HTTPException, status
 from app.models.user import User
+from app.services.permission_registry import permission_registry
+from app.services.principal_cache import principal_cache
 from shared.utils.logging import setup_logging
 
 logger = setup_logging()
 
 
+async def has_permission(user: User, text: str) -> bool:
+    return await permission_registry.has(user.role_id, text)
+
+
 async def permission_checker(user: User, text:str) -> None:
-    if not any(p.name == text for p in user.role.permissions):
+    if not await has_permission(user, text):
         logger.error(f'User {user.id} does not have {text} permission')
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Access denied')
+
+
+async def permissions_changed() -> None:
+    """Call after committing changes to roles, permissions or role_permissions"""
+    permission_registry.invalidate()
+    await principal_cache.invalidate_all()
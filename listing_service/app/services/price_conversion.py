@@ -0,0 +1,38 @@
+from datetime import date, timedelta
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.exchange_rate import ExchangeRate as ExchangeRateModel
+from app.models.listing import Currency
+from app.services.exchange_rates import CURRENCIES
+
+CURRENCY_INDEX = {currency: index for index, currency in enumerate(CURRENCIES)}
+
+
+def convert_prices(
+        prices: list[float],
+        currencies: list[Currency],
+        target: Currency,
+        rates: np.ndarray) -> np.ndarray:
+    """Convert a whole page of prices to the target currency in one vector operation"""
+    source_rates = rates[np.fromiter((CURRENCY_INDEX[currency] for currency in currencies), dtype=np.intp)]
+    return np.round(np.asarray(prices, dtype=float) * source_rates / rates[CURRENCY_INDEX[target]], 2)
+
+
+async def get_rate_history(db: AsyncSession, days: int) -> list[ExchangeRateModel]:
+    result = await db.scalars(
+        select(ExchangeRateModel)
+        .where(ExchangeRateModel.created_at > date.today() - timedelta(days=days))
+        .order_by(ExchangeRateModel.created_at)
+    )
+    return list(result.all())
+
+
+def price_uah_series(original_price: float, currency: Currency, history: list[ExchangeRateModel]) -> np.ndarray:
+    """Price in UAH for every day of the rate history"""
+    if currency == Currency.UAH:
+        return np.full(len(history), round(original_price, 2))
+    sell_rates = np.array([
+        rates.sell_usd if currency == Currency.USD else rates.sell_eur for rates in history
+    ], dtype=float)
+    return np.round(original_price * sell_rates, 2)
@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import date
+import aio_pika
+from app.core.config import settings
+from app.core.redis import redis_client as redis
+from app.models.user import User, Role
+from app.services.permission_registry import permission_registry
+from shared.utils.logging import setup_logging
+from shared.utils.rabbitmq import get_rabbitmq_connection, publish_broadcast
+from shared.utils import constants as rb_const
+
+logger = setup_logging()
+
+PRINCIPAL_KEY = "principal:{}"
+VERSION_KEY = "principal:version:{}"
+GENERATION_KEY = "principal:generation"
+# Outlives any request that read a version before loading the user from the DB
+VERSION_SECONDS = 24 * 60 * 60
+
+# Write the entry only if neither the generation nor the user's version moved since the
+# caller's miss, so a principal loaded before a ban cannot land after the invalidation.
+STORE_SCRIPT = """
+if tonumber(redis.call('GET', KEYS[1]) or '0') ~= tonumber(ARGV[1])
+        or tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[4])
+return 1
+"""
+USER_FIELDS = (
+    "id", "auth_user_id", "email", "username", "is_superadmin", "is_banned",
+    "is_premium", "premium_expires_at", "listings_count", "role_id",
+)
+
+
+def principal_to_dict(user: User) -> dict:
+    """Snapshot of a user with the role loaded, permissions are checked against permission_registry"""
+    data = {field: getattr(user, field) for field in USER_FIELDS}
+    if data["premium_expires_at"] is not None:
+        data["premium_expires_at"] = data["premium_expires_at"].isoformat()
+    data["role"] = {"id": user.role.id, "name": user.role.name} if user.role else None
+    return data
+
+
+def principal_from_dict(data: dict) -> User:
+    """Fresh transient User per request, so handlers never share a mutable instance"""
+    fields = {field: data[field] for field in USER_FIELDS}
+    if fields["premium_expires_at"] is not None:
+        fields["premium_expires_at"] = date.fromisoformat(fields["premium_expires_at"])
+    if data["role"] is None:
+        return User(**fields)
+    return User(**fields, role=Role(**data["role"]))
+
+
+class PrincipalCache:
+    """Authenticated users by auth_user_id: in-process LRU in front of Redis, both with short TTLs"""
+
+    def __init__(
+            self,
+            max_size: int = settings.principal_cache_size,
+            local_seconds: float = settings.principal_cache_local_seconds,
+            shared_seconds: int = settings.principal_cache_seconds):
+        self.max_size = max_size
+        self.local_seconds = local_seconds
+        self.shared_seconds = shared_seconds
+        self._local: OrderedDict[int, tuple[float, dict]] = OrderedDict()
+        self._store_script = None
+
+    async def get(self, auth_user_id: int) -> tuple[dict | None, tuple[int, int] | None]:
+        """Cached principal, or None and the stamp to hand to set once the user is loaded"""
+        entry = self._local.get(auth_user_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._local.move_to_end(auth_user_id)
+                return entry[1], None
+            del self._local[auth_user_id]
+
+        data, stamp = await self._get_shared(auth_user_id)
+        if data is not None:
+            self._set_local(auth_user_id, data)
+        return data, stamp
+
+    async def set(self, auth_user_id: int, data: dict, stamp: tuple[int, int]) -> None:
+        """Cache a principal loaded after a miss, dropped if the user was invalidated meanwhile"""
+        if await self._set_shared(auth_user_id, data, stamp):
+            self._set_local(auth_user_id, data)
+
+    async def invalidate(self, auth_user_ids: list[int]) -> None:
+        """Drop users everywhere after a committed change to them"""
+        self.drop_local(auth_user_ids)
+        await self.drop_shared(auth_user_ids)
+        await self._broadcast({"auth_user_ids": auth_user_ids})
+
+    async def invalidate_all(self) -> None:
+        """Drop every user, for changes to roles that many users share"""
+        self.drop_local()
+        await self._bump_generation()
+        await self._broadcast({"all": True})
+
+    def drop_local(self, auth_user_ids: list[int] | None = None) -> None:
+        if auth_user_ids is None:
+            self._local.clear()
+            return
+        for auth_user_id in auth_user_ids:
+            self._local.pop(auth_user_id, None)
+
+    def _set_local(self, auth_user_id: int, data: dict) -> None:
+        self._local[auth_user_id] = (time.monotonic() + self.local_seconds, data)
+        self._local.move_to_end(auth_user_id)
+        if len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def _get_shared(self, auth_user_id: int) -> tuple[dict | None, tuple[int, int]]:
+        # Entries written before the last invalidate_all or invalidation of this user count as misses
+        generation, version, raw = await redis.client.mget(
+            GENERATION_KEY, VERSION_KEY.format(auth_user_id), PRINCIPAL_KEY.format(auth_user_id)
+        )
+        stamp = (int(generation or 0), int(version or 0))
+        if raw is None:
+            return None, stamp
+        entry = json.loads(raw)
+        if (entry["generation"], entry.get("version", 0)) != stamp:
+            return None, stamp
+        return entry["principal"], stamp
+
+    async def _set_shared(self, auth_user_id: int, data: dict, stamp: tuple[int, int]) -> bool:
+        if self._store_script is None or self._store_script.registered_client is not redis.client:
+            self._store_script = redis.client.register_script(STORE_SCRIPT)
+        generation, version = stamp
+        entry = json.dumps({"generation": generation, "version": version, "principal": data})
+        stored = await self._store_script(
+            keys=[GENERATION_KEY, VERSION_KEY.format(auth_user_id), PRINCIPAL_KEY.format(auth_user_id)],
+            args=[generation, version, entry, self.shared_seconds]
+        )
+        return bool(stored)
+
+    async def _bump_generation(self) -> None:
+        await redis.client.incr(GENERATION_KEY)
+
+    async def drop_shared(self, auth_user_ids: list[int]) -> None:
+        """Move each user's version, so writers still holding an older stamp are refused"""
+        if not auth_user_ids:
+            return
+        async with redis.client.pipeline(transaction=True) as pipe:
+            for auth_user_id in auth_user_ids:
+                pipe.incr(VERSION_KEY.format(auth_user_id))
+                pipe.expire(VERSION_KEY.format(auth_user_id), VERSION_SECONDS)
+            pipe.delete(*(PRINCIPAL_KEY.format(auth_user_id) for auth_user_id in auth_user_ids))
+            await pipe.execute()
+
+    async def _broadcast(self, data: dict) -> None:
+        try:
+            await publish_broadcast(
+                rb_const.RABBITMQ_EXCHANGE_PRINCIPAL_EVENTS, rb_const.EVENT_PRINCIPALS_INVALIDATED, data
+            )
+        except Exception as e:
+            # Other replicas still drop their copy when principal_cache_local_seconds runs out
+            logger.error(f"Error broadcasting principal invalidation: {str(e)}")
+
+
+principal_cache = PrincipalCache()
+
+
+async def listen_principal_events():
+    """Applies invalidations published by other replicas and the task service"""
+    while True:
+        try:
+            connection = await get_rabbitmq_connection()
+            async with connection:
+                channel = await connection.channel()
+                exchange = await channel.declare_exchange(
+                    rb_const.RABBITMQ_EXCHANGE_PRINCIPAL_EVENTS, aio_pika.ExchangeType.FANOUT, durable=True
+                )
+                queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+                await queue.bind(exchange)
+                async with queue.iterator() as queue_iter:
+                    async for message in queue_iter:
+                        async with message.process():
+                            payload = json.loads(message.body.decode())
+                            if payload.get("type") != rb_const.EVENT_PRINCIPALS_INVALIDATED:
+                                continue
+                            data = payload.get("data") or {}
+                            if data.get("all"):
+                                principal_cache.drop_local()
+                                permission_registry.invalidate()
+                            else:
+                                auth_user_ids = data.get("auth_user_ids") or []
+                                principal_cache.drop_local(auth_user_ids)
+                                # The task service has no Redis access, so the shared copy is dropped here
+                                await principal_cache.drop_shared(auth_user_ids)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error consuming principal events: {str(e)}")
+            await asyncio.sleep(5)
@@ -1,8 +1,24 @@
-from datetime import date
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.exchange_rate import ExchangeRate as ExchangeRateModel
 from app.models.listing import Listing, Currency
+from app.services.exchange_rates import exchange_rate_provider, ExchangeRates
+
+
+async def get_exchange_rates(db: AsyncSession) -> ExchangeRates | None:
+    """Cached latest rates, the most recent day is used when today's rates are missing"""
+    return await exchange_rate_provider.get(db)
+
+
+def convert_to_uah(price: float, currency: Currency, exchange_rates: ExchangeRates | None) -> float | None:
+    """Convert a price to UAH with already loaded exchange rates"""
+    if currency == Currency.UAH:
+        return price
+    if not exchange_rates:
+        return None
+    if currency == Currency.USD:
+        return price * exchange_rates.sell_usd
+    if currency == Currency.EUR:
+        return price * exchange_rates.sell_eur
+    return None
 
 
 async def create_price_uah(
@@ -10,10 +26,7 @@ async def create_price_uah(
         original_price: float | None,
         original_currency: Currency | None,
         listing: Listing | None = None):
-    today = date.today()
-    exchange_rates: ExchangeRateModel = await db.scalar(select(ExchangeRateModel).where(
-        ExchangeRateModel.created_at == today
-    ))
+    exchange_rates = await get_exchange_rates(db)
 
     if listing and original_price and original_price == listing.original_price and original_currency and original_currency == listing.original_currency:
         return None
@@ -23,25 +36,10 @@ async def create_price_uah(
 
     if exchange_rates:
         if original_price and original_currency:
-            if original_currency == Currency.UAH:
-                return original_price
-            elif original_currency == Currency.USD:
-                return original_price * exchange_rates.sell_usd
-            elif original_currency == Currency.EUR:
-                return original_price * exchange_rates.sell_eur
+            return convert_to_uah(original_price, original_currency, exchange_rates)
         elif original_price:
-            if listing.original_currency == Currency.UAH:
-                return original_price
-            elif listing.original_currency == Currency.USD:
-                return original_price * exchange_rates.sell_usd
-            elif listing.original_currency == Currency.EUR:
-                return original_price * exchange_rates.sell_eur
+            return convert_to_uah(original_price, listing.original_currency, exchange_rates)
         elif original_currency:
-            if original_currency == Currency.UAH:
-                return listing.original_price
-            elif original_currency == Currency.USD:
-                return listing.original_price * exchange_rates.sell_usd
-            elif original_currency == Currency.EUR:
-                return listing.original_price * exchange_rates.sell_eur
+            return convert_to_uah(listing.original_price, original_currency, exchange_rates)
 
     return None
@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+from PIL import Image
+
+MAX_IMAGE_SIZE = (1024, 720)
+
+IMAGE_SIGNATURES = {
+    b"\xff\xd8\xff": "JPEG",
+    b"\x89PNG\r\n\x1a\n": "PNG",
+}
+
+
+def sniff_image_format(header: bytes) -> str | None:
+    """Detect the image format from the leading magic bytes"""
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+def probe_image_size(file_path: str) -> tuple[int, int]:
+    """Read image dimensions from the header without decoding pixel data"""
+    with Image.open(file_path) as image:
+        return image.size
+
+
+def process_image(source_path: str, file_path: str, image_format: str) -> None:
+    """Decode, downscale and save an image. Runs inside a storage worker process."""
+    with Image.open(source_path) as source:
+        # JPEG can be decoded at 1/2, 1/4 or 1/8 scale, far cheaper for big photos
+        source.draft("RGB", MAX_IMAGE_SIZE)
+        image = source.convert("RGB")
+    image.thumbnail(MAX_IMAGE_SIZE, Image.Resampling.LANCZOS)
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        image.save(f, format=image_format, optimize=True, quality=85)
+    os.replace(tmp_path, file_path)
+
+
+DERIVATIVE_SIZES = {
+    "thumb": (320, 240),
+    "card": (640, 480),
+    "full": MAX_IMAGE_SIZE,
+}
+
+
+def derivative_file_names(source_name: str) -> dict[str, tuple[str, str]]:
+    """Same-format and WebP file names of every derivative of a stored image"""
+    source = Path(source_name)
+    return {
+        name: (
+            source.name if name == "full" else f"{source.stem}_{name}{source.suffix}",
+            f"{source.stem}_{name}.webp"
+        )
+        for name in DERIVATIVE_SIZES
+    }
+
+
+def build_derivatives(file_path: str, output_dir: str) -> dict[str, dict]:
+    """Write resized copies and WebP variants of an image into output_dir, return their file names and widths"""
+    output = Path(output_dir)
+    variants = {}
+    with Image.open(file_path) as image:
+        image_format = image.format
+        for name, (src, webp) in derivative_file_names(Path(file_path).name).items():
+            resized = image.copy()
+            resized.thumbnail(DERIVATIVE_SIZES[name], Image.Resampling.LANCZOS)
+            if name != "full":
+                resized.save(output / src, format=image_format, optimize=True, quality=85)
+            resized.save(output / webp, format="WEBP", quality=80, method=4)
+            variants[name] = {"width": resized.width, "src": src, "webp": webp}
+    return variants
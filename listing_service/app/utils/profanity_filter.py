@@ -1,14 +1,150 @@
+import hashlib
 import re
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable
+import ahocorasick
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
 from app.core.redis import redis_client
 from better_profanity import profanity
 from shared.utils.logging import setup_logging
 
 logger = setup_logging()
 
+# Symbols only: digits next to letters are model codes (A55, X5, i30, 370z), not leetspeak
+LEET_MAP = str.maketrans({"@": "a", "!": "i", "|": "l", "$": "s", "+": "t"})
+# Cyrillic letters that render like Latin ones, folded the same way in words and text
+HOMOGLYPH_MAP = str.maketrans({
+    "а": "a", "в": "b", "е": "e", "ё": "e", "з": "3", "і": "i", "ї": "i", "ј": "j", "к": "k",
+    "м": "m", "н": "h", "о": "o", "р": "p", "с": "c", "т": "t", "у": "y", "х": "x", "ѕ": "s",
+})
+COMBINING_MARK_RE = re.compile(r"[\u0300-\u036f]")
+LEET_CHUNK_RE = re.compile(r"(?<!\S)[^\s@!|$+]*[@!|$+]\S*")
+LETTER_RE = re.compile(r"[^\W\d_]")
+DIGIT_RE = re.compile(r"\d")
+TRAILING_PUNCTUATION = "!?.,;:'\")]"
+SPELLED_RE = re.compile(r"(?<![^\W_])[^\W_](?:[\W_]+[^\W_](?![^\W_]))+")
+SEPARATOR_RE = re.compile(r"[\W_]+")
+LONG_RUN_RE = re.compile(r"([^\W\d_])\1{2,}")
+RUN_RE = re.compile(r"([^\W\d_])\1+")
 
-def tokenize(text: str) -> set[str]:
-    return set(re.findall(r"\b\w+\b", text.lower()))
+
+def _leet(match: re.Match) -> str:
+    chunk = match.group()
+    if not LETTER_RE.search(chunk) or DIGIT_RE.search(chunk):
+        return chunk
+    # "great car!" ends a sentence, it does not spell "cari"
+    word = chunk.rstrip(TRAILING_PUNCTUATION)
+    return word.translate(LEET_MAP) + chunk[len(word):]
+
+
+def _join_spelled(match: re.Match) -> str:
+    return SEPARATOR_RE.sub("", match.group())
+
+
+def _canonical(text: str) -> str:
+    text = text.casefold()
+    if not text.isascii():
+        text = COMBINING_MARK_RE.sub("", unicodedata.normalize("NFKD", text)).translate(HOMOGLYPH_MAP)
+    # Leetspeak only inside chunks of letters and symbols, so prices, years and model codes stay as written
+    text = LEET_CHUNK_RE.sub(_leet, text)
+    text = SPELLED_RE.sub(_join_spelled, text)
+    return SEPARATOR_RE.sub(" ", f" {text} ")
+
+
+def tokenize(text: str) -> list[str]:
+    """Folded tokens of a text, with spaced-out letters ("b a d", "b.a.d") joined back into one token"""
+    return _canonical(text).split()
+
+
+def normalize_text(text: str) -> str:
+    """Space-delimited token stream the matcher scans, stretched tokens ("baaad") also added collapsed ("bad")"""
+    text = _canonical(text)
+    if not LONG_RUN_RE.search(text):
+        return text
+    collapsed = [RUN_RE.sub(r"\1", token) for token in text.split() if LONG_RUN_RE.search(token)]
+    return LONG_RUN_RE.sub(r"\1\1", f"{text}{' '.join(collapsed)} ")
+
+
+@lru_cache(maxsize=1)
+def default_censor_words() -> frozenset[str]:
+    """better_profanity's bundled word list, loaded once per process"""
+    profanity.load_censor_words()
+    return frozenset(str(w).lower() for w in profanity.CENSOR_WORDSET)
+
+
+class ProfanityMatcher:
+    """Aho-Corasick automaton over the normalized censor words, one linear scan per text"""
+
+    def __init__(
+            self,
+            words: set[str],
+            version: int,
+            embeddable_words: Iterable[str] = settings.profanity_embeddable_words,
+            max_text_length: int = settings.profanity_max_text_length,
+            verdict_cache_size: int = settings.profanity_verdict_cache_size):
+        self.version = version
+        self.max_text_length = max_text_length
+        embeddable_words = {w.lower() for w in embeddable_words}
+        # Verdicts live and die with the matcher, so a word-set change starts from an empty cache
+        self._verdicts: OrderedDict[bytes, bool] = OrderedDict()
+        self._verdict_cache_size = verdict_cache_size
+        self.words = frozenset(w.lower() for w in words) | default_censor_words()
+        self._automaton = ahocorasick.Automaton()
+        for word in self.words:
+            tokens = [LONG_RUN_RE.sub(r"\1\1", token) for token in tokenize(word)]
+            if not tokens:
+                continue
+            self._automaton.add_word(f" {' '.join(tokens)} ", word)
+            # Words hide inside innocent ones ("classic", "therapist"), so only listed stems match inside tokens
+            if word in embeddable_words:
+                self._automaton.add_word("".join(tokens), word)
+        self._automaton.make_automaton()
+
+    def find(self, text: str | None) -> str | None:
+        """First censor word found in text, if any"""
+        if not text or not len(self._automaton):
+            return None
+        # Every step is linear, the cap bounds the work one request can cause on the event loop
+        for _, word in self._automaton.iter(normalize_text(text[:self.max_text_length])):
+            return word
+        return None
+
+    def is_clean(self, text: str | None) -> bool:
+        if not text:
+            return True
+        # Normalization starts with casefold, so equal casefolded texts always get the same verdict
+        key = hashlib.blake2b(text.casefold().encode(), digest_size=16).digest()
+        verdict = self._verdicts.get(key)
+        if verdict is not None:
+            self._verdicts.move_to_end(key)
+            return verdict
+        verdict = self.find(text) is None
+        self._verdicts[key] = verdict
+        if len(self._verdicts) > self._verdict_cache_size:
+            self._verdicts.popitem(last=False)
+        return verdict
+
+
+_matcher: ProfanityMatcher | None = None
+
+
+async def get_profanity_matcher(db: AsyncSession) -> ProfanityMatcher:
+    """In-process matcher, rebuilt only when the word-set version in Redis moves"""
+    global _matcher
+    version = await redis_client.get_version()
+    if _matcher is None or _matcher.version != version:
+        redis_words = await redis_client.get_cache(db)
+        _matcher = ProfanityMatcher(redis_words, version)
+        logger.info(f"Profanity matcher rebuilt: {len(_matcher.words)} words, version {version}")
+    return _matcher
+
+
+def reset_profanity_matcher() -> None:
+    global _matcher
+    _matcher = None
 
 
 async def profanity_filter(
@@ -16,13 +152,5 @@ async def profanity_filter(
         title: str | None,
         db: AsyncSession) ->bool:
     """Filter profanity words from description and title"""
-    description = (description or '').lower()
-    title = (title or '').lower()
-    desc_words = tokenize(description)
-    title_words = tokenize(title)
-    redis_words = await redis_client.get_cache(db)
-    profanity.load_censor_words()
-    extended_words = set(str(w) for w in profanity.CENSOR_WORDSET).union(redis_words)
-    all_censor_words = {w.lower() for w in extended_words}
-
-    return desc_words.isdisjoint(all_censor_words) and title_words.isdisjoint(all_censor_words)
+    matcher = await get_profanity_matcher(db)
+    return matcher.is_clean(description) and matcher.is_clean(title)
@@ -1,54 +1,229 @@
+import asyncio
+import hashlib
+import multiprocessing
+import shutil
 import uuid
-import io
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from fastapi import UploadFile
-from PIL import Image
+from fastapi import UploadFile, HTTPException, status
 from app.core.config import settings
+from PIL import Image
+from app.utils.image_processing import (
+    process_image,
+    build_derivatives,
+    derivative_file_names,
+    sniff_image_format,
+    probe_image_size
+)
+from app.utils.storage_backends import StorageBackend, create_storage_backend
+from shared.utils.logging import setup_logging
+
+logger = setup_logging()
+
+
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+def content_type_for(file_name: str) -> str:
+    return CONTENT_TYPES.get(file_name.rsplit(".", 1)[-1], "application/octet-stream")
 
 
 class Storage:
-    def __init__(self, media_root: str = settings.media_root):
+    def __init__(
+            self,
+            media_root: str = settings.media_root,
+            backend: StorageBackend | None = None,
+            workers: int = settings.image_workers,
+            max_concurrency: int = settings.image_max_concurrency,
+            timeout: float = settings.image_timeout_seconds,
+            max_upload_bytes: int = settings.image_max_upload_bytes,
+            max_pixels: int = settings.image_max_pixels,
+            chunk_size: int = settings.image_upload_chunk_size):
         self.media_root = Path(media_root)
         self.media_root.mkdir(parents=True, exist_ok=True)
+        self.upload_dir = self.media_root / ".uploads"
+        self.upload_dir.mkdir(exist_ok=True)
+        self.backend = backend or create_storage_backend(self.media_root)
+        self.workers = workers
+        self.timeout = timeout
+        self.max_upload_bytes = max_upload_bytes
+        self.max_pixels = max_pixels
+        self.chunk_size = chunk_size
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor: ProcessPoolExecutor | None = None
 
-    async def save_images(self, listing_id: int, files: list[UploadFile]) -> list[str]:
-        listing_dir = self.media_root / f"listings/{listing_id}"
-        listing_dir.mkdir(parents=True, exist_ok=True)
-        urls = []
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """Image worker pool, started on first upload"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
 
-        for file in files:
-            contents = await file.read()
+    async def _run_in_pool(self, func, *args):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, func, *args),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Image processing timed out after {self.timeout}s: {args[-1]}")
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Image processing timed out")
+            except BrokenProcessPool:
+                logger.error("Image worker pool is broken, restarting it")
+                self._executor = None
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Image processing failed")
 
-            image = Image.open(io.BytesIO(contents)).convert("RGB")
+    async def _process_image(self, upload_path: Path, key: str, image_format: str) -> None:
+        output_path = self.upload_dir / f"{uuid.uuid4()}.{key.rsplit('.', 1)[-1]}"
+        try:
+            await self._run_in_pool(process_image, str(upload_path), str(output_path), image_format)
+            await self.backend.save(key, output_path, content_type_for(key))
+        finally:
+            output_path.unlink(missing_ok=True)
 
-            image.thumbnail((1024, 720), Image.Resampling.LANCZOS)
+    async def _receive_upload(self, file: UploadFile) -> tuple[Path, str, str]:
+        """Stream an upload to disk through the size cap, return its path, content hash and format"""
+        upload_path = self.upload_dir / f"{uuid.uuid4()}.upload"
+        digest = hashlib.sha256()
+        image_format = None
+        size = 0
+        try:
+            with open(upload_path, "wb") as f:
+                while chunk := await file.read(self.chunk_size):
+                    if image_format is None:
+                        image_format = sniff_image_format(chunk)
+                        if image_format is None:
+                            break
+                    size += len(chunk)
+                    if size > self.max_upload_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail=f"Image is too large: {file.filename}"
+                        )
+                    digest.update(chunk)
+                    f.write(chunk)
+            if image_format is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid file format: {file.filename}")
 
-            extension = file.filename.split('.')[-1].lower() if '.' in file.filename else 'jpg'
-            if extension not in ['jpg', 'jpeg', 'png']:
-                extension = 'jpg'
+            try:
+                width, height = probe_image_size(str(upload_path))
+            except (OSError, Image.DecompressionBombError):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid image: {file.filename}")
+            if width * height > self.max_pixels:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Image resolution is too large: {file.filename}"
+                )
+        except BaseException:
+            upload_path.unlink(missing_ok=True)
+            raise
+        return upload_path, digest.hexdigest(), image_format
 
-            filename = f"{uuid.uuid4()}.{extension}"
-            file_path = listing_dir / filename
+    async def save_images(
+            self,
+            files: list[UploadFile],
+            claim: Callable[[list[str]], Awaitable[None]] | None = None
+    ) -> list[str]:
+        """Store uploads under their content hash, identical images are processed and written once
 
-            with file_path.open("wb") as f:
-                image.save(
-                    f,
-                    format='JPEG' if extension in ['jpg', 'jpeg'] else 'PNG',
-                    optimize=True,
-                    quality=85
-                )
+        claim is awaited with the urls before existing files are reused, so the caller can lock
+        their records against the media GC first.
+        """
+        uploads = []
+        try:
+            for file in files:
+                uploads.append(await self._receive_upload(file))
 
-            url = f"{settings.media_url.rstrip('/')}/listings/{listing_id}/{filename}"
-            urls.append(url)
+            keys = {}
+            for upload_path, digest, image_format in uploads:
+                extension = 'jpg' if image_format == 'JPEG' else 'png'
+                keys.setdefault(f"images/{digest[:2]}/{digest}.{extension}", (upload_path, image_format))
+            urls = [self.backend.url(key) for key in keys]
+            if claim is not None:
+                await claim(urls)
 
+            jobs = [
+                asyncio.ensure_future(self._process_image(upload_path, key, image_format))
+                for key, (upload_path, image_format) in keys.items()
+                if not await self.backend.exists(key)
+            ]
+            try:
+                await asyncio.gather(*jobs)
+            except BaseException:
+                # Siblings still read their uploads, stop them before the files are removed below
+                for job in jobs:
+                    job.cancel()
+                await asyncio.gather(*jobs, return_exceptions=True)
+                raise
+        finally:
+            for upload_path, _, _ in uploads:
+                upload_path.unlink(missing_ok=True)
         return urls
 
-    def delete_images(self, urls: list[str]) -> None:
-        for url in urls:
-            relative_path = url.replace(settings.media_url, "")
-            file_path = self.media_root / relative_path.lstrip("/")
-            if file_path.exists():
-                file_path.unlink()
+    async def _build_derivatives(self, key: str) -> dict[str, dict]:
+        """Render the variants of one stored image unless a listing sharing it already did"""
+        prefix = key.rsplit("/", 1)[0]
+        file_names = derivative_file_names(key)
+        webp_keys = [f"{prefix}/{webp}" for _, webp in file_names.values()]
+        if all(await asyncio.gather(*(self.backend.exists(webp_key) for webp_key in webp_keys))):
+            variants = {}
+            for (name, (src, webp)), webp_key in zip(file_names.items(), webp_keys):
+                async with self.backend.local_copy(webp_key) as webp_path:
+                    width, _ = probe_image_size(str(webp_path))
+                variants[name] = {"width": width, "src": src, "webp": webp}
+            return variants
+
+        output_dir = self.upload_dir / uuid.uuid4().hex
+        output_dir.mkdir()
+        try:
+            async with self.backend.local_copy(key) as source_path:
+                variants = await self._run_in_pool(build_derivatives, str(source_path), str(output_dir))
+            for file in output_dir.iterdir():
+                await self.backend.save(f"{prefix}/{file.name}", file, content_type_for(file.name))
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+        return variants
+
+    async def build_derivatives(self, urls: list[str]) -> dict[str, dict]:
+        """Generate resized and WebP variants for saved images, keyed by original url"""
+        keys = [self.backend.key_from_url(url) for url in urls]
+        results = await asyncio.gather(*(self._build_derivatives(key) for key in keys))
+        image_variants = {}
+        for url, key, variants in zip(urls, keys, results):
+            prefix = key.rsplit("/", 1)[0]
+            image_variants[url] = {
+                name: {
+                    "width": variant["width"],
+                    "src": self.backend.url(f"{prefix}/{variant['src']}"),
+                    "webp": self.backend.url(f"{prefix}/{variant['webp']}")
+                }
+                for name, variant in variants.items()
+            }
+        return image_variants
+
+    async def delete_images(self, urls: list[str]) -> None:
+        keys = [self.backend.key_from_url(url) for url in urls]
+        await self.backend.delete(keys)
+        for key in keys:
+            await self.backend.delete_prefix(f"{key.rsplit('.', 1)[0]}_")
+
+    async def shutdown(self) -> None:
+        """Stop the image worker pool and release backend connections"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        await self.backend.close()
 
 
 storage = Storage()
@@ -0,0 +1,258 @@
+import asyncio
+import os
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, AsyncExitStack
+from pathlib import Path
+from typing import AsyncIterator
+from aiobotocore.config import AioConfig
+from aiobotocore.session import get_session
+from botocore.exceptions import ClientError
+from app.core.config import settings
+from app.media import IMMUTABLE_CACHE_CONTROL
+
+S3_DELETE_BATCH_SIZE = 1000
+
+
+class StorageBackend(ABC):
+    """Where processed media ends up. Keys are relative paths like images/ab/<digest>.jpg"""
+
+    @abstractmethod
+    async def save(self, key: str, source: Path, content_type: str) -> None:
+        """Move a finished local file into the backend under key, the source file is consumed"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, keys: list[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        ...
+
+    @abstractmethod
+    def iter_keys(self, prefix: str) -> AsyncIterator[tuple[str, float]]:
+        """Stream (key, modified timestamp) of every stored file under prefix"""
+
+    @abstractmethod
+    def local_copy(self, key: str) -> AsyncIterator[Path]:
+        """Async context manager yielding a readable local path of the stored file"""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> str:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class LocalStorageBackend(StorageBackend):
+    def __init__(self, media_root: str | Path, media_url: str = settings.media_url):
+        self.media_root = Path(media_root)
+        self.media_url = media_url.rstrip("/")
+
+    async def save(self, key: str, source: Path, content_type: str) -> None:
+        target = self.media_root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    async def exists(self, key: str) -> bool:
+        return (self.media_root / key).exists()
+
+    async def delete(self, keys: list[str]) -> None:
+        for key in keys:
+            (self.media_root / key).unlink(missing_ok=True)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        target = self.media_root / prefix
+        if prefix.endswith("/"):
+            await asyncio.to_thread(shutil.rmtree, target, ignore_errors=True)
+            return
+        for path in target.parent.glob(f"{target.name}*"):
+            path.unlink(missing_ok=True)
+
+    async def iter_keys(self, prefix: str) -> AsyncIterator[tuple[str, float]]:
+        directories = [self.media_root / prefix] if (self.media_root / prefix).is_dir() else []
+        while directories:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(Path(entry.path))
+                    elif entry.is_file(follow_symlinks=False):
+                        key = Path(entry.path).relative_to(self.media_root).as_posix()
+                        yield key, entry.stat().st_mtime
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        yield self.media_root / key
+
+    def url(self, key: str) -> str:
+        return f"{self.media_url}/{key}"
+
+    def key_from_url(self, url: str) -> str:
+        return url.replace(self.media_url, "", 1).lstrip("/")
+
+
+class S3StorageBackend(StorageBackend):
+    """S3-compatible object store (AWS S3, MinIO) sharing one pooled client per process"""
+
+    def __init__(
+            self,
+            bucket: str,
+            public_url: str,
+            work_dir: str | Path,
+            endpoint_url: str | None = None,
+            region_name: str | None = None,
+            access_key_id: str | None = None,
+            secret_access_key: str | None = None,
+            max_pool_connections: int = 20,
+            multipart_threshold: int = 8 * 1024 * 1024,
+            part_size: int = 8 * 1024 * 1024):
+        self.bucket = bucket
+        self.public_url = public_url.rstrip("/")
+        self.work_dir = Path(work_dir)
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self._client_kwargs = {
+            "endpoint_url": endpoint_url,
+            "region_name": region_name,
+            "aws_access_key_id": access_key_id,
+            "aws_secret_access_key": secret_access_key,
+            "config": AioConfig(max_pool_connections=max_pool_connections),
+        }
+        self._session = get_session()
+        self._exit_stack = AsyncExitStack()
+        self._client = None
+        self._client_lock = asyncio.Lock()
+
+    async def _get_client(self):
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    self._client = await self._exit_stack.enter_async_context(
+                        self._session.create_client("s3", **self._client_kwargs)
+                    )
+        return self._client
+
+    async def save(self, key: str, source: Path, content_type: str) -> None:
+        client = await self._get_client()
+        try:
+            if source.stat().st_size < self.multipart_threshold:
+                await client.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=source.read_bytes(),
+                    ContentType=content_type,
+                    CacheControl=IMMUTABLE_CACHE_CONTROL
+                )
+            else:
+                await self._multipart_upload(client, key, source, content_type)
+        finally:
+            source.unlink(missing_ok=True)
+
+    async def _multipart_upload(self, client, key: str, source: Path, content_type: str) -> None:
+        upload = await client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType=content_type, CacheControl=IMMUTABLE_CACHE_CONTROL
+        )
+        upload_id = upload["UploadId"]
+        parts = []
+        try:
+            with open(source, "rb") as f:
+                while chunk := f.read(self.part_size):
+                    part_number = len(parts) + 1
+                    response = await client.upload_part(
+                        Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=chunk
+                    )
+                    parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            await client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except Exception:
+            await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def exists(self, key: str) -> bool:
+        client = await self._get_client()
+        try:
+            await client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def delete(self, keys: list[str]) -> None:
+        client = await self._get_client()
+        for start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[start:start + S3_DELETE_BATCH_SIZE]
+            await client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+            )
+
+    async def delete_prefix(self, prefix: str) -> None:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            keys = [item["Key"] for item in page.get("Contents", [])]
+            if keys:
+                await self.delete(keys)
+
+    async def iter_keys(self, prefix: str) -> AsyncIterator[tuple[str, float]]:
+        client = await self._get_client()
+        paginator = client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield item["Key"], item["LastModified"].timestamp()
+
+    @asynccontextmanager
+    async def local_copy(self, key: str) -> AsyncIterator[Path]:
+        client = await self._get_client()
+        download_dir = self.work_dir / uuid.uuid4().hex
+        download_dir.mkdir(parents=True)
+        target = download_dir / Path(key).name
+        try:
+            response = await client.get_object(Bucket=self.bucket, Key=key)
+            async with response["Body"] as stream:
+                with open(target, "wb") as f:
+                    while chunk := await stream.read(self.part_size):
+                        f.write(chunk)
+            yield target
+        finally:
+            shutil.rmtree(download_dir, ignore_errors=True)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def key_from_url(self, url: str) -> str:
+        return url.replace(self.public_url, "", 1).lstrip("/")
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+        self._client = None
+
+
+def create_storage_backend(media_root: str | Path = settings.media_root) -> StorageBackend:
+    """Build the backend selected by settings.storage_backend"""
+    if settings.storage_backend == "s3":
+        return S3StorageBackend(
+            bucket=settings.s3_bucket,
+            public_url=settings.s3_public_url,
+            work_dir=Path(media_root) / ".uploads",
+            endpoint_url=settings.s3_endpoint_url,
+            region_name=settings.s3_region,
+            access_key_id=settings.s3_access_key_id,
+            secret_access_key=settings.s3_secret_access_key,
+            max_pool_connections=settings.s3_max_pool_connections,
+            multipart_threshold=settings.s3_multipart_threshold,
+            part_size=settings.s3_part_size
+        )
+    return LocalStorageBackend(media_root)
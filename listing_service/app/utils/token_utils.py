@@ -1,17 +1,22 @@
 from jose import jwt, JWTError
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone
 from fastapi import HTTPException, Header, Depends
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
 from shared.utils.logging import setup_logging
+from shared.utils.revocation import RevocationFilter
 from app.core.config import settings
+from app.core.redis import redis_client
 from app.db.database import get_listing_db
-from app.models.user import User, Role
+from app.models.user import User
+from app.services.principal_cache import principal_cache, principal_from_dict, principal_to_dict
 
 logger = setup_logging()
 
+revocation_filter = RevocationFilter(redis_client.client)
+
 
 async def get_user_from_token(
         authorization: str = Header(..., alias='Authorization'),
@@ -43,9 +48,21 @@ async def get_user_from_token(
             logger.error("Token payload missing email or user_id")
             raise HTTPException(status.HTTP_401_UNAUTHORIZED, 'You need to be logged')
 
-        user = await db.scalar(select(User).where(User.auth_user_id == int(user_id)).options(
-            selectinload(User.role).selectinload(Role.permissions)
-        ))
+        # Access tokens are stateless, a revoked one is only known to the filter
+        jti = payload.get("jti")
+        if not jti or await revocation_filter.is_revoked(jti):
+            logger.error("Token revoked or without jti")
+            raise HTTPException(status.HTTP_401_UNAUTHORIZED, 'You need to be logged')
+
+        principal, stamp = await principal_cache.get(int(user_id))
+        if principal:
+            user = principal_from_dict(principal)
+        else:
+            user = await db.scalar(select(User).where(User.auth_user_id == int(user_id)).options(
+                selectinload(User.role)
+            ))
+            if user:
+                await principal_cache.set(user.auth_user_id, principal_to_dict(user), stamp)
 
         if not user or user.email != email:
             logger.error("User not found or email mismatch")
@@ -55,13 +72,6 @@ async def get_user_from_token(
             logger.error("User banned")
             raise HTTPException(status.HTTP_403_FORBIDDEN, 'Your account is banned')
 
-        today = date.today()
-        if user.is_premium and user.premium_expires_at < today:
-            user.is_premium = False
-            user.premium_expires_at = None
-            await db.commit()
-            await db.refresh(user)
-
         return user
 
     except JWTError as e:
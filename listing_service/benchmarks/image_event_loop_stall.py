@@ -0,0 +1,84 @@
+"""Measure how long image uploads stall the event loop.
+
+Processes the same batch of large JPEG uploads inline on the event loop
+(the old Storage.save_images behaviour) and through the Storage worker pool,
+while a ticker coroutine records how late each of its 5 ms wake-ups is.
+
+Run from listing_service/ with the service env loaded:
+    poetry run python -m benchmarks.image_event_loop_stall
+"""
+import asyncio
+import io
+import tempfile
+import time
+from pathlib import Path
+from fastapi import UploadFile
+from PIL import Image
+from app.utils.image_processing import process_image
+from app.utils.storage import Storage
+
+TICK_SECONDS = 0.005
+UPLOADS = 8
+
+
+def make_upload() -> UploadFile:
+    image = Image.effect_noise((4000, 3000), 64).convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    buffer.seek(0)
+    return UploadFile(filename="car.jpg", file=buffer)
+
+
+async def ticker(stop: asyncio.Event, lags: list[float]) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def inline_upload(media_root: str, files: list[UploadFile]) -> None:
+    for index, file in enumerate(files):
+        # process_image reads from a path, spool the upload the way Storage does
+        source_path = Path(media_root) / f"{index}.upload"
+        source_path.write_bytes(await file.read())
+        try:
+            process_image(str(source_path), str(Path(media_root) / f"{index}.jpg"), "JPEG")
+        finally:
+            source_path.unlink()
+
+
+async def pool_upload(storage: Storage, files: list[UploadFile]) -> None:
+    await asyncio.gather(*(storage.save_images([file]) for file in files))
+
+
+async def measure(name: str, upload) -> None:
+    stop = asyncio.Event()
+    lags: list[float] = []
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    started = time.perf_counter()
+    await upload()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick_task
+    print(
+        f"{name:>6}: wall {elapsed * 1000:8.1f} ms | "
+        f"max loop stall {max(lags, default=0) * 1000:8.1f} ms | "
+        f"total stall {sum(lags) * 1000:8.1f} ms"
+    )
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as media_root:
+        storage = Storage(media_root=media_root)
+        await storage.save_images([make_upload()])  # start the worker pool
+
+        inline_files = [make_upload() for _ in range(UPLOADS)]
+        pool_files = [make_upload() for _ in range(UPLOADS)]
+        await measure("inline", lambda: inline_upload(media_root, inline_files))
+        await measure("pool", lambda: pool_upload(storage, pool_files))
+        await storage.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
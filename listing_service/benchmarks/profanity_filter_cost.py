@@ -0,0 +1,64 @@
+"""Measure the per-call cost of the profanity check.
+
+Compares the old profanity_filter, which reloaded better_profanity's word list
+and rebuilt the merged set on every call, with the compiled in-process matcher
+(normalization pipeline plus one Aho-Corasick scan) on new text and on text
+whose verdict is already cached.
+Redis is replaced by an in-memory stand-in so only the CPU cost is compared;
+against a real Redis the old path also paid an SMEMBERS of the whole word set
+where the new one pays a single GET of the version counter.
+
+Run from listing_service/ with the service env loaded:
+    poetry run python -m benchmarks.profanity_filter_cost
+"""
+import asyncio
+import re
+import time
+from unittest.mock import patch
+from better_profanity import profanity
+from app.utils.profanity_filter import profanity_filter
+
+CALLS = 200
+DB_WORDS = {f"customword{i}" for i in range(500)}
+TITLE = "BMW X5 2019, one owner"
+DESCRIPTION = "Well maintained car with full service history, new tyres and a clean interior. " * 10
+
+
+class InMemoryWords:
+    async def get_cache(self, db) -> set[str]:
+        return set(DB_WORDS)
+
+    async def get_version(self) -> int:
+        return 1
+
+
+def old_tokenize(text: str) -> set[str]:
+    return set(re.findall(r"\b\w+\b", text.lower()))
+
+
+async def old_profanity_filter(description: str, title: str) -> bool:
+    redis_words = await InMemoryWords().get_cache(None)
+    profanity.load_censor_words()
+    extended_words = set(str(w) for w in profanity.CENSOR_WORDSET).union(redis_words)
+    censor_words = {w.lower() for w in extended_words}
+    return old_tokenize(description).isdisjoint(censor_words) and old_tokenize(title).isdisjoint(censor_words)
+
+
+async def measure(name: str, check) -> None:
+    await check(-1)  # warm up: the new matcher is built on the first call
+    started = time.perf_counter()
+    for index in range(CALLS):
+        await check(index)
+    per_call = (time.perf_counter() - started) / CALLS
+    print(f"{name:>8}: {per_call * 1_000_000:10.1f} us per call")
+
+
+async def main() -> None:
+    with patch("app.utils.profanity_filter.redis_client", InMemoryWords()):
+        await measure("old", lambda index: old_profanity_filter(f"{DESCRIPTION} {index}", TITLE))
+        await measure("compiled", lambda index: profanity_filter(f"{DESCRIPTION} {index}", TITLE, None))
+        await measure("cached", lambda index: profanity_filter(DESCRIPTION, TITLE, None))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
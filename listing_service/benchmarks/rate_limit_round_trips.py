@@ -0,0 +1,72 @@
+"""Compare Redis round trips and throughput of attempt counters.
+
+Runs the old GET/INCR/EXPIRE profanity-attempt check and the single-EVALSHA
+limiters from shared.utils.rate_limit against the configured Redis, with many
+concurrent callers hammering a small set of keys.
+
+Run from listing_service/ with the service env loaded and Redis up:
+    poetry run python -m benchmarks.rate_limit_round_trips
+"""
+import asyncio
+import time
+import redis.asyncio as redis
+from app.core.config import settings
+from shared.utils.rate_limit import fixed_window, sliding_window, token_bucket
+
+CHECKS = 20000
+CONCURRENCY = 50
+KEYS = 100
+PREFIX = "benchmark:rate_limit"
+
+
+async def old_attempts(client: redis.Redis, key: str) -> bool:
+    attempts = await client.get(key)
+    attempts = int(attempts) if attempts else 0
+    if attempts >= 1_000_000:
+        return False
+    await client.incr(key)
+    await client.expire(key, 60)
+    return True
+
+
+async def measure(name: str, client: redis.Redis, check) -> None:
+    commands = 0
+    execute_command = client.execute_command
+
+    async def counting_execute_command(*args, **kwargs):
+        nonlocal commands
+        commands += 1
+        return await execute_command(*args, **kwargs)
+
+    client.execute_command = counting_execute_command
+    queue = iter(range(CHECKS))
+
+    async def worker():
+        for index in queue:
+            await check(client, f"{PREFIX}:{name}:{index % KEYS}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    elapsed = time.perf_counter() - started
+    client.execute_command = execute_command
+    print(
+        f"{name:>14}: {commands / CHECKS:4.1f} round trips per check | "
+        f"{CHECKS / elapsed:9.0f} checks/s"
+    )
+
+
+async def main() -> None:
+    client = redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await measure("get/incr/expire", client, old_attempts)
+        await measure("fixed window", client, lambda c, k: fixed_window(c, k, 1_000_000, 60))
+        await measure("sliding window", client, lambda c, k: sliding_window(c, k, 1_000_000, 60))
+        await measure("token bucket", client, lambda c, k: token_bucket(c, k, 1_000_000, 1000))
+    finally:
+        async for key in client.scan_iter(f"{PREFIX}:*"):
+            await client.delete(key)
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
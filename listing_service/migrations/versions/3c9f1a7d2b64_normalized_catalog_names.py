@@ -0,0 +1,132 @@
+"""normalized catalog names
+
+Revision ID: 3c9f1a7d2b64
+Revises: 6794b882fd5e
+Create Date: 2026-10-19 10:12:41.318205
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+from app.models.normalization import normalize_name
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9f1a7d2b64'
+down_revision: Union[str, None] = '6794b882fd5e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_CHUNK_SIZE = 1000
+CATALOG_TABLES = ('countries', 'regions_or_states', 'cities', 'brands', 'car_models')
+# Rows whose names only differed in case or spacing collapse to one key. Parents come first,
+# merging two countries can make their regions collide, and so on down to car models.
+# table: (column the name is unique within, [(referencing table, foreign key column)])
+MERGE_RULES = {
+    'countries': (None, [('regions_or_states', 'country_id'), ('listings', 'country_id')]),
+    'regions_or_states': ('country_id', [('cities', 'region_id'), ('listings', 'region_id')]),
+    'cities': ('region_id', [('listings', 'city_id')]),
+    'brands': (None, [('car_models', 'brand_id'), ('listings', 'brand_id')]),
+    'car_models': ('brand_id', [('listings', 'car_model_id')]),
+}
+
+
+def _backfill_name_normalized(table_name: str) -> None:
+    """Fill name_normalized in id-ordered chunks so no statement touches the whole table"""
+    bind = op.get_bind()
+    catalog_table = table(
+        table_name,
+        column('id', sa.Integer),
+        column('name', sa.String),
+        column('name_normalized', sa.String)
+    )
+    update_stmt = (
+        catalog_table.update()
+        .where(catalog_table.c.id == sa.bindparam('row_id'))
+        .values(name_normalized=sa.bindparam('row_name_normalized'))
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(catalog_table.c.id, catalog_table.c.name)
+            .where(catalog_table.c.id > last_id)
+            .order_by(catalog_table.c.id)
+            .limit(BACKFILL_CHUNK_SIZE)
+        ).all()
+        if not rows:
+            break
+        bind.execute(
+            update_stmt,
+            [{'row_id': row.id, 'row_name_normalized': normalize_name(row.name)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def _merge_duplicates(table_name: str) -> None:
+    """Keep the oldest row of every normalized-name group, re-point references to it and delete the rest"""
+    bind = op.get_bind()
+    scope_column, references = MERGE_RULES[table_name]
+    columns = [column('id', sa.Integer), column('name_normalized', sa.String)]
+    if scope_column:
+        columns.append(column(scope_column, sa.Integer))
+    catalog_table = table(table_name, *columns)
+    group_by = [catalog_table.c.name_normalized]
+    if scope_column:
+        group_by.append(catalog_table.c[scope_column])
+
+    groups = bind.execute(
+        sa.select(sa.func.min(catalog_table.c.id).label('keep_id'), *group_by)
+        .group_by(*group_by)
+        .having(sa.func.count() > 1)
+    ).all()
+    for group in groups:
+        duplicate_ids = bind.scalars(
+            sa.select(catalog_table.c.id)
+            .where(*(key == group._mapping[key.name] for key in group_by))
+            .where(catalog_table.c.id != group.keep_id)
+        ).all()
+        for referencing_table, foreign_key in references:
+            reference = table(referencing_table, column(foreign_key, sa.Integer))
+            bind.execute(
+                reference.update()
+                .where(reference.c[foreign_key].in_(duplicate_ids))
+                .values({foreign_key: group.keep_id})
+            )
+        bind.execute(catalog_table.delete().where(catalog_table.c.id.in_(duplicate_ids)))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name in CATALOG_TABLES:
+        op.add_column(table_name, sa.Column('name_normalized', sa.String(length=100), nullable=True))
+        _backfill_name_normalized(table_name)
+        op.alter_column(
+            table_name,
+            'name_normalized',
+            existing_type=sa.String(length=100),
+            nullable=False
+        )
+    for table_name in CATALOG_TABLES:
+        _merge_duplicates(table_name)
+
+    op.create_index(op.f('ix_countries_name_normalized'), 'countries', ['name_normalized'], unique=True)
+    op.create_index(op.f('ix_brands_name_normalized'), 'brands', ['name_normalized'], unique=True)
+    op.create_index(
+        'ux_regions_or_states_country_name_normalized',
+        'regions_or_states',
+        ['country_id', 'name_normalized'],
+        unique=True
+    )
+    op.create_index('ux_cities_region_name_normalized', 'cities', ['region_id', 'name_normalized'], unique=True)
+    op.create_index('ux_car_models_brand_name_normalized', 'car_models', ['brand_id', 'name_normalized'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_car_models_brand_name_normalized', table_name='car_models')
+    op.drop_index('ux_cities_region_name_normalized', table_name='cities')
+    op.drop_index('ux_regions_or_states_country_name_normalized', table_name='regions_or_states')
+    op.drop_index(op.f('ix_brands_name_normalized'), table_name='brands')
+    op.drop_index(op.f('ix_countries_name_normalized'), table_name='countries')
+    for table_name in CATALOG_TABLES:
+        op.drop_column(table_name, 'name_normalized')
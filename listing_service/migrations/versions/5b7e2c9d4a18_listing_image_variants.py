@@ -0,0 +1,27 @@
+"""listing image variants
+
+Revision ID: 5b7e2c9d4a18
+Revises: 8e2d4b6a1f35
+Create Date: 2026-10-19 14:05:27.641093
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2c9d4a18'
+down_revision: Union[str, None] = '8e2d4b6a1f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('listings', sa.Column('image_variants', mysql.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('listings', 'image_variants')
@@ -0,0 +1,39 @@
+"""listing quota counter
+
+Revision ID: 8e2d4b6a1f35
+Revises: 3c9f1a7d2b64
+Create Date: 2026-10-19 11:02:17.904512
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2d4b6a1f35'
+down_revision: Union[str, None] = '3c9f1a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_listings_user_id'), 'listings', ['user_id'], unique=False)
+    op.add_column('users', sa.Column('listings_count', sa.Integer(), server_default='0', nullable=False))
+
+    users_table = table('users', column('id', sa.Integer), column('listings_count', sa.Integer))
+    listings_table = table('listings', column('id', sa.Integer), column('user_id', sa.Integer))
+    op.execute(
+        users_table.update().values(
+            listings_count=sa.select(sa.func.count(listings_table.c.id))
+            .where(listings_table.c.user_id == users_table.c.id)
+            .scalar_subquery()
+        )
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'listings_count')
+    op.drop_index(op.f('ix_listings_user_id'), table_name='listings')
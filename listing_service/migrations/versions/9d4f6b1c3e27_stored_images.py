@@ -0,0 +1,33 @@
+"""stored images
+
+Revision ID: 9d4f6b1c3e27
+Revises: 5b7e2c9d4a18
+Create Date: 2026-10-19 15:21:48.203716
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f6b1c3e27'
+down_revision: Union[str, None] = '5b7e2c9d4a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_images',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=255), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stored_images_url'), 'stored_images', ['url'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stored_images_url'), table_name='stored_images')
+    op.drop_table('stored_images')
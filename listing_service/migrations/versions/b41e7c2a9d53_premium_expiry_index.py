@@ -0,0 +1,25 @@
+"""premium expiry index
+
+Revision ID: b41e7c2a9d53
+Revises: 9d4f6b1c3e27
+Create Date: 2026-10-19 18:07:42.118306
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e7c2a9d53'
+down_revision: Union[str, None] = '9d4f6b1c3e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_users_premium_expires_at'), 'users', ['premium_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_users_premium_expires_at'), table_name='users')
@@ -0,0 +1,25 @@
+"""listing image urls index
+
+Revision ID: d7a3e9f15c42
+Revises: b41e7c2a9d53
+Create Date: 2026-10-19 21:14:05.402817
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3e9f15c42'
+down_revision: Union[str, None] = 'b41e7c2a9d53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE INDEX ix_listings_image_urls ON listings ((CAST(image_urls AS CHAR(255) ARRAY)))')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listings_image_urls', table_name='listings')
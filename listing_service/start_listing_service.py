@@ -8,6 +8,9 @@ async def main():
     await asyncio.create_subprocess_exec("poetry", "run", "python", "app/user_rabbitmq_consumer.py")
     logger.info("Consumer started")
 
+    await asyncio.create_subprocess_exec("poetry", "run", "python", "app/media_gc_worker.py")
+    logger.info("Media GC started")
+
     server = await asyncio.create_subprocess_exec("uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000")
     logger.info("Listing service started")
 
@@ -1,12 +1,11 @@
 from datetime import datetime, timezone, timedelta, date
-from better_profanity import profanity
 from fastapi import UploadFile
 from io import BytesIO
 from PIL import Image
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, patch
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_listing_db
 from app.main import app
@@ -25,6 +24,10 @@ from app.models import (
     RolePermission as RolePermissionPairModel,
 )
 from app.schemas.listing import ListingCreate as ListingCreateSchema
+from app.services.exchange_rates import exchange_rate_provider
+from app.services.permission_registry import permission_registry
+from app.services.principal_cache import principal_cache
+from app.utils.profanity_filter import reset_profanity_matcher
 from app.utils.token_utils import get_user_from_token
 
 
@@ -317,11 +320,47 @@ def mock_upload_file_jpg():
 
 @pytest.fixture
 def mock_censor_words():
-    original = [str(w) for w in profanity.CENSOR_WORDSET]
-    profanity.CENSOR_WORDSET.clear()
-    yield profanity.CENSOR_WORDSET
-    profanity.CENSOR_WORDSET.clear()
-    profanity.CENSOR_WORDSET.extend(original)
+    words = set()
+    with patch("app.utils.profanity_filter.default_censor_words", return_value=words):
+        yield words
+
+
+@pytest.fixture(autouse=True)
+def principal_cache_io():
+    """Principal cache without Redis or RabbitMQ: every lookup misses and goes to the DB"""
+    principal_cache.drop_local()
+    with patch.object(principal_cache, "_get_shared", AsyncMock(return_value=(None, (0, 0)))), \
+            patch.object(principal_cache, "_set_shared", AsyncMock(return_value=True)) as set_shared, \
+            patch.object(principal_cache, "drop_shared", AsyncMock()), \
+            patch.object(principal_cache, "_bump_generation", AsyncMock()), \
+            patch.object(principal_cache, "_broadcast", AsyncMock()) as broadcast:
+        yield {"set_shared": set_shared, "broadcast": broadcast}
+    principal_cache.drop_local()
+
+
+@pytest.fixture(autouse=True)
+def fixture_permissions():
+    """Role masks matching listing_user_factory roles, so checks never load from the DB"""
+    permission_registry.compile(
+        ["manage_listings", "moderate_listings", "edit_profile"],
+        {1: ["moderate_listings", "edit_profile"], 3: ["manage_listings"]},
+    )
+    yield
+    permission_registry.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def reset_profanity_cache():
+    reset_profanity_matcher()
+    yield
+    reset_profanity_matcher()
+
+
+@pytest.fixture(autouse=True)
+def reset_exchange_rate_cache():
+    exchange_rate_provider.invalidate()
+    yield
+    exchange_rate_provider.invalidate()
 
 
 @pytest.fixture
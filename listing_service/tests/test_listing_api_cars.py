@@ -133,8 +133,8 @@ async def test_get_all_models_success(client, mock_db, sub_factory):
 @pytest.mark.asyncio
 async def test_create_model_success(client, mock_db, sub_factory):
     brand = sub_factory("brand")
-    brand.car_models = []
-    mock_db.scalar.return_value = brand
+    mock_db.get.return_value = brand
+    mock_db.scalar.return_value = None
     mock_db.commit = AsyncMock()
     mock_db.refresh = AsyncMock()
 
@@ -164,9 +164,9 @@ async def test_create_model_success(client, mock_db, sub_factory):
 async def test_create_model_duplicate(client, mock_db, sub_factory):
     existing_model = sub_factory("car_model")
     brand = sub_factory("brand")
-    brand.car_models = [existing_model]
 
-    mock_db.scalar.return_value = brand
+    mock_db.get.return_value = brand
+    mock_db.scalar.return_value = existing_model.id
 
     with patch('app.api.cars.permission_checker', return_value=None):
         response = await client.post(
@@ -181,7 +181,7 @@ async def test_create_model_duplicate(client, mock_db, sub_factory):
 
 @pytest.mark.asyncio
 async def test_create_model_brand_not_found(client, mock_db):
-    mock_db.scalar.return_value = None
+    mock_db.get.return_value = None
 
     with patch('app.api.cars.permission_checker', return_value=None):
         response = await client.post(
@@ -1,9 +1,11 @@
 import io
+from datetime import date
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi import status
 from app.main import app
 from app.models.listing import Listing, Currency
+from app.schemas.listing_import import ListingImportReport, ListingImportRowResult
 from app.utils.token_utils import get_user_from_token, get_optional_user_from_token
 from tests.conftest import listing_user_factory
 
@@ -71,11 +73,8 @@ async def test_create_listing_success(client, mock_db, sub_factory):
 async def test_create_listing_limit_reached(client, mock_db, listing_user_factory):
     mock_user = listing_user_factory('test_base_user')
 
-    mock_listing = Listing(id=1)
     result_mock = MagicMock()
-    scalars_mock = MagicMock()
-    scalars_mock.all.return_value = [mock_listing]
-    result_mock.scalars.return_value = scalars_mock
+    result_mock.rowcount = 0
     mock_db.execute = AsyncMock(return_value=result_mock)
 
     app.dependency_overrides[get_user_from_token] = lambda: mock_user
@@ -104,6 +103,55 @@ async def test_create_listing_limit_reached(client, mock_db, listing_user_factor
     app.dependency_overrides.clear()
 
 
+@pytest.mark.asyncio
+async def test_bulk_import_listings(client, mock_db):
+    report = ListingImportReport(total=1, created=1, failed=0, rows=[ListingImportRowResult(row=1, created=True)])
+    content = b'{"brand_id": 1, "title": "Car"}\n'
+
+    with patch("app.api.listings.permission_checker", return_value=None):
+        with patch("app.api.listings.import_listings", AsyncMock(return_value=report)) as mock_import:
+            response = await client.post(
+                "/api-listings/listings/import",
+                files={"file": ("cars.ndjson", io.BytesIO(content), "application/x-ndjson")},
+                headers={"Authorization": "Bearer testtoken"}
+            )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["created"] == 1
+    assert mock_import.await_args.args[2] == [{"brand_id": 1, "title": "Car"}]
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_listings_too_large(client, mock_db):
+    content = b'{"brand_id": 1, "title": "Car"}\n' * 100
+
+    with patch("app.api.listings.permission_checker", return_value=None), \
+            patch("app.services.listing_import.settings.listing_import_max_upload_bytes", 1000), \
+            patch("app.api.listings.import_listings", AsyncMock()) as mock_import:
+        response = await client.post(
+            "/api-listings/listings/import",
+            files={"file": ("cars.ndjson", io.BytesIO(content), "application/x-ndjson")},
+            headers={"Authorization": "Bearer testtoken"}
+        )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert response.json()["detail"] == "Import file is too large"
+    mock_import.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_listings_wrong_format(client, mock_db):
+    with patch("app.api.listings.permission_checker", return_value=None):
+        response = await client.post(
+            "/api-listings/listings/import",
+            files={"file": ("cars.xlsx", io.BytesIO(b"data"), "application/octet-stream")},
+            headers={"Authorization": "Bearer testtoken"}
+        )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Import file must be CSV or NDJSON"
+
+
 @pytest.mark.asyncio
 async def test_create_listing_image_limit_reached(client, mock_db, sub_factory):
     mock_listing = sub_factory('test_listing')
@@ -531,3 +579,79 @@ async def test_delete_listing_forbidden(client, mock_db, listing_user_factory, s
 
     app.dependency_overrides.clear()
 
+
+
+@pytest.mark.asyncio
+async def test_bulk_moderation_delete(client, mock_db):
+    with patch("app.api.listings.permission_checker", return_value=None) as mock_permission:
+        with patch("app.api.listings.bulk_moderate_listings", AsyncMock(return_value=(2, [1, 2], ["/media/a.jpg"]))):
+            with patch("app.api.listings.enqueue_media_deletion", new_callable=AsyncMock) as mock_enqueue:
+                response = await client.post(
+                    "/api-listings/listings/bulk-moderation",
+                    json={"ids": [1, 2, 3], "action": "delete"},
+                    headers={"Authorization": "Bearer testtoken"}
+                )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"action": "delete", "requested": 3, "affected": 2}
+    mock_permission.assert_called_once()
+    mock_enqueue.assert_awaited_once_with(["/media/a.jpg"])
+
+
+@pytest.mark.asyncio
+async def test_bulk_moderation_invalid_action(client, mock_db):
+    response = await client.post(
+        "/api-listings/listings/bulk-moderation",
+        json={"ids": [1], "action": "archive"},
+        headers={"Authorization": "Bearer testtoken"}
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_get_listing_prices_converts_page(client, mock_db, mock_exchange_rate):
+    mock_db.scalar = AsyncMock(return_value=mock_exchange_rate)
+    rows_result = MagicMock()
+    rows_result.all.return_value = [
+        MagicMock(id=1, original_price=1000.0, original_currency=Currency.USD),
+        MagicMock(id=2, original_price=44000.0, original_currency=Currency.UAH),
+        MagicMock(id=3, original_price=100.0, original_currency=Currency.EUR),
+    ]
+    mock_db.execute = AsyncMock(return_value=rows_result)
+
+    response = await client.get("/api-listings/listings/prices", params={"currency": "EUR"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["price"] for item in response.json()] == [909.09, 1000.0, 100.0]
+    assert all(item["currency"] == "EUR" for item in response.json())
+
+
+@pytest.mark.asyncio
+async def test_get_listing_prices_without_rates(client, mock_db):
+    mock_db.scalar = AsyncMock(return_value=None)
+
+    response = await client.get("/api-listings/listings/prices")
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+@pytest.mark.asyncio
+async def test_get_listing_price_history(client, mock_db, sub_factory):
+    mock_listing = sub_factory('test_listing')
+    mock_listing.original_price = 100.0
+    mock_listing.original_currency = Currency.USD
+    mock_db.get = AsyncMock(return_value=mock_listing)
+    history = [
+        MagicMock(created_at=date(2026, 10, 17), sell_usd=41.0),
+        MagicMock(created_at=date(2026, 10, 18), sell_usd=41.5),
+    ]
+
+    with patch("app.api.listings.get_rate_history", AsyncMock(return_value=history)):
+        response = await client.get(f"/api-listings/listings/{mock_listing.id}/price-history", params={"days": 2})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["points"] == [
+        {"date": "2026-10-17", "price_uah": 4100.0},
+        {"date": "2026-10-18", "price_uah": 4150.0},
+    ]
@@ -1,6 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi import status
+from sqlalchemy.dialects import mysql
 from app.models.profanity_words import ProfanityWords
 
 
@@ -39,7 +40,9 @@ async def test_create_profanity_word_success(client, mock_db, sub_factory):
 
     mock_db.refresh.side_effect = refresh_side_effect
 
-    with patch("app.api.profanity_words.permission_checker", return_value=None):
+    with patch("app.api.profanity_words.permission_checker", return_value=None), \
+            patch("app.api.profanity_words.redis_client") as mock_redis:
+        mock_redis.add_words = AsyncMock()
         response = await client.post(
             "/api-listings/profanity",
             json={"word": word.word},
@@ -51,6 +54,7 @@ async def test_create_profanity_word_success(client, mock_db, sub_factory):
     mock_db.add.assert_called_once()
     mock_db.commit.assert_awaited_once()
     mock_db.refresh.assert_awaited_once()
+    mock_redis.add_words.assert_awaited_once_with([word.word])
 
 
 @pytest.mark.asyncio
@@ -60,7 +64,9 @@ async def test_delete_profanity_word_success(client, mock_db, sub_factory):
     mock_db.delete = AsyncMock()
     mock_db.commit = AsyncMock()
 
-    with patch("app.api.profanity_words.permission_checker", return_value=None):
+    with patch("app.api.profanity_words.permission_checker", return_value=None), \
+            patch("app.api.profanity_words.redis_client") as mock_redis:
+        mock_redis.remove_words = AsyncMock()
         response = await client.delete(
             f"/api-listings/profanity/{word.id}",
             headers={"Authorization": "Bearer testtoken"},
@@ -70,6 +76,8 @@ async def test_delete_profanity_word_success(client, mock_db, sub_factory):
     assert f"Profanity_word {word.id} deleted" in response.json()["message"]
     mock_db.delete.assert_awaited_once_with(word)
     mock_db.commit.assert_awaited_once()
+    mock_redis.remove_words.assert_awaited_once()
+    assert set(mock_redis.remove_words.await_args.args[0]) == {word.word, word.word.lower()}
 
 
 @pytest.mark.asyncio
@@ -83,3 +91,78 @@ async def test_delete_profanity_word_not_found(client, mock_db):
         )
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_import_profanity_words(client, mock_db):
+    words = [f"Word{i} " for i in range(1500)] + ["word1", "  "]
+    inserted = MagicMock()
+    inserted.rowcount = 700
+    mock_db.execute = AsyncMock(return_value=inserted)
+    mock_db.commit = AsyncMock()
+
+    with patch("app.api.profanity_words.permission_checker", return_value=None), \
+            patch("app.api.profanity_words.redis_client") as mock_redis:
+        mock_redis.add_words = AsyncMock()
+        response = await client.post(
+            "/api-listings/profanity/import",
+            json={"words": words},
+            headers={"Authorization": "Bearer testtoken"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"total": 1500, "added": 1400}
+    assert mock_db.execute.await_count == 2
+    mock_db.commit.assert_awaited_once()
+    imported = mock_redis.add_words.await_args.args[0]
+    assert imported[:2] == ["word0", "word1"] and len(imported) == 1500
+
+
+@pytest.mark.asyncio
+async def test_import_profanity_words_counts_only_new_words(client, mock_db):
+    stored = {"word1", "word2"}
+    statements = []
+
+    async def execute(stmt):
+        statements.append(stmt)
+        rows = stmt.compile().params
+        words = {value for key, value in rows.items() if key.startswith("word")}
+        result = MagicMock()
+        result.rowcount = len(words - stored)
+        stored.update(words)
+        return result
+
+    mock_db.execute = AsyncMock(side_effect=execute)
+    mock_db.commit = AsyncMock()
+
+    with patch("app.api.profanity_words.permission_checker", return_value=None), \
+            patch("app.api.profanity_words.redis_client") as mock_redis:
+        mock_redis.add_words = AsyncMock()
+        response = await client.post(
+            "/api-listings/profanity/import",
+            json={"words": ["word1", "Word2", "word3", "WORD3", "word4"]},
+            headers={"Authorization": "Bearer testtoken"},
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"total": 4, "added": 2}
+    sql = str(statements[0].compile(dialect=mysql.dialect()))
+    assert sql.startswith("INSERT IGNORE INTO")
+    assert "ON DUPLICATE KEY UPDATE" not in sql
+
+
+@pytest.mark.asyncio
+async def test_import_profanity_words_too_many(client, mock_db):
+    mock_db.execute = AsyncMock()
+
+    with patch("app.api.profanity_words.permission_checker", return_value=None), \
+            patch("app.api.profanity_words.settings.profanity_import_max_words", 2):
+        response = await client.post(
+            "/api-listings/profanity/import",
+            json={"words": ["a", "b", "c"]},
+            headers={"Authorization": "Bearer testtoken"},
+        )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.json()["detail"] == "Maximum 2 words allowed"
+    mock_db.execute.assert_not_awaited()
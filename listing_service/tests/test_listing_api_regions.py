@@ -1,7 +1,6 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from fastapi import status
-from app.models import Country
 
 
 @pytest.mark.asyncio
@@ -24,11 +23,7 @@ async def test_get_all_countries(client, mock_db, sub_factory):
 async def test_create_country_success(client, mock_db, sub_factory):
     mock_country = sub_factory("country_model")
 
-    mock_user_query_result = MagicMock()
-    mock_scalars = MagicMock()
-    mock_scalars.first.return_value = None
-    mock_user_query_result.scalars.return_value = mock_scalars
-    mock_db.execute.return_value = mock_user_query_result
+    mock_db.scalar.return_value = None
 
     async def refresh_side_effect(instance):
         instance.id = mock_country.id
@@ -54,11 +49,7 @@ async def test_create_country_success(client, mock_db, sub_factory):
 async def test_create_country_exist(client, mock_db, sub_factory):
     mock_country = sub_factory('country_model')
 
-    mock_query_result = MagicMock()
-    mock_scalars = MagicMock()
-    mock_scalars.first.return_value = Country(name=mock_country.name)
-    mock_query_result.scalars.return_value = mock_scalars
-    mock_db.execute.return_value = mock_query_result
+    mock_db.scalar.return_value = mock_country.id
 
     with patch("app.api.regions.permission_checker", return_value=None):
         response = await client.post(
@@ -142,6 +133,7 @@ async def test_create_region_success(client, mock_db, sub_factory):
     mock_region = sub_factory('region_model')
     mock_country = sub_factory('country_model')
     mock_db.get = AsyncMock(return_value=mock_country)
+    mock_db.scalar = AsyncMock(return_value=None)
     mock_db.commit = AsyncMock()
     mock_db.add = MagicMock()
 
@@ -168,9 +160,10 @@ async def test_create_region_success(client, mock_db, sub_factory):
 
 @pytest.mark.asyncio
 async def test_create_region_exist(client, mock_db, sub_factory):
-    mock_country = sub_factory('country_with_regions')
+    mock_country = sub_factory('country_model')
     mock_region = sub_factory('region_model')
-    mock_db.scalar = AsyncMock(return_value=mock_country)
+    mock_db.get = AsyncMock(return_value=mock_country)
+    mock_db.scalar = AsyncMock(return_value=mock_region.id)
 
     with patch("app.api.regions.permission_checker", return_value=None):
         response = await client.post(
@@ -187,7 +180,7 @@ async def test_create_region_exist(client, mock_db, sub_factory):
 @pytest.mark.asyncio
 async def test_create_region_country_not_found(client, mock_db, sub_factory):
     mock_region = sub_factory('region_model')
-    mock_db.scalar = AsyncMock(return_value=None)
+    mock_db.get = AsyncMock(return_value=None)
     mock_db.commit = AsyncMock()
 
     with patch("app.api.regions.permission_checker", return_value=None):
@@ -274,6 +267,7 @@ async def test_create_city_success(client, mock_db, sub_factory):
     mock_region = sub_factory('region_model')
     mock_city = sub_factory('city_model')
     mock_db.get = AsyncMock(return_value=mock_region)
+    mock_db.scalar = AsyncMock(return_value=None)
     mock_db.commit = AsyncMock()
 
     async def refresh_side_effect(instance):
@@ -297,6 +291,25 @@ async def test_create_city_success(client, mock_db, sub_factory):
     mock_db.refresh.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_create_city_exist(client, mock_db, sub_factory):
+    mock_region = sub_factory('region_model')
+    mock_city = sub_factory('city_model')
+    mock_db.get = AsyncMock(return_value=mock_region)
+    mock_db.scalar = AsyncMock(return_value=mock_city.id)
+
+    with patch("app.api.regions.permission_checker", return_value=None):
+        response = await client.post(
+            "/api-listings/location/cities",
+            json={"name": mock_city.name.upper(), "region_id": mock_city.region_id},
+            headers={"Authorization": "Bearer testtoken"}
+        )
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.json()["detail"] == 'City already exists'
+    mock_db.add.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_create_city_with_not_found_region(client, mock_db, sub_factory):
     mock_city = sub_factory('city_model')
@@ -29,7 +29,7 @@ async def test_get_all_role_permissions(client, mock_db, sub_factory):
 
 
 @pytest.mark.asyncio
-async def test_create_role_permission_success(client, mock_db, sub_factory):
+async def test_create_role_permission_success(client, mock_db, sub_factory, principal_cache_io):
     mock_role_permission_pair = sub_factory('role_permission_pair')
 
     mock_db.scalar = AsyncMock(return_value=None)
@@ -56,6 +56,7 @@ async def test_create_role_permission_success(client, mock_db, sub_factory):
     mock_db.add.assert_called_once()
     mock_db.commit.assert_awaited_once()
     mock_db.refresh.assert_awaited_once()
+    principal_cache_io["broadcast"].assert_awaited_once_with({"all": True})
 
 
 @pytest.mark.asyncio
@@ -37,7 +37,9 @@ async def test_get_all_users_forbidden(client, mock_db):
 
 
 @pytest.mark.asyncio
-async def test_become_premium_user(client, mock_db):
+async def test_become_premium_user(client, mock_db, listing_user_factory, principal_cache_io):
+    db_user = listing_user_factory("test_user_with_permission")
+    mock_db.get = AsyncMock(return_value=db_user)
     mock_db.commit = AsyncMock()
 
     async def refresh_side_effect(instance):
@@ -51,7 +53,8 @@ async def test_become_premium_user(client, mock_db):
     assert response.status_code == 200
     assert response.json()["is_premium"] is True
     assert datetime.fromisoformat(response.json()["premium_expires_at"]).date() == date.today() + timedelta(days=30)
-    mock_db.refresh.assert_awaited_once()
+    mock_db.refresh.assert_awaited_once_with(db_user)
+    principal_cache_io["broadcast"].assert_awaited_once_with({"auth_user_ids": [db_user.auth_user_id]})
 
 
 @pytest.mark.asyncio
@@ -87,7 +90,7 @@ async def test_get_user_by_id_not_found(client, mock_db, listing_user_factory):
 
 
 @pytest.mark.asyncio
-async def test_banned_user_by_id_success(client, mock_db, listing_user_factory):
+async def test_banned_user_by_id_success(client, mock_db, listing_user_factory, principal_cache_io):
     mock_user = listing_user_factory("test_base_user")
 
     mock_db.get = AsyncMock(return_value=mock_user)
@@ -98,6 +101,7 @@ async def test_banned_user_by_id_success(client, mock_db, listing_user_factory):
 
     assert response.status_code == 200
     assert response.json()["is_banned"] is True
+    principal_cache_io["broadcast"].assert_awaited_once_with({"auth_user_ids": [mock_user.auth_user_id]})
 
 
 @pytest.mark.asyncio
@@ -113,7 +117,7 @@ async def test_banned_user_by_access_denied(client, mock_db, listing_user_factor
 
 
 @pytest.mark.asyncio
-async def test_change_user_role_success(client, mock_db, listing_user_factory, sub_factory):
+async def test_change_user_role_success(client, mock_db, listing_user_factory, sub_factory, principal_cache_io):
     mock_user = listing_user_factory('test_base_user')
     mock_role = sub_factory('role')
 
@@ -137,6 +141,7 @@ async def test_change_user_role_success(client, mock_db, listing_user_factory, s
 
     assert response.status_code == 200
     assert response.json()["role_id"] == mock_role.id
+    principal_cache_io["broadcast"].assert_awaited_once_with({"auth_user_ids": [mock_user.auth_user_id]})
 
 
 @pytest.mark.asyncio
@@ -1,14 +1,25 @@
+import json
+from datetime import date, timedelta
 import pytest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from fastapi import HTTPException, status
+from sqlalchemy.dialects import mysql
+from shared.utils.rate_limit import FIXED_WINDOW_SCRIPT
 from app.core.redis import redis_client
 from app.models import User as UserModel
 from app.services.listing import (
     validate_references,
     check_profanity_attempts,
-    create_listing_service
+    create_listing_service,
+    bulk_moderate_listings
 )
+from app.services.listing_images import claim_images, release_images, replace_listing_images
+from app.services.listing_import import parse_import_rows, import_listings, detect_import_format
+from app.services.listing_quota import listing_limit, reserve_listing_slot, reserve_listing_slots, release_listing_slots
+from app.services.permission_registry import PermissionRegistry
 from app.services.permissions_checker import permission_checker
+from app.services.principal_cache import PrincipalCache, principal_from_dict, principal_to_dict
+from app.utils.profanity_filter import ProfanityMatcher
 from app.services.user_manager import user_manager
 
 
@@ -29,6 +40,35 @@ async def test_permission_checker(listing_user_factory):
     assert exc.detail == 'Access denied'
 
 
+@pytest.mark.asyncio
+async def test_permission_registry_role_masks():
+    registry = PermissionRegistry()
+    registry.compile(["edit_profile", "manage_listings", "moderate_listings"], {1: ["moderate_listings"], 2: []})
+
+    assert await registry.role_mask(1) == 0b100
+    assert await registry.has(1, "moderate_listings")
+    assert not await registry.has(1, "manage_listings")
+    assert not await registry.has(2, "moderate_listings")
+    assert not await registry.has(99, "moderate_listings")
+    assert not await registry.has(1, "unknown_permission")
+
+
+@pytest.mark.asyncio
+async def test_permission_registry_reloads_after_invalidate():
+    registry = PermissionRegistry()
+    registry.compile(["moderate_listings"], {1: ["moderate_listings"]})
+    registry.invalidate()
+
+    async def load():
+        registry.compile(["moderate_listings"], {1: []})
+
+    with patch.object(registry, "_load", AsyncMock(side_effect=load)) as mock_load:
+        assert not await registry.has(1, "moderate_listings")
+        assert not await registry.has(1, "moderate_listings")
+
+    mock_load.assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_validate_references_success(mock_db):
 
@@ -75,31 +115,71 @@ async def test_validate_references_city_not_found(mock_db):
 
 
 @pytest.mark.asyncio
-async def test_check_profanity_attempts_success():
+@pytest.mark.parametrize("reply,expected", [([1, 1, 0], True), ([0, 0, 3600000], False)])
+async def test_check_profanity_attempts(reply, expected):
     mock_client = AsyncMock()
-    mock_client.get.return_value = "0"
-    mock_client.incr.return_value = 1
-    mock_client.expire.return_value = True
+    script = AsyncMock(return_value=reply)
+    mock_client.register_script = MagicMock(return_value=script)
 
     with patch.object(redis_client, "client", mock_client):
         result = await check_profanity_attempts("some_key")
 
-    assert result is True
-    mock_client.get.assert_called_once_with("some_key")
-    mock_client.incr.assert_called_once_with("some_key")
-    (mock_client.expire.assert_called_once_with("some_key", 24 * 60 * 60))
+    assert result is expected
+    mock_client.register_script.assert_called_once_with(FIXED_WINDOW_SCRIPT)
+    script.assert_awaited_once_with(keys=["some_key"], args=[2, 24 * 60 * 60 * 1000, 1])
+    mock_client.get.assert_not_called()
 
 
 @pytest.mark.asyncio
-async def test_check_profanity_attempts_failure():
+async def test_principal_cache_local_tier_expires_and_evicts(listing_user_factory):
+    cache = PrincipalCache(max_size=1, local_seconds=60)
+    data = principal_to_dict(listing_user_factory("test_user_with_permission"))
+
+    with patch.object(cache, "_get_shared", AsyncMock(return_value=(None, (0, 0)))) as get_shared, \
+            patch.object(cache, "_set_shared", AsyncMock(return_value=True)):
+        await cache.set(1, data, (0, 0))
+        assert await cache.get(1) == (data, None)
+        get_shared.assert_not_awaited()
+
+        await cache.set(2, data, (0, 0))
+        assert await cache.get(1) == (None, (0, 0))
+
+        cache.local_seconds = 0
+        await cache.set(3, data, (0, 0))
+        assert await cache.get(3) == (None, (0, 0))
+        assert get_shared.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_refused_write_skips_local_tier(listing_user_factory):
+    cache = PrincipalCache()
+    data = principal_to_dict(listing_user_factory("test_user_with_permission"))
+
+    with patch.object(cache, "_get_shared", AsyncMock(return_value=(None, (0, 1)))), \
+            patch.object(cache, "_set_shared", AsyncMock(return_value=False)):
+        await cache.set(1, data, (0, 0))
+        assert await cache.get(1) == (None, (0, 1))
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_shared_tier_checks_generation(listing_user_factory):
+    data = principal_to_dict(listing_user_factory("test_user_with_permission"))
     mock_client = AsyncMock()
-    mock_client.get.return_value = "2"
+    cache = PrincipalCache()
 
     with patch.object(redis_client, "client", mock_client):
-        result = await check_profanity_attempts("some_key")
+        mock_client.mget.return_value = ["2", "1", json.dumps({"generation": 2, "version": 1, "principal": data})]
+        assert await cache._get_shared(1) == (data, (2, 1))
 
-    assert result is False
-    mock_client.get.assert_called_once_with("some_key")
+        mock_client.mget.return_value = ["3", "1", json.dumps({"generation": 2, "version": 1, "principal": data})]
+        assert await cache._get_shared(1) == (None, (3, 1))
+
+        mock_client.mget.return_value = ["2", "2", json.dumps({"generation": 2, "version": 1, "principal": data})]
+        assert await cache._get_shared(1) == (None, (2, 2))
+
+    principal = principal_from_dict(data)
+    assert principal.premium_expires_at == date.fromisoformat(data["premium_expires_at"])
+    assert (principal.role.id, principal.role.name) == (data["role"]["id"], data["role"]["name"])
 
 
 @pytest.mark.asyncio
@@ -191,3 +271,273 @@ async def test_user_manager_false_and_error_cases(listing_user_factory, mock_db)
         role_id=1,
     )
     assert await user_manager(performer=admin, target=another_admin, db=mock_db, task="changing role") is False
+
+
+def test_listing_limit_by_tier(listing_user_factory):
+    assert listing_limit(listing_user_factory("test_base_user")) == 1
+    assert listing_limit(listing_user_factory("test_base_premium_user")) is None
+    assert listing_limit(listing_user_factory("test_user_with_permission")) is None
+
+    expired_premium = listing_user_factory("test_base_premium_user")
+    expired_premium.premium_expires_at = date.today() - timedelta(days=1)
+    assert listing_limit(expired_premium) == 1
+
+
+@pytest.mark.asyncio
+async def test_principal_cache_stale_write_after_invalidate_is_refused(listing_user_factory):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    user = listing_user_factory("test_user_with_permission")
+    cache = PrincipalCache()
+
+    with patch.object(redis_client, "client", fakeredis.FakeAsyncRedis(decode_responses=True)), \
+            patch.object(cache, "_broadcast", AsyncMock()):
+        # A request misses and loads the user, the ban commits and invalidates before it writes back
+        _, stamp = await cache.get(user.auth_user_id)
+        stale = principal_to_dict(user)
+        await cache.invalidate([user.auth_user_id])
+        await cache.set(user.auth_user_id, stale, stamp)
+
+        data, fresh_stamp = await cache.get(user.auth_user_id)
+        assert data is None and fresh_stamp != stamp
+
+        await cache.set(user.auth_user_id, stale, fresh_stamp)
+        cache.drop_local()
+        assert (await cache.get(user.auth_user_id))[0] == stale
+
+
+@pytest.mark.asyncio
+async def test_reserve_listing_slot_success(mock_db, listing_user_factory):
+    user = listing_user_factory("test_base_user")
+    result = MagicMock()
+    result.rowcount = 1
+    mock_db.execute.return_value = result
+
+    await reserve_listing_slot(mock_db, user)
+
+    mock_db.execute.assert_awaited_once()
+    stmt = mock_db.execute.await_args.args[0]
+    assert "listings_count <" in str(stmt)
+
+
+@pytest.mark.asyncio
+async def test_reserve_listing_slot_limit_reached(mock_db, listing_user_factory):
+    user = listing_user_factory("test_base_user")
+    result = MagicMock()
+    result.rowcount = 0
+    mock_db.execute.return_value = result
+
+    with pytest.raises(HTTPException) as exc_info:
+        await reserve_listing_slot(mock_db, user)
+
+    assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
+    assert exc_info.value.detail == "You need to be a premium user for creating more than 1 listing"
+
+
+@pytest.mark.asyncio
+async def test_reserve_listing_slot_unlimited_tier(mock_db, listing_user_factory):
+    user = listing_user_factory("test_user_with_permission")
+    result = MagicMock()
+    result.rowcount = 1
+    mock_db.execute.return_value = result
+
+    await reserve_listing_slot(mock_db, user)
+
+    stmt = mock_db.execute.await_args.args[0]
+    assert "listings_count <" not in str(stmt)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("current,reserved", [(0, 1), (1, 0)])
+async def test_reserve_listing_slots_up_to_limit(mock_db, listing_user_factory, current, reserved):
+    user = listing_user_factory("test_base_user")
+    mock_db.scalar.return_value = current
+
+    assert await reserve_listing_slots(mock_db, user, 5) == reserved
+
+    assert "FOR UPDATE" in str(mock_db.scalar.await_args.args[0].compile(dialect=mysql.dialect()))
+    assert mock_db.execute.await_count == reserved
+
+
+@pytest.mark.asyncio
+async def test_reserve_listing_slots_unlimited_tier(mock_db, listing_user_factory):
+    user = listing_user_factory("test_user_with_permission")
+
+    assert await reserve_listing_slots(mock_db, user, 5) == 5
+
+    mock_db.scalar.assert_not_awaited()
+    mock_db.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_release_listing_slots(mock_db):
+    await release_listing_slots(mock_db, user_id=1, amount=3)
+
+    mock_db.execute.assert_awaited_once()
+    sql = str(mock_db.execute.await_args.args[0].compile(dialect=mysql.dialect()))
+    assert "greatest(users.listings_count - %s, %s)" in sql
+    assert "listings_count >=" not in sql
+
+
+def test_parse_import_rows_csv_and_ndjson():
+    csv_rows = parse_import_rows(b"brand_id,title\n1,Car\n2,Other\n", "csv")
+    assert csv_rows == [{"brand_id": "1", "title": "Car"}, {"brand_id": "2", "title": "Other"}]
+
+    ndjson_rows = parse_import_rows(b'{"brand_id": 1}\n\nnot json\n', "ndjson")
+    assert ndjson_rows == [{"brand_id": 1}, None]
+
+
+def test_detect_import_format_rejects_unknown():
+    assert detect_import_format("cars.CSV", None) == "csv"
+    assert detect_import_format("upload", "application/x-ndjson") == "ndjson"
+    with pytest.raises(HTTPException) as exc_info:
+        detect_import_format("cars.xlsx", "application/octet-stream")
+    assert exc_info.value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.asyncio
+async def test_import_listings_reports_each_row(mock_db, listing_user_factory, mock_exchange_rate):
+    user = listing_user_factory("test_user_with_permission")
+    base_row = {
+        "brand_id": 1, "car_model_id": 1, "country_id": 1, "region_id": 1, "city_id": "",
+        "original_price": 100, "original_currency": "USD", "title": "Nice car", "description": "",
+    }
+    raw_rows = [
+        base_row,
+        {**base_row, "brand_id": 99},
+        {**base_row, "title": "badword car"},
+        {**base_row, "original_price": "free"},
+        None,
+    ]
+    existing = MagicMock()
+    existing.all.return_value = [1]
+    mock_db.scalars.return_value = existing
+
+    with patch("app.services.listing_import.get_profanity_matcher", AsyncMock(return_value=ProfanityMatcher({"badword"}, 0))):
+        with patch("app.services.listing_import.get_exchange_rates", AsyncMock(return_value=mock_exchange_rate)):
+            report = await import_listings(mock_db, user, raw_rows)
+
+    assert (report.total, report.created, report.failed) == (5, 1, 4)
+    assert [row.created for row in report.rows] == [True, False, False, False, False]
+    assert report.rows[1].error == "Brand does not exist"
+    assert report.rows[2].error == "Profanity check failed"
+    assert report.rows[4].error == "Invalid row format"
+    assert mock_db.scalars.await_count == 4
+    inserted = mock_db.execute.await_args_list[-1].args[1]
+    assert inserted[0]["price_uah"] == 4000
+    assert inserted[0]["city_id"] is None
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_listings_quota_exceeded(mock_db, listing_user_factory):
+    user = listing_user_factory("test_base_user")
+    row = {
+        "brand_id": 1, "car_model_id": 1, "country_id": 1, "region_id": 1,
+        "original_price": 100, "original_currency": "UAH", "title": "Car",
+    }
+    existing = MagicMock()
+    existing.all.return_value = [1]
+    mock_db.scalars.return_value = existing
+    mock_db.scalar.return_value = 1
+
+    with patch("app.services.listing_import.get_profanity_matcher", AsyncMock(return_value=ProfanityMatcher(set(), 0))):
+        with patch("app.services.listing_import.get_exchange_rates", AsyncMock(return_value=None)):
+            report = await import_listings(mock_db, user, [row, row])
+
+    assert report.created == 0
+    assert all(r.error == "You need to be a premium user for creating more than 1 listing" for r in report.rows)
+    mock_db.execute.assert_not_awaited()
+    mock_db.commit.assert_not_awaited()
+    mock_db.rollback.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_import_listings_rejects_only_rows_over_quota(mock_db, listing_user_factory):
+    user = listing_user_factory("test_base_premium_user")
+    row = {
+        "brand_id": 1, "car_model_id": 1, "country_id": 1, "region_id": 1,
+        "original_price": 100, "original_currency": "UAH", "title": "Car",
+    }
+    existing = MagicMock()
+    existing.all.return_value = [1]
+    mock_db.scalars.return_value = existing
+    mock_db.scalar.side_effect = [0, 2]
+
+    with patch("app.services.listing_import.settings.listing_import_chunk_size", 2), \
+            patch("app.services.listing_import.settings.listing_quota_premium", 3), \
+            patch("app.services.listing_import.get_profanity_matcher", AsyncMock(return_value=ProfanityMatcher(set(), 0))), \
+            patch("app.services.listing_import.get_exchange_rates", AsyncMock(return_value=None)):
+        report = await import_listings(mock_db, user, [row] * 5)
+
+    assert (report.created, report.failed) == (3, 2)
+    assert [r.created for r in report.rows] == [True, True, True, False, False]
+    assert report.rows[4].error == "You can't create more than 3 listings"
+    inserted = [call.args[1] for call in mock_db.execute.await_args_list if len(call.args) > 1]
+    assert [len(rows) for rows in inserted] == [2, 1]
+    assert mock_db.commit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_moderate_listings_deactivate(mock_db):
+    update_result = MagicMock()
+    update_result.rowcount = 2
+    mock_db.execute.return_value = update_result
+
+    affected, deleted_ids, orphaned_urls = await bulk_moderate_listings(mock_db, [1, 2, 2], "deactivate")
+
+    assert (affected, deleted_ids, orphaned_urls) == (2, [], [])
+    mock_db.execute.assert_awaited_once()
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bulk_moderate_listings_delete(mock_db):
+    owners_result = MagicMock()
+    owners_result.all.return_value = [(1, 10, ["/media/a.jpg"]), (2, 10, ["/media/a.jpg"]), (3, 11, None)]
+    delete_result = MagicMock()
+    delete_result.rowcount = 3
+    mock_db.execute.side_effect = [owners_result, MagicMock(), delete_result]
+
+    with patch("app.services.listing.release_listing_slots", new_callable=AsyncMock) as mock_release, \
+            patch("app.services.listing.release_images", AsyncMock(return_value=["/media/a.jpg"])) as mock_images:
+        affected, deleted_ids, orphaned_urls = await bulk_moderate_listings(mock_db, [1, 2, 3, 4], "delete")
+
+    assert affected == 3
+    assert deleted_ids == [1, 2, 3]
+    assert orphaned_urls == ["/media/a.jpg"]
+    mock_images.assert_awaited_once_with(mock_db, ["/media/a.jpg", "/media/a.jpg"])
+    mock_release.assert_any_await(mock_db, 10, 2)
+    mock_release.assert_any_await(mock_db, 11, 1)
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_claim_images_revives_rows_without_adding_references(mock_db):
+    await claim_images(mock_db, ["/media/a.jpg", "/media/b.jpg"])
+
+    compiled = mock_db.execute.await_args.args[0].compile(dialect=mysql.dialect())
+    assert "ON DUPLICATE KEY UPDATE ref_count = stored_images.ref_count" in str(compiled)
+    assert compiled.params["ref_count_m0"] == 0
+
+
+@pytest.mark.asyncio
+async def test_release_images_returns_orphans(mock_db):
+    tracked_result = MagicMock()
+    tracked_result.all.return_value = [("/media/shared.jpg", 1), ("/media/single.jpg", 0)]
+    mock_db.execute.side_effect = [MagicMock(), tracked_result, MagicMock()]
+
+    orphaned = await release_images(mock_db, ["/media/shared.jpg", "/media/single.jpg", "/media/legacy.jpg"])
+
+    assert orphaned == ["/media/single.jpg", "/media/legacy.jpg"]
+    assert mock_db.execute.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_replace_listing_images_unchanged_is_noop(mock_db):
+    listing = MagicMock(image_urls=["/media/a.jpg"], image_variants={"/media/a.jpg": {}})
+
+    orphaned = await replace_listing_images(mock_db, listing, ["/media/a.jpg"])
+
+    assert orphaned == []
+    mock_db.execute.assert_not_awaited()
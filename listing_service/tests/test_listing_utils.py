@@ -1,13 +1,21 @@
+import time
+import asyncio
+import hashlib
 import tempfile
-from datetime import datetime, timezone, timedelta
+from datetime import datetime, timezone, timedelta, date
 import pytest
-from unittest.mock import patch, AsyncMock
-from fastapi import HTTPException
+from unittest.mock import patch, AsyncMock, MagicMock
+from io import BytesIO
+from fastapi import HTTPException, UploadFile
 from pathlib import Path
+from PIL import Image
 from app.core.config import settings
 from app.models.listing import Currency, Listing as ListingModel
+from app.models.exchange_rate import ExchangeRate as ExchangeRateModel
+from app.services.exchange_rates import exchange_rate_provider
 from app.utils.create_price_uah import create_price_uah
-from app.utils.profanity_filter import profanity_filter
+from app.utils.profanity_filter import profanity_filter, ProfanityMatcher, normalize_text
+from app.utils.image_processing import process_image
 from app.utils.storage import Storage
 from app.utils.token_utils import get_optional_user_from_token, get_user_from_token
 from app.schemas.additional_request import (
@@ -23,6 +31,7 @@ from app.models.region import (
     Region as RegionModel
 )
 from app.models.car import Brand as BrandModel, CarModel
+from app.models.normalization import normalize_name
 from app.utils.additional_checker import additional_checker
 
 
@@ -38,6 +47,7 @@ async def test_get_user_from_token(mock_db, listing_user_factory):
     user = listing_user_factory('test_user_with_permission')
     valid_payload = {
         "sub": "123",
+        "jti": "abc",
         "email": "test6@example.com",
         "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
     }
@@ -51,6 +61,29 @@ async def test_get_user_from_token(mock_db, listing_user_factory):
         mock_db.scalar.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_user_from_token_uses_principal_cache(mock_db, listing_user_factory, principal_cache_io):
+    user = listing_user_factory('test_user_with_permission')
+    valid_payload = {
+        "sub": str(user.auth_user_id),
+        "jti": "abc",
+        "email": user.email,
+        "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
+    }
+
+    with patch("app.utils.token_utils.jwt.decode", return_value=valid_payload):
+        mock_db.scalar.return_value = user
+
+        first = await get_user_from_token("Bearer token", db=mock_db)
+        second = await get_user_from_token("Bearer token", db=mock_db)
+
+    assert first is user
+    assert second is not user
+    assert (second.id, second.email, second.role.name) == (user.id, user.email, user.role.name)
+    mock_db.scalar.assert_awaited_once()
+    principal_cache_io["set_shared"].assert_awaited_once()
+
+
 @pytest.mark.asyncio
 async def test_get_user_from_token_invalid_header():
     with pytest.raises(HTTPException) as exc_info:
@@ -59,10 +92,51 @@ async def test_get_user_from_token_invalid_header():
     assert exc_info.value.detail == "You need to login."
 
 
+@pytest.mark.asyncio
+async def test_get_user_from_token_expired_premium_without_write(mock_db, listing_user_factory):
+    user = listing_user_factory('test_base_premium_user')
+    user.premium_expires_at = date.today() - timedelta(days=1)
+    valid_payload = {
+        "sub": str(user.auth_user_id),
+        "jti": "abc",
+        "email": user.email,
+        "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
+    }
+
+    with patch("app.utils.token_utils.jwt.decode", return_value=valid_payload):
+        mock_db.scalar.return_value = user
+        result = await get_user_from_token("Bearer token", db=mock_db)
+
+    assert result.is_premium is True
+    assert result.has_active_premium is False
+    mock_db.commit.assert_not_awaited()
+    mock_db.refresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_user_from_token_revoked(mock_db):
+    payload = {
+        "sub": "123",
+        "jti": "abc",
+        "email": "test@example.com",
+        "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
+    }
+
+    with patch("app.utils.token_utils.jwt.decode", return_value=payload):
+        with patch("app.utils.token_utils.revocation_filter.is_revoked", AsyncMock(return_value=True)) as mock_revoked:
+            with pytest.raises(HTTPException) as exc_info:
+                await get_user_from_token("Bearer token", db=mock_db)
+
+    assert exc_info.value.status_code == 401
+    mock_revoked.assert_awaited_once_with("abc")
+    mock_db.scalar.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_get_user_from_token_expired(mock_db):
     expired_payload = {
         "sub": "123",
+        "jti": "abc",
         "email": "test@example.com",
         "exp": int((datetime.now(timezone.utc) - timedelta(hours=1)).timestamp())
     }
@@ -90,6 +164,7 @@ async def test_get_user_from_token_missing_fields(payload, mock_db):
 async def test_get_user_from_token_user_not_found(mock_db):
     payload = {
         "sub": "123",
+        "jti": "abc",
         "email": "test@example.com",
         "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
     }
@@ -105,6 +180,7 @@ async def test_get_user_from_token_user_not_found(mock_db):
 async def test_get_user_from_token_banned_user(listing_user_factory, mock_db):
     payload = {
         "sub": "123",
+        "jti": "abc",
         "email": "test5@example.com",
         "exp": int((datetime.now(timezone.utc) + timedelta(hours=1)).timestamp())
     }
@@ -122,21 +198,130 @@ async def test_get_user_from_token_banned_user(listing_user_factory, mock_db):
 async def test_save_images_creates_and_returns_urls(mock_upload_file_jpg):
     with tempfile.TemporaryDirectory() as tmp_media:
         storage = Storage(media_root=tmp_media)
-        listing_id = 42
 
-        result_urls = await storage.save_images(listing_id, [mock_upload_file_jpg])
+        result_urls = await storage.save_images([mock_upload_file_jpg])
+        await storage.shutdown()
 
         assert len(result_urls) == 1
-        saved_path = Path(tmp_media) / f"listings/{listing_id}"
-        files = list(saved_path.iterdir())
+        files = [path for path in Path(tmp_media).rglob("*") if path.is_file()]
 
         assert len(files) == 1
-        assert files[0].exists()
-        assert result_urls[0].endswith(f"/listings/{listing_id}/{files[0].name}")
+        assert files[0].stem == hashlib.sha256(mock_upload_file_jpg.file.getvalue()).hexdigest()
+        assert result_urls[0].endswith(f"/images/{files[0].stem[:2]}/{files[0].name}")
+
+
+@pytest.mark.asyncio
+async def test_save_images_deduplicates_identical_uploads(mock_upload_file_jpg):
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media)
+        duplicate = UploadFile(filename="copy.jpeg", file=BytesIO(mock_upload_file_jpg.file.getvalue()))
+
+        first_urls = await storage.save_images([mock_upload_file_jpg, duplicate])
+        with patch.object(storage, "_process_image", new_callable=AsyncMock) as mock_process:
+            await duplicate.seek(0)
+            second_urls = await storage.save_images([duplicate])
+        await storage.shutdown()
+
+        assert len(first_urls) == 1
+        assert second_urls == first_urls
+        mock_process.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_save_images_claims_before_reusing_files(mock_upload_file_jpg):
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media)
+        first_urls = await storage.save_images([mock_upload_file_jpg])
+        stored_file = next(path for path in Path(tmp_media).rglob("*") if path.is_file())
+
+        async def claim(urls):
+            # The media GC deleted the file while the upload waited for the row lock
+            assert urls == first_urls
+            stored_file.unlink()
+
+        await mock_upload_file_jpg.seek(0)
+        second_urls = await storage.save_images([mock_upload_file_jpg], claim=claim)
+        await storage.shutdown()
+
+        assert second_urls == first_urls
+        assert stored_file.exists()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage_kwargs, contents, status_code", [
+    ({"max_upload_bytes": 1024}, None, 413),
+    ({}, b"GIF89a not a supported image", 400),
+    ({"max_pixels": 1000}, None, 400),
+])
+async def test_save_images_rejects_bad_uploads(mock_upload_file_jpg, storage_kwargs, contents, status_code):
+    upload = mock_upload_file_jpg if contents is None else UploadFile(filename="bad.jpg", file=BytesIO(contents))
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media, chunk_size=512, **storage_kwargs)
+        with patch.object(storage, "_process_image", new_callable=AsyncMock) as mock_process:
+            with pytest.raises(HTTPException) as exc_info:
+                await storage.save_images([upload])
+
+        assert exc_info.value.status_code == status_code
+        mock_process.assert_not_awaited()
+        assert list(storage.upload_dir.iterdir()) == []
 
 
 @pytest.mark.unit
-def test_delete_images_removes_files(mock_upload_file_jpg):
+def test_process_image_downscales_large_jpeg():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_path = Path(tmp_dir) / "source.upload"
+        Image.new("RGB", (4000, 3000), color="blue").save(source_path, format="JPEG")
+        target_path = Path(tmp_dir) / "target.jpg"
+
+        process_image(str(source_path), str(target_path), "JPEG")
+
+        with Image.open(target_path) as image:
+            assert image.size == (960, 720)
+
+
+@pytest.mark.asyncio
+async def test_save_images_failure_stops_sibling_jobs_before_cleanup(mock_upload_file_jpg):
+    png_bytes = BytesIO()
+    Image.new("RGB", (10, 10), color="green").save(png_bytes, format="PNG")
+    png_bytes.seek(0)
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media)
+        cancelled_uploads = []
+
+        async def process(upload_path, key, image_format):
+            if image_format == "PNG":
+                raise HTTPException(status_code=503, detail="Image processing failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled_uploads.append(upload_path.exists())
+                raise
+
+        with patch.object(storage, "_process_image", side_effect=process):
+            with pytest.raises(HTTPException):
+                await storage.save_images([mock_upload_file_jpg, UploadFile(filename="b.png", file=png_bytes)])
+        await storage.shutdown()
+
+        assert cancelled_uploads == [True]
+        assert list(storage.upload_dir.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_save_images_timeout(mock_upload_file_jpg):
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media, timeout=0.01)
+
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "run_in_executor", side_effect=lambda *args: asyncio.sleep(1)):
+            with pytest.raises(HTTPException) as exc_info:
+                await storage.save_images([mock_upload_file_jpg])
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.detail == "Image processing timed out"
+
+
+@pytest.mark.asyncio
+async def test_delete_images_removes_files(mock_upload_file_jpg):
     with tempfile.TemporaryDirectory() as tmp_media:
         storage = Storage(media_root=tmp_media)
         listing_id = 42
@@ -151,17 +336,36 @@ def test_delete_images_removes_files(mock_upload_file_jpg):
         media_url = settings.media_url.rstrip("/")
         url = f"{media_url}/listings/{listing_id}/{file_name}"
 
-        storage.delete_images([url])
+        await storage.delete_images([url])
         assert not file_path.exists()
 
 
+@pytest.mark.asyncio
+async def test_build_derivatives_writes_variants(mock_upload_file_jpg):
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media)
+
+        urls = await storage.save_images([mock_upload_file_jpg])
+        image_variants = await storage.build_derivatives(urls)
+        await storage.shutdown()
+
+        variants = image_variants[urls[0]]
+        assert set(variants) == {"thumb", "card", "full"}
+        assert variants["full"]["src"] == urls[0]
+        assert variants["thumb"]["width"] <= 320
+        image_dir = next(Path(tmp_media).glob("images/*"))
+        assert len(list(image_dir.glob("*.webp"))) == 3
+
+        await storage.delete_images(urls)
+        assert list(image_dir.iterdir()) == []
+
+
 @pytest.mark.asyncio
 async def test_profanity_filter_clean_text(mock_db, mock_censor_words):
-    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis:
+    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis, \
+            patch("app.utils.profanity_filter.redis_client.get_version", AsyncMock(return_value=0)):
         mock_redis.return_value = set()
 
-        mock_censor_words.clear()
-
         description = "This is a nice car"
         title = "Best offer"
 
@@ -173,11 +377,11 @@ async def test_profanity_filter_clean_text(mock_db, mock_censor_words):
 
 @pytest.mark.asyncio
 async def test_profanity_filter_detects_in_description(mock_db, mock_censor_words):
-    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis:
+    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis, \
+            patch("app.utils.profanity_filter.redis_client.get_version", AsyncMock(return_value=0)):
         mock_redis.return_value = {"badword"}
 
-        mock_censor_words.clear()
-        mock_censor_words.extend({"stupid", "ugly"})
+        mock_censor_words.update({"stupid", "ugly"})
 
         description = "This is stupid and ugly"
         title = "Clean title"
@@ -190,12 +394,10 @@ async def test_profanity_filter_detects_in_description(mock_db, mock_censor_word
 
 @pytest.mark.asyncio
 async def test_profanity_filter_detects_in_title(mock_db, mock_censor_words):
-    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis:
+    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis, \
+            patch("app.utils.profanity_filter.redis_client.get_version", AsyncMock(return_value=0)):
         mock_redis.return_value = {"insult"}
 
-        mock_censor_words.clear()
-        mock_censor_words.extend({"insult"})
-
         description = "Nice car"
         title = "This title contains insult"
 
@@ -205,6 +407,118 @@ async def test_profanity_filter_detects_in_title(mock_db, mock_censor_words):
         mock_redis.assert_awaited_once_with(mock_db)
 
 
+@pytest.mark.asyncio
+async def test_profanity_matcher_rebuilt_only_on_version_change(mock_db, mock_censor_words):
+    with patch("app.utils.profanity_filter.redis_client.get_cache", new_callable=AsyncMock) as mock_redis, \
+            patch("app.utils.profanity_filter.redis_client.get_version", new_callable=AsyncMock) as mock_version:
+        mock_redis.return_value = {"Badword"}
+        mock_version.return_value = 1
+
+        assert await profanity_filter("badword here", "Title", mock_db) is False
+        assert await profanity_filter("Clean text", "Title", mock_db) is True
+        mock_redis.assert_awaited_once_with(mock_db)
+
+        mock_redis.return_value = {"newword"}
+        mock_version.return_value = 2
+
+        assert await profanity_filter("badword here", "Title", mock_db) is True
+        assert await profanity_filter("newword here", "Title", mock_db) is False
+        assert mock_redis.await_count == 2
+        assert mock_version.await_count == 4
+
+
+@pytest.mark.parametrize("text", [
+    "b@dword",
+    "b a d w o r d",
+    "b.a.d-w_o_r_d",
+    "BADWORD!!!",
+    "baaaaadword",
+    "bаdwоrd",  # Cyrillic а and о
+    "bădword",
+    "ｂａｄｗｏｒｄ",
+    "what a $hit car",
+    "sh!t!",
+    "сука",
+    "cyka",
+])
+def test_profanity_matcher_catches_obfuscation(mock_censor_words, text):
+    mock_censor_words.update({"shit", "ass"})
+    matcher = ProfanityMatcher({"badword", "сука"}, 0)
+
+    assert matcher.is_clean(text) is False
+
+
+@pytest.mark.parametrize("text", [
+    "Classic car, assistant owner, Scunthorpe plates",
+    "BMW X5 2019, 100000 km, $15000, as new!",
+    "Great car! Cool interior, 4x4",
+    "Sold by a therapist, morally sound heroine, crotchety but fondled with care, flanged exhaust",
+    "Audi A55, BMW X5, Hyundai i30, Nissan 370z",
+])
+def test_profanity_matcher_ignores_innocent_text(mock_censor_words, text):
+    mock_censor_words.update({"shit", "ass", "cunt", "rapist", "orally", "heroin", "crotch", "fondle", "flange"})
+    matcher = ProfanityMatcher({"badword"}, 0)
+
+    assert matcher.is_clean(text) is True
+
+
+def test_profanity_matcher_embeddable_words(mock_censor_words):
+    matcher = ProfanityMatcher({"badword", "otherword"}, 0, embeddable_words={"badword"})
+
+    assert matcher.is_clean("youbadwordthere") is False
+    assert matcher.is_clean("yourotherwordthere") is True
+    assert matcher.is_clean("your otherword there") is False
+
+
+@pytest.mark.parametrize("text, clean", [
+    ("mybullshitcar", False),
+    ("greatfuckingdeal", False),
+    ("Selling in Scunthorpe, classic car", True),
+])
+def test_profanity_matcher_default_embeddable_stems(mock_censor_words, text, clean):
+    mock_censor_words.update({"fuck", "bullshit", "cunt", "ass"})
+    matcher = ProfanityMatcher(set(), 0)
+
+    assert matcher.is_clean(text) is clean
+
+
+def test_profanity_matcher_is_linear_on_punctuation_runs(mock_censor_words):
+    matcher = ProfanityMatcher({"badword"}, 0)
+    started = time.perf_counter()
+
+    assert matcher.is_clean("a" + "!" * 200000 + "b") is True
+    assert matcher.is_clean("badword" + "!" * 200000) is False
+    assert time.perf_counter() - started < 1
+
+
+def test_profanity_matcher_caps_checked_text(mock_censor_words):
+    matcher = ProfanityMatcher({"badword"}, 0, max_text_length=100)
+
+    assert matcher.is_clean("x" * 50 + " badword") is False
+    assert matcher.is_clean("x" * 200 + " badword") is True
+
+
+def test_profanity_matcher_caches_verdicts(mock_censor_words):
+    matcher = ProfanityMatcher({"badword"}, 0, verdict_cache_size=2)
+
+    with patch.object(matcher, "find", wraps=matcher.find) as find:
+        assert matcher.is_clean("Nice car") is True
+        assert matcher.is_clean("NICE CAR") is True
+        assert matcher.is_clean("a badword") is False
+        assert matcher.is_clean("a badword") is False
+        assert find.call_count == 2
+
+        matcher.is_clean("Another car")
+        matcher.is_clean("nice car")
+        assert find.call_count == 4
+
+
+def test_normalize_text_keeps_numbers_and_collapses_stretched_words():
+    assert normalize_text("Caaar 2019") == " caar 2019 car "
+    assert normalize_text("s.h.!.t, 5000") == " shit 5000 "
+    assert normalize_text("Audi A55, X5") == " audi a55 x5 "
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("price,currency,expected", [
     (100, Currency.UAH, 100),
@@ -275,78 +589,78 @@ async def test_create_price_uah_no_exchange_rates(mock_db):
     assert result is None
 
 
+@pytest.mark.asyncio
+async def test_exchange_rate_provider_caches_until_invalidated(mock_db, mock_exchange_rate):
+    mock_db.scalar.return_value = mock_exchange_rate
+
+    first = await exchange_rate_provider.get(mock_db)
+    second = await exchange_rate_provider.get(mock_db)
+    assert first is second
+    assert mock_db.scalar.await_count == 1
+
+    exchange_rate_provider.invalidate()
+    await exchange_rate_provider.get(mock_db)
+    assert mock_db.scalar.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_create_price_uah_falls_back_to_latest_rates(mock_db):
+    mock_db.scalar.return_value = ExchangeRateModel(
+        created_at=date.today() - timedelta(days=3),
+        buy_usd=41.0,
+        sell_usd=40.0,
+        buy_eur=45.0,
+        sell_eur=44.0
+    )
+
+    result = await create_price_uah(mock_db, 100, Currency.USD)
+    assert result == 4000
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("request_obj, existing_in_db, should_raise", [
     # Country already exists
-    (AddCountry(type="add_country", name="Ukraine"), CountryModel(id=1, name="Ukraine"), True),
+    (AddCountry(type="add_country", name="Ukraine"), 1, True),
 
     # Country does not exist
     (AddCountry(type="add_country", name="Ukraine"), None, False),
 
     # Region already exists under country
-    (AddRegion(type="add_region", name="Lviv", country_name="Ukraine"),
-            CountryModel(
-                id=1,
-                name="Ukraine",
-                regions=[RegionModel(id=1, name="Lviv", country_id=1)]
-            ),
-            True
-    ),
+    (AddRegion(type="add_region", name="Lviv", country_name="Ukraine"), (1, 1), True),
 
     # Region does not exist
-    (AddRegion(type="add_region", name="Kyiv", country_name="Ukraine"),
-            CountryModel(
-                id=1,
-                name="Ukraine",
-                regions=[]
-            ),
-            False
-    ),
+    (AddRegion(type="add_region", name="Kyiv", country_name="Ukraine"), (1, None), False),
+
+    # Neither country nor region exist
+    (AddRegion(type="add_region", name="Kyiv", country_name="Ukraine"), None, False),
+
+    # City already exists under region
+    (AddCity(type="add_city", name="Lviv", region_name="Lvivska", country_name="Ukraine"), (1, 1, 1), True),
+
+    # City does not exist
+    (AddCity(type="add_city", name="Gorodok", region_name="Lvivska", country_name="Ukraine"), (1, 1, None), False),
 
     # Brand exists
-    (AddBrand(type="add_brand", name="BMW"), BrandModel(id=1, name="BMW"), True),
+    (AddBrand(type="add_brand", name="BMW"), 1, True),
 
     # Car model already exists
-    (AddCarModel(type="add_carmodel", name="M5", brand_name="BMW"),
-            BrandModel(
-                id=1,
-                name="BMW",
-                car_models=[CarModel(id=1, name="M5", brand_id=1)]
-            ),
-            True
-    ),
+    (AddCarModel(type="add_carmodel", name="M5", brand_name="BMW"), (1, 1), True),
 
     # Car model does not exist
-    (AddCarModel(type="add_carmodel", name="M4", brand_name="BMW"),
-            BrandModel(
-                id=1,
-                name="BMW",
-                car_models=[]
-            ),
-            False
-    ),
+    (AddCarModel(type="add_carmodel", name="M4", brand_name="BMW"), (1, None), False),
 ])
 @patch("app.utils.additional_checker.creating_event", new_callable=AsyncMock)
-@patch("app.utils.additional_checker.normalize_name", side_effect=lambda x: x.lower())
 async def test_additional_checker(
-        mock_db,
         mock_create_event,
+        mock_db,
         request_obj,
         existing_in_db,
         should_raise):
 
-    async def mock_scalar(query):
-        if isinstance(request_obj, AddCountry):
-            return existing_in_db if existing_in_db and isinstance(existing_in_db, CountryModel) else None
-        if isinstance(request_obj, AddRegion):
-            return existing_in_db if isinstance(existing_in_db, CountryModel) else None
-        if isinstance(request_obj, AddBrand):
-            return existing_in_db if isinstance(existing_in_db, BrandModel) else None
-        if isinstance(request_obj, AddCarModel):
-            return existing_in_db if isinstance(existing_in_db, BrandModel) else None
-        return None
-
-    mock_db.scalar.side_effect = mock_scalar
+    mock_db.scalar.return_value = existing_in_db
+    mock_result = MagicMock()
+    mock_result.first.return_value = existing_in_db
+    mock_db.execute.return_value = mock_result
 
     if should_raise:
         with pytest.raises(HTTPException):
@@ -355,3 +669,13 @@ async def test_additional_checker(
     else:
         await additional_checker(user_id=1, request=request_obj, db=mock_db)
         mock_create_event.assert_awaited_once()
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("  Ukraine ", "ukraine"),
+    ("Škoda", "skoda"),
+    ("Mercedes   Benz", "mercedes benz"),
+    ("STRASSE", "strasse"),
+])
+def test_normalize_name(name, expected):
+    assert normalize_name(name) == expected
@@ -0,0 +1,65 @@
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+from app.media import MediaFiles, MediaFileResponse, IMMUTABLE_CACHE_CONTROL
+
+
+@pytest.fixture
+def media_client(tmp_path):
+    image_dir = tmp_path / "images/ab"
+    image_dir.mkdir(parents=True)
+    (image_dir / "abcdef.jpg").write_bytes(b"0123456789")
+    (image_dir / "abcdef.webp").write_bytes(b"9876543210")
+    (tmp_path / ".uploads").mkdir()
+    (tmp_path / ".uploads/pending.upload").write_bytes(b"secret")
+    app = Starlette(routes=[Mount("/media", app=MediaFiles(directory=tmp_path))])
+    return TestClient(app)
+
+
+def test_media_response_is_immutable_with_strong_etag(media_client):
+    response = media_client.get("/media/images/ab/abcdef.jpg")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["etag"] == '"abcdef.jpg"'
+
+    not_modified = media_client.get("/media/images/ab/abcdef.jpg", headers={"If-None-Match": '"abcdef.jpg"'})
+    assert not_modified.status_code == 304
+
+
+def test_media_etag_differs_per_format(media_client):
+    webp = media_client.get("/media/images/ab/abcdef.webp", headers={"If-None-Match": '"abcdef.jpg"'})
+
+    assert webp.status_code == 200
+    assert webp.headers["etag"] == '"abcdef.webp"'
+    assert webp.content == b"9876543210"
+
+
+def test_media_range_request(media_client):
+    response = media_client.get("/media/images/ab/abcdef.jpg", headers={"Range": "bytes=2-5"})
+
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+
+def test_media_hides_scratch_directory(media_client):
+    assert media_client.get("/media/.uploads/pending.upload").status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_media_file_response_uses_zero_copy_extension(tmp_path):
+    file_path = tmp_path / "abcdef.jpg"
+    file_path.write_bytes(b"0123456789")
+    response = MediaFileResponse(file_path, stat_result=file_path.stat())
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "headers": [], "extensions": {"http.response.pathsend": {}}}
+    await response(scope, None, send)
+
+    assert messages[0]["type"] == "http.response.start"
+    assert messages[1] == {"type": "http.response.pathsend", "path": str(file_path)}
@@ -0,0 +1,97 @@
+import os
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.dialects import mysql
+from app.services.media_gc import (
+    original_stem,
+    drain_pending_deletions,
+    reconcile_reference_counts,
+    sweep_media_tree
+)
+from app.utils.storage_backends import LocalStorageBackend
+
+
+@pytest.mark.parametrize("key, expected", [
+    ("images/ab/abcdef.jpg", "abcdef"),
+    ("images/ab/abcdef_thumb.webp", "abcdef"),
+    ("images/ab/abcdef_card.png", "abcdef"),
+    ("listings/5/1b2c-uuid_full.webp", "1b2c-uuid"),
+])
+def test_original_stem(key, expected):
+    assert original_stem(key) == expected
+
+
+@pytest.mark.asyncio
+async def test_drain_pending_deletions_skips_rereferenced(mock_db):
+    scalars_result = MagicMock()
+    scalars_result.all.return_value = ["/media/images/ab/kept.jpg"]
+    mock_db.scalars.return_value = scalars_result
+    storage = MagicMock(delete_images=AsyncMock())
+
+    with patch("app.services.media_gc.redis.client.spop", new_callable=AsyncMock) as mock_spop, \
+            patch("app.services.media_gc.storage", storage):
+        mock_spop.side_effect = [["/media/images/ab/kept.jpg", "/media/images/cd/gone.jpg"], []]
+        deleted = await drain_pending_deletions(mock_db, batch_size=100)
+
+    assert deleted == 1
+    storage.delete_images.assert_awaited_once_with(["/media/images/cd/gone.jpg"])
+    assert "FOR UPDATE" in str(mock_db.scalars.await_args.args[0].compile(dialect=mysql.dialect()))
+    mock_db.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reference_counts_repairs_drift_per_batch(mock_db):
+    batch = MagicMock()
+    batch.all.return_value = [
+        SimpleNamespace(id=1, url="/media/a.jpg", ref_count=2),
+        SimpleNamespace(id=2, url="/media/b.jpg", ref_count=1),
+        SimpleNamespace(id=3, url="/media/c.jpg", ref_count=1),
+    ]
+    counts = MagicMock()
+    counts.all.return_value = [("/media/a.jpg", 2), ("/media/b.jpg", 3)]
+    empty = MagicMock()
+    empty.all.return_value = []
+    mock_db.execute.side_effect = [batch, counts, MagicMock(), MagicMock(), empty]
+
+    with patch("app.services.media_gc.enqueue_media_deletion", new_callable=AsyncMock) as mock_enqueue:
+        repaired = await reconcile_reference_counts(mock_db, batch_size=3)
+
+    assert repaired == 2
+    statements = [call.args[0].compile(dialect=mysql.dialect()) for call in mock_db.execute.await_args_list]
+    assert "FOR UPDATE" in str(statements[0])
+    assert mock_db.execute.await_args_list[1].args[1]["url_list"] == ["/media/a.jpg", "/media/b.jpg", "/media/c.jpg"]
+    assert statements[2].params["ref_count"] == 3
+    assert "DELETE FROM stored_images" in str(statements[3])
+    assert "stored_images.id > %s" in str(statements[4]) and statements[4].params["id_1"] == 3
+    mock_enqueue.assert_any_await(["/media/c.jpg"])
+
+
+@pytest.mark.asyncio
+async def test_sweep_media_tree_deletes_unreferenced_files(mock_db, tmp_path):
+    files = [
+        "images/ab/kept.jpg", "images/ab/kept_thumb.webp",
+        "images/ab/gone.jpg", "images/ab/gone_card.jpg",
+        "listings/5/legacy.jpg", "listings/5/stale.jpg", "listings/6/deleted.jpg",
+    ]
+    for name in files:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+        os.utime(path, (0, 0))
+    (tmp_path / "images/ab/fresh.jpg").write_bytes(b"x")
+
+    backend = LocalStorageBackend(tmp_path, media_url="/media")
+    scalars_result = MagicMock()
+    scalars_result.all.return_value = ["/media/images/ab/kept.jpg"]
+    mock_db.scalars.return_value = scalars_result
+    listings_result = MagicMock()
+    listings_result.all.return_value = [(5, ["/media/listings/5/legacy.jpg"])]
+    mock_db.execute.return_value = listings_result
+
+    with patch("app.services.media_gc.storage", MagicMock(backend=backend)):
+        deleted = await sweep_media_tree(mock_db, batch_size=2, grace_seconds=60)
+
+    remaining = sorted(path.relative_to(tmp_path).as_posix() for path in tmp_path.rglob("*") if path.is_file())
+    assert deleted == 4
+    assert remaining == ["images/ab/fresh.jpg", "images/ab/kept.jpg", "images/ab/kept_thumb.webp", "listings/5/legacy.jpg"]
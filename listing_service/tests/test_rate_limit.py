@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from shared.utils.rate_limit import fixed_window, sliding_window, token_bucket
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+WINDOW_SECONDS = 0.2
+
+
+@pytest_asyncio.fixture
+async def redis():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limiter", [fixed_window, sliding_window])
+async def test_window_limits_and_resets(redis, limiter):
+    results = [await limiter(redis, "key", 3, WINDOW_SECONDS) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert 0 < results[3].retry_after <= WINDOW_SECONDS
+
+    await asyncio.sleep(WINDOW_SECONDS + 0.05)
+    result = await limiter(redis, "key", 3, WINDOW_SECONDS)
+    assert result.allowed and result.remaining == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("limiter", [fixed_window, sliding_window])
+async def test_window_does_not_count_rejected_hits(redis, limiter):
+    assert (await limiter(redis, "key", 2, 60, cost=2)).allowed
+    assert not (await limiter(redis, "key", 2, 60)).allowed
+    assert not (await limiter(redis, "key", 2, 60)).allowed
+    assert (await limiter(redis, "other", 2, 60)).allowed
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_frees_slots_as_hits_age_out(redis):
+    assert (await sliding_window(redis, "key", 2, WINDOW_SECONDS)).allowed
+    await asyncio.sleep(WINDOW_SECONDS / 2)
+    assert (await sliding_window(redis, "key", 2, WINDOW_SECONDS)).allowed
+    assert not (await sliding_window(redis, "key", 2, WINDOW_SECONDS)).allowed
+
+    # Only the first hit has left the window, a fixed window would have reset both
+    await asyncio.sleep(WINDOW_SECONDS / 2 + 0.03)
+    assert (await sliding_window(redis, "key", 2, WINDOW_SECONDS)).allowed
+    assert not (await sliding_window(redis, "key", 2, WINDOW_SECONDS)).allowed
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_bursts_and_refills(redis):
+    results = [await token_bucket(redis, "key", 3, 10) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert 0 < results[3].retry_after <= 0.1
+
+    await asyncio.sleep(0.15)
+    assert (await token_bucket(redis, "key", 3, 10)).allowed
+    assert not (await token_bucket(redis, "key", 3, 10)).allowed
+
+    await asyncio.sleep(0.5)
+    result = await token_bucket(redis, "key", 3, 10, cost=3)
+    assert result.allowed and result.remaining == 0
+
+
+@pytest.mark.asyncio
+async def test_scripts_are_registered_once_per_client(redis):
+    with patch.object(redis, "register_script", wraps=redis.register_script) as mock_register:
+        for _ in range(3):
+            await fixed_window(redis, "key", 10, 60)
+            await token_bucket(redis, "bucket", 10, 1)
+
+    assert mock_register.call_count == 2
@@ -37,7 +37,11 @@ async def test_get_cache_fetches_from_db_when_cache_miss():
 
         mock_redis.exists.assert_awaited_once()
         mock_db.execute.assert_awaited_once()
-        mock_redis.sadd.assert_awaited_once_with("profanity_words", "badword1", "badword2")
+        staging_key = mock_redis.sadd.await_args.args[0]
+        assert staging_key.startswith("profanity_words:staging:")
+        mock_redis.sadd.assert_awaited_once_with(staging_key, "badword1", "badword2")
+        mock_redis.rename.assert_awaited_once_with(staging_key, "profanity_words")
+        mock_redis.delete.assert_not_awaited()
         assert result == {"badword1", "badword2"}
 
 
@@ -48,3 +52,35 @@ async def test_close():
         redis_client = RedisClient()
         await redis_client.close()
         mock_redis.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_version_defaults_to_zero():
+    mock_redis = AsyncMock()
+    mock_redis.get.return_value = None
+
+    with patch("app.core.redis.redis.from_url", return_value=mock_redis):
+        redis_client = RedisClient()
+
+        assert await redis_client.get_version() == 0
+        mock_redis.get.assert_awaited_once_with("profanity_words:version")
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove_words_run_scripts_in_chunks():
+    mock_redis = MagicMock()
+    add_script = AsyncMock()
+    remove_script = AsyncMock()
+    mock_redis.register_script.side_effect = [add_script, remove_script]
+
+    with patch("app.core.redis.redis.from_url", return_value=mock_redis):
+        redis_client = RedisClient()
+        words = [f"word{i}" for i in range(1500)]
+
+        await redis_client.add_words(words)
+        await redis_client.remove_words(["word1"])
+
+        assert add_script.await_count == 2
+        add_script.assert_any_await(keys=["profanity_words", "profanity_words:version"], args=words[:1000])
+        add_script.assert_any_await(keys=["profanity_words", "profanity_words:version"], args=words[1000:])
+        remove_script.assert_awaited_once_with(keys=["profanity_words", "profanity_words:version"], args=["word1"])
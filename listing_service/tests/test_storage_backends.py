@@ -0,0 +1,109 @@
+import os
+import socket
+import tempfile
+import pytest
+from pathlib import Path
+from app.utils.storage import Storage
+from app.utils.storage_backends import S3StorageBackend, LocalStorageBackend
+
+moto_server = pytest.importorskip("moto.server")
+
+BUCKET = "listing-media"
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    yield f"http://127.0.0.1:{port}"
+    server.stop()
+
+
+@pytest.fixture
+async def s3_backend(s3_endpoint):
+    with tempfile.TemporaryDirectory() as work_dir:
+        backend = S3StorageBackend(
+            bucket=BUCKET,
+            public_url="https://cdn.example.com/media",
+            work_dir=work_dir,
+            endpoint_url=s3_endpoint,
+            region_name="us-east-1",
+            access_key_id="testing",
+            secret_access_key="testing",
+            multipart_threshold=5 * 1024 * 1024,
+            part_size=5 * 1024 * 1024
+        )
+        client = await backend._get_client()
+        await client.create_bucket(Bucket=BUCKET)
+        yield backend
+        await backend.delete_prefix("")
+        client = await backend._get_client()
+        await client.delete_bucket(Bucket=BUCKET)
+        await backend.close()
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_save_exists_delete(s3_backend, tmp_path):
+    source = tmp_path / "a.jpg"
+    source.write_bytes(b"small object")
+
+    await s3_backend.save("images/aa/a.jpg", source, "image/jpeg")
+
+    assert not source.exists()
+    assert await s3_backend.exists("images/aa/a.jpg")
+    async with s3_backend.local_copy("images/aa/a.jpg") as local_path:
+        assert local_path.read_bytes() == b"small object"
+    await s3_backend.delete(["images/aa/a.jpg"])
+    assert not await s3_backend.exists("images/aa/a.jpg")
+
+
+@pytest.mark.asyncio
+async def test_s3_backend_multipart_upload(s3_backend, tmp_path):
+    contents = os.urandom(5 * 1024 * 1024 + 1024)
+    source = tmp_path / "big.png"
+    source.write_bytes(contents)
+
+    await s3_backend.save("images/bb/big.png", source, "image/png")
+
+    client = await s3_backend._get_client()
+    head = await client.head_object(Bucket=BUCKET, Key="images/bb/big.png")
+    assert head["ContentLength"] == len(contents)
+    assert head["ContentType"] == "image/png"
+    assert head["CacheControl"] == "public, max-age=31536000, immutable"
+    assert head["ETag"].strip('"').endswith("-2")
+
+
+@pytest.mark.asyncio
+async def test_storage_with_s3_backend(s3_backend, mock_upload_file_jpg):
+    with tempfile.TemporaryDirectory() as tmp_media:
+        storage = Storage(media_root=tmp_media, backend=s3_backend)
+
+        urls = await storage.save_images([mock_upload_file_jpg])
+        image_variants = await storage.build_derivatives(urls)
+        key = s3_backend.key_from_url(urls[0])
+
+        assert urls[0].startswith("https://cdn.example.com/media/images/")
+        assert await s3_backend.exists(key)
+        assert await s3_backend.exists(s3_backend.key_from_url(image_variants[urls[0]]["thumb"]["webp"]))
+
+        await storage.delete_images(urls)
+        client = await s3_backend._get_client()
+        listed = await client.list_objects_v2(Bucket=BUCKET)
+        assert listed.get("KeyCount", 0) == 0
+        await storage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_local_backend_delete_prefix(tmp_path):
+    backend = LocalStorageBackend(tmp_path, media_url="/media")
+    for name in ("a.jpg", "a_thumb.jpg", "a_thumb.webp", "b.jpg"):
+        (tmp_path / name).write_bytes(b"x")
+
+    await backend.delete_prefix("a_")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.jpg", "b.jpg"]
+    assert backend.url("a.jpg") == "/media/a.jpg"
+    assert backend.key_from_url("/media/a.jpg") == "a.jpg"
@@ -1,8 +1,12 @@
 RABBITMQ_QUEUE_USER_EVENTS = "user_events"
 RABBITMQ_QUEUE_EMAIL_EVENTS = "email_events"
 RABBITMQ_QUEUE_ADMIN_EVENTS = "notify_events"
+RABBITMQ_EXCHANGE_RATE_EVENTS = "exchange_rate_events"
+RABBITMQ_EXCHANGE_PRINCIPAL_EVENTS = "principal_events"
 
 EVENT_USER_CREATED = "user_created"
 EVENT_EMAIL_SEND = "email_send"
 EVENT_ADMIN_NOTIFY = "admin_notify"
 EVENT_ADMIN_CREATE = "admin_create"
+EVENT_EXCHANGE_RATES_UPDATED = "exchange_rates_updated"
+EVENT_PRINCIPALS_INVALIDATED = "principals_invalidated"
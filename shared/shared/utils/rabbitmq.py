@@ -27,3 +27,14 @@ async def publish_event(queue_name: str, event_type: str, data: dict):
         )
         await channel.default_exchange.publish(message, routing_key=queue_name)
         logger.info(f"Published event {event_type} to queue {queue_name}")
+
+
+async def publish_broadcast(exchange_name: str, event_type: str, data: dict):
+    """Publish to a fanout exchange so every subscribed process gets its own copy"""
+    connection = await get_rabbitmq_connection()
+    async with connection:
+        channel = await connection.channel()
+        exchange = await channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT, durable=True)
+        message = aio_pika.Message(body=json.dumps({"type": event_type, "data": data}).encode())
+        await exchange.publish(message, routing_key="")
+        logger.info(f"Broadcast event {event_type} to exchange {exchange_name}")
@@ -0,0 +1,110 @@
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+
+# Every limiter is one script, so a check is a single atomic round trip.
+# Scripts read the clock with TIME, so app servers with skewed clocks still agree.
+# register_script runs them with EVALSHA and loads them only into a server that lacks them,
+# each client registers a script once instead of hashing its source on every check.
+
+FIXED_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current + cost > limit then
+    return {0, limit - current, redis.call('PTTL', KEYS[1])}
+end
+current = redis.call('INCRBY', KEYS[1], cost)
+if current == cost then
+    redis.call('PEXPIRE', KEYS[1], window_ms)
+end
+return {1, limit - current, 0}
+"""
+
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local window_us = tonumber(ARGV[2]) * 1000
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window_us)
+local current = redis.call('ZCARD', KEYS[1])
+if current + cost > limit then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    local retry_ms = 0
+    if oldest[2] then
+        retry_ms = math.ceil((tonumber(oldest[2]) + window_us - now) / 1000)
+    end
+    return {0, limit - current, retry_ms}
+end
+for i = 1, cost do
+    redis.call('ZADD', KEYS[1], now, ARGV[4] .. ':' .. i)
+end
+redis.call('PEXPIRE', KEYS[1], math.ceil(window_us / 1000))
+return {1, limit - current - cost, 0}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+local retry_ms = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_ms = math.ceil((cost - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, math.floor(tokens), retry_ms}
+"""
+
+
+@lru_cache(maxsize=64)
+def _script(client: Redis, source: str) -> AsyncScript:
+    """Registered script for a client, bounded so clients that were closed are eventually released"""
+    return client.register_script(source)
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until the next hit can be allowed, 0 when allowed
+
+    @classmethod
+    def from_reply(cls, reply: list) -> "RateLimitResult":
+        allowed, remaining, retry_ms = reply
+        return cls(allowed=bool(allowed), remaining=max(0, int(remaining)), retry_after=max(0, int(retry_ms)) / 1000)
+
+
+async def fixed_window(client: Redis, key: str, limit: int, window_seconds: float, cost: int = 1) -> RateLimitResult:
+    """At most limit hits per window that starts with the first hit, rejected hits are not counted"""
+    script = _script(client, FIXED_WINDOW_SCRIPT)
+    reply = await script(keys=[key], args=[limit, int(window_seconds * 1000), cost])
+    return RateLimitResult.from_reply(reply)
+
+
+async def sliding_window(client: Redis, key: str, limit: int, window_seconds: float, cost: int = 1) -> RateLimitResult:
+    """At most limit hits in any window_seconds long interval, exact log kept in a sorted set"""
+    script = _script(client, SLIDING_WINDOW_SCRIPT)
+    reply = await script(keys=[key], args=[limit, int(window_seconds * 1000), cost, uuid.uuid4().hex])
+    return RateLimitResult.from_reply(reply)
+
+
+async def token_bucket(client: Redis, key: str, capacity: int, refill_per_second: float, cost: int = 1) -> RateLimitResult:
+    """Bursts up to capacity, refilled continuously at refill_per_second"""
+    script = _script(client, TOKEN_BUCKET_SCRIPT)
+    reply = await script(keys=[key], args=[capacity, refill_per_second, cost])
+    return RateLimitResult.from_reply(reply)
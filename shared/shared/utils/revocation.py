@@ -0,0 +1,123 @@
+import asyncio
+import base64
+import hashlib
+import math
+import time
+from redis.asyncio import Redis
+
+# Revoked access-token jtis live in a sorted set scored by token expiry, so expired entries
+# can be trimmed. A Bloom filter of the set is rebuilt periodically and stored next to it;
+# every service keeps a copy in process and only asks Redis when the filter says "maybe".
+
+REVOKED_KEY = "revoked_jti"
+FILTER_KEY = "revoked_jti:filter"
+FILTER_VERSION_KEY = "revoked_jti:filter:version"
+BUILD_LOCK_KEY = "revoked_jti:filter:lock"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter with double hashing over one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def dumps(self) -> str:
+        """Text form, the services' Redis clients decode responses"""
+        return f"{self.size}:{self.hashes}:{base64.b64encode(self.bits).decode()}"
+
+    @classmethod
+    def loads(cls, data: str) -> "BloomFilter":
+        size, hashes, bits = data.split(":", 2)
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.bits = int(size), int(hashes), bytearray(base64.b64decode(bits))
+        return bloom
+
+
+async def rebuild_filter(client: Redis, error_rate: float = 0.001) -> int:
+    """Trim expired entries and publish a new filter, return the number of revoked jtis"""
+    await client.zremrangebyscore(REVOKED_KEY, "-inf", time.time())
+    jtis = await client.zrange(REVOKED_KEY, 0, -1)
+    bloom = BloomFilter(capacity=len(jtis) * 2 or 1024, error_rate=error_rate)
+    for jti in jtis:
+        bloom.add(jti)
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(FILTER_KEY, bloom.dumps())
+        pipe.incr(FILTER_VERSION_KEY)
+        await pipe.execute()
+    return len(jtis)
+
+
+async def run_filter_builder(client: Redis, rebuild_seconds: float, logger) -> None:
+    """Rebuild the filter every rebuild_seconds, one replica per period thanks to the lock"""
+    while True:
+        try:
+            if await client.set(BUILD_LOCK_KEY, "1", nx=True, ex=max(1, int(rebuild_seconds))):
+                revoked = await rebuild_filter(client)
+                logger.info(f"Revocation filter rebuilt with {revoked} jtis")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error rebuilding revocation filter: {str(e)}")
+        await asyncio.sleep(rebuild_seconds)
+
+
+class RevocationFilter:
+    """In-process copy of the published filter, reloaded when its version moves"""
+
+    def __init__(self, client: Redis):
+        self.client = client
+        self._bloom: BloomFilter | None = None
+        self._version: str | None = None
+        self._recent: dict[str, float] = {}
+
+    async def refresh(self) -> None:
+        version = await self.client.get(FILTER_VERSION_KEY)
+        if version is None or version == self._version:
+            return
+        data = await self.client.get(FILTER_KEY)
+        if data is not None:
+            self._bloom = BloomFilter.loads(data)
+            self._version = version
+        now = time.time()
+        self._recent = {jti: expires_at for jti, expires_at in self._recent.items() if expires_at > now}
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke until the token expires on its own (unix timestamp), at once in this process
+        and for everyone else after the next rebuild"""
+        await self.client.zadd(REVOKED_KEY, {jti: expires_at})
+        self._recent[jti] = expires_at
+
+    async def is_revoked(self, jti: str) -> bool:
+        if jti in self._recent:
+            return True
+        if self._bloom is None or jti not in self._bloom:
+            return False
+        # "Maybe" from the filter, false positives are settled by the exact set
+        return await self.client.zscore(REVOKED_KEY, jti) is not None
+
+    async def run(self, refresh_seconds: float, logger) -> None:
+        """Poll for new filter versions, started in the service lifespan"""
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error refreshing revocation filter: {str(e)}")
+            await asyncio.sleep(refresh_seconds)
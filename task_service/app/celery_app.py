@@ -27,4 +27,12 @@ app.conf.beat_schedule = {
         "task": "app.tasks.fetch_exchange_rates",
         "schedule": crontab(minute=0, hour=0),
     },
+    "clean-expired-premium-status": {
+        "task": "app.tasks.clean_expired_premium_status",
+        "schedule": crontab(minute=5, hour=0),
+    },
+    "reconcile-listing-counters": {
+        "task": "app.tasks.reconcile_listing_counters",
+        "schedule": crontab(minute=30, hour=3),
+    },
 }
@@ -1,10 +1,13 @@
 import asyncio
 import os
+import time
 import httpx
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, func
 from celery import shared_task
 from shared.utils.logging import setup_logging
+from shared.utils.rabbitmq import publish_broadcast
+from shared.utils import constants as rb_const
 from aiosmtplib import SMTP
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -14,7 +17,7 @@ from app.celery_app import app as celery_app
 from auth_service.app.models.auth import ActiveToken, BlacklistedToken
 from auth_service.app.models.auth import User as UserAuthModel
 from listing_service.app import models
-from listing_service.app.models.listing import Listing as ListingModel
+from listing_service.app.models.listing import Listing as ListingModel, Currency
 from listing_service.app.models.user import User as UserListingModel
 from listing_service.app.models.exchange_rate import ExchangeRate
 from datetime import datetime, timezone, date
@@ -105,8 +108,10 @@ def clean_expired_tokens():
 
                 for token in expired_tokens:
                     if token.token_type == "email_verify":
+                        # Only accounts that never verified, a lost revoke must not remove an active one
                         user = await session.get(UserAuthModel, token.user_id)
-                        await session.delete(user)
+                        if user is not None and not user.is_active:
+                            await session.delete(user)
 
                     blacklisted = BlacklistedToken(
                         token=token.token,
@@ -169,43 +174,121 @@ async def process_exchange_rates(data):
                 await session.commit()
             except Exception as e:
                 logger.error(f"Error adding exchange data: {str(e)}")
+                return False
             finally:
                 await engine.dispose()
+        await publish_broadcast(
+            rb_const.RABBITMQ_EXCHANGE_RATE_EVENTS,
+            rb_const.EVENT_EXCHANGE_RATES_UPDATED,
+            {"date": date.today().isoformat()}
+        )
+        return True
     else:
         logger.error("Missing USD or EUR rate in exchange data")
+        return False
 
 
 @shared_task
 def fetch_exchange_rates():
     try:
         data = asyncio.run(fetch_exchange_rates_async())
-        if data:
-            asyncio.run(process_exchange_rates(data))
+        if data and asyncio.run(process_exchange_rates(data)):
             logger.info("Successfully fetched and processed exchange rates.")
+            reprice_listings.delay()
     except Exception as e:
         logger.error(f"Celery task failed: {str(e)}")
 
 
+REPRICE_CHUNK_SIZE = 5000
+
+
+@shared_task
+def reprice_listings():
+    """Recompute price_uah of USD and EUR listings from the latest exchange rates."""
+    async def run_reprice():
+        engine = create_async_engine(settings.listing_db_url, echo=False)
+        async with AsyncSession(engine) as session:
+            try:
+                rates = await session.scalar(
+                    select(ExchangeRate).order_by(ExchangeRate.created_at.desc(), ExchangeRate.id.desc()).limit(1)
+                )
+                if not rates:
+                    logger.error("No exchange rates to reprice listings with")
+                    return
+                currency_rates = {Currency.USD: rates.sell_usd, Currency.EUR: rates.sell_eur}
+                max_id = await session.scalar(select(func.max(ListingModel.id))) or 0
+
+                started = time.perf_counter()
+                repriced = 0
+                # Primary key ranges keep every chunk short, so row locks are released quickly
+                for start in range(0, max_id, REPRICE_CHUNK_SIZE):
+                    for currency, rate in currency_rates.items():
+                        result = await session.execute(
+                            update(ListingModel)
+                            .where(
+                                ListingModel.id > start,
+                                ListingModel.id <= start + REPRICE_CHUNK_SIZE,
+                                ListingModel.original_currency == currency
+                            )
+                            .values(price_uah=ListingModel.original_price * rate)
+                            .execution_options(synchronize_session=False)
+                        )
+                        repriced += result.rowcount
+                    await session.commit()
+
+                elapsed = time.perf_counter() - started
+                logger.info(
+                    f"Repriced {repriced} listings in {elapsed:.2f}s "
+                    f"({repriced / elapsed if elapsed else 0:.0f} rows/s)"
+                )
+            except Exception as e:
+                logger.error(f"Error repricing listings: {str(e)}")
+                await session.rollback()
+            finally:
+                await engine.dispose()
+
+    asyncio.run(run_reprice())
+
+
 # PREMIUM_CHECKER
+PREMIUM_CHUNK_SIZE = 1000
+
+
 @shared_task
 def clean_expired_premium_status():
-    """Checking premium status and remove it if expired."""
+    """Clear premium flags that expired, in short transactions walking ix_users_premium_expires_at."""
     async def run_checker():
         engine = create_async_engine(settings.listing_db_url, echo=False)
         async with AsyncSession(engine) as session:
             try:
-                now = date.today()
-                await session.execute(
-                    update(UserListingModel)
-                    .where(UserListingModel.premium_expires_at < now)
-                    .values(
-                        is_premium=False,
-                        premium_expires_at=None
+                today = date.today()
+                cleared = 0
+                while True:
+                    expired = (UserListingModel.is_premium, UserListingModel.premium_expires_at < today)
+                    # Cleared rows get a NULL expiry and drop out of the range, so every pass starts from the front
+                    user_ids = list((await session.scalars(
+                        select(UserListingModel.id)
+                        .where(*expired)
+                        .order_by(UserListingModel.premium_expires_at)
+                        .limit(PREMIUM_CHUNK_SIZE)
+                    )).all())
+                    if not user_ids:
+                        break
+
+                    # Expiry is checked again, a renewal committed after the select keeps its premium
+                    result = await session.execute(
+                        update(UserListingModel)
+                        .where(UserListingModel.id.in_(user_ids), *expired)
+                        .values(
+                            is_premium=False,
+                            premium_expires_at=None
+                        )
+                        .execution_options(synchronize_session=False)
                     )
-                )
-                await session.commit()
+                    await session.commit()
+                    cleared += result.rowcount
 
-                logger.info(f'All expired premium statuses are cleared')
+                logger.info(f'Cleared {cleared} expired premium statuses')
             except Exception as e:
                 logger.error(f"Error cleaning premium status: {str(e)}")
                 await session.rollback()
@@ -215,6 +298,66 @@ def clean_expired_premium_status():
     asyncio.run(run_checker())
 
 
+# LISTING_QUOTA
+LISTING_COUNTERS_CHUNK_SIZE = 1000
+
+
+@shared_task
+def reconcile_listing_counters():
+    """Recount users.listings_count from listings so counter drift never outlives a day."""
+    async def run_reconcile():
+        engine = create_async_engine(settings.listing_db_url, echo=False)
+        async with AsyncSession(engine) as session:
+            try:
+                listings_count = (
+                    select(func.count(ListingModel.id))
+                    .where(ListingModel.user_id == UserListingModel.id)
+                    .scalar_subquery()
+                )
+                last_id = 0
+                reconciled = 0
+                while True:
+                    user_ids = list((await session.scalars(
+                        select(UserListingModel.id)
+                        .where(UserListingModel.id > last_id)
+                        .order_by(UserListingModel.id)
+                        .limit(LISTING_COUNTERS_CHUNK_SIZE)
+                    )).all())
+                    if not user_ids:
+                        break
+
+                    await session.execute(
+                        update(UserListingModel)
+                        .where(UserListingModel.id.in_(user_ids))
+                        .values(listings_count=listings_count)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+                    reconciled += len(user_ids)
+                    last_id = user_ids[-1]
+
+                logger.info(f"Reconciled listing counters for {reconciled} users")
+            except Exception as e:
+                logger.error(f"Error reconciling listing counters: {str(e)}")
+                await session.rollback()
+            finally:
+                await engine.dispose()
+
+    asyncio.run(run_reconcile())
+
+
+async def invalidate_principals(auth_user_ids: list[int]) -> None:
+    """Make listing service replicas drop their cached copy of the users"""
+    try:
+        await publish_broadcast(
+            rb_const.RABBITMQ_EXCHANGE_PRINCIPAL_EVENTS,
+            rb_const.EVENT_PRINCIPALS_INVALIDATED,
+            {"auth_user_ids": auth_user_ids}
+        )
+    except Exception as e:
+        logger.error(f"Error broadcasting principal invalidation: {str(e)}")
+
+
 # Bot Manage Listings
 @shared_task
 def manage_listing_from_bot(listing_id: int, task: str):
@@ -228,14 +371,23 @@ def manage_listing_from_bot(listing_id: int, task: str):
                 user_id = listing.user_id
                 if task == "ban":
                     await session.delete(listing)
+                    await session.execute(
+                        update(UserListingModel)
+                        .where(UserListingModel.id == user_id, UserListingModel.listings_count > 0)
+                        .values(listings_count=UserListingModel.listings_count - 1)
+                        .execution_options(synchronize_session=False)
+                    )
                     user = await session.get(UserListingModel, user_id)
                     if not user:
                         logger.error(f"User {user_id} not found")
                     user.is_banned = True
+                    banned_auth_user_id = user.auth_user_id
                 if task == "allow_publication":
                     listing.is_active = True
 
                 await session.commit()
+                if task == "ban":
+                    await invalidate_principals([banned_auth_user_id])
             except Exception as e:
                 logger.error(f"Error with managing listings: {str(e)}")
             finally:
@@ -265,6 +417,7 @@ def manage_additional_info_from_bot(
                         logger.error(f"User {who_ask_for} not found")
                         return
                     user.is_banned = True
+                    banned_auth_user_id = user.auth_user_id
                 elif task == 'create':
                     if title == 'add_country':
                         await get_or_create_country(session, country_name_or_id)
@@ -282,6 +435,8 @@ def manage_additional_info_from_bot(
                         await create_carmodel(session, car_model_name, brand.id)
 
                 await session.commit()
+                if task == 'ban_user':
+                    await invalidate_principals([banned_auth_user_id])
 
             except Exception as e:
                 logger.error(f"Error with managing listings: {str(e)}")
@@ -1,3 +1,4 @@
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from listing_service.app.models.region import (
     Country as CountryModel,
@@ -8,6 +9,16 @@ from listing_service.app.models.car import (
     Brand as BrandModel,
     CarModel
 )
+from listing_service.app.models.normalization import normalize_name
+
+
+async def _find_by_name(session: AsyncSession, model, name: str, **scope):
+    """Existing catalog row whose name only differs in case, spacing or accents"""
+    return await session.scalar(
+        select(model)
+        .where(model.name_normalized == normalize_name(name))
+        .where(*(getattr(model, field) == value for field, value in scope.items()))
+    )
 
 
 async def get_or_create_country(session: AsyncSession, name_or_id: str | int):
@@ -15,6 +26,9 @@ async def get_or_create_country(session: AsyncSession, name_or_id: str | int):
         country = await session.get(CountryModel, name_or_id)
         return country
     else:
+        country = await _find_by_name(session, CountryModel, name_or_id)
+        if country:
+            return country
         country = CountryModel(name=name_or_id)
         session.add(country)
         await session.flush()
@@ -26,6 +40,9 @@ async def get_or_create_region(session: AsyncSession, name_or_id: str | int, cou
         region = await session.get(RegionModel, name_or_id)
         return region
     else:
+        region = await _find_by_name(session, RegionModel, name_or_id, country_id=country_id)
+        if region:
+            return region
         region = RegionModel(name=name_or_id, country_id=country_id)
         session.add(region)
         await session.flush()
@@ -33,6 +50,8 @@ async def get_or_create_region(session: AsyncSession, name_or_id: str | int, cou
 
 
 async def create_city(session: AsyncSession, name: str, region_id: int):
+    if await _find_by_name(session, CityModel, name, region_id=region_id):
+        return
     city = CityModel(name=name, region_id=region_id)
     session.add(city)
 
@@ -42,6 +61,9 @@ async def get_or_create_brand(session: AsyncSession, name_or_id: str | int):
         brand = await session.get(BrandModel, name_or_id)
         return brand
     else:
+        brand = await _find_by_name(session, BrandModel, name_or_id)
+        if brand:
+            return brand
         brand = BrandModel(name=name_or_id)
         session.add(brand)
         await session.flush()
@@ -49,5 +71,7 @@ async def get_or_create_brand(session: AsyncSession, name_or_id: str | int):
 
 
 async def create_carmodel(session: AsyncSession, name: str, brand_id: int):
+    if await _find_by_name(session, CarModel, name, brand_id=brand_id):
+        return
     city = CarModel(name=name, brand_id=brand_id)
     session.add(city)
@@ -10,3 +10,4 @@ def test_celery_configuration():
     assert "clean-expired-tokens" in app.conf.beat_schedule
     assert app.conf.beat_schedule["clean-expired-tokens"]["task"] == "app.tasks.clean_expired_tokens"
     assert app.conf.beat_schedule["clean-expired-tokens"]["schedule"] == crontab(minute="*/10")
+    assert app.conf.beat_schedule["clean-expired-premium-status"]["task"] == "app.tasks.clean_expired_premium_status"
@@ -14,6 +14,7 @@ from listing_service.app.models import (
     City as CityModel
 )
 from listing_service.app.models import Brand as BrandModel, CarModel
+from listing_service.app.models.normalization import normalize_name
 from shared.utils import constants as rb_const
 
 
@@ -31,6 +32,7 @@ async def test_get_or_create_country(mock_db, test_name_or_id, test_data):
         assert result.name == "USA"
         assert result.id == 2
     else:
+        mock_db.scalar.return_value = None
         mock_db.add = MagicMock()
 
         async def flush_side_effect():
@@ -57,6 +59,7 @@ async def test_get_or_create_region(mock_db, test_name_or_id, test_data):
         assert result.name == "Kyiv"
         assert result.id == 2
     else:
+        mock_db.scalar.return_value = None
         mock_db.add = MagicMock()
 
         async def flush_side_effect():
@@ -72,6 +75,7 @@ async def test_get_or_create_region(mock_db, test_name_or_id, test_data):
 @pytest.mark.asyncio
 async def test_create_city(mock_db):
     mock_city = CityModel(id=1, name="Kyiv", region_id=1)
+    mock_db.scalar.return_value = None
     mock_db.add = MagicMock()
 
     result = await create_city(mock_db, mock_city.name, mock_city.region_id)
@@ -94,6 +98,7 @@ async def test_get_or_create_brand(mock_db, test_name_or_id, test_data):
         assert result.name == "Lamborghini"
         assert result.id == 2
     else:
+        mock_db.scalar.return_value = None
         mock_db.add = MagicMock()
 
         async def flush_side_effect():
@@ -109,6 +114,7 @@ async def test_get_or_create_brand(mock_db, test_name_or_id, test_data):
 @pytest.mark.asyncio
 async def test_create_carmodel(mock_db):
     mock_car = CarModel(id=1, name="Kyiv", brand_id=1)
+    mock_db.scalar.return_value = None
     mock_db.add = MagicMock()
 
     result = await create_carmodel(mock_db, mock_car.name, mock_car.brand_id)
@@ -117,6 +123,38 @@ async def test_create_carmodel(mock_db):
     assert mock_db.add.call_count == 1
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize('create, args, existing', [
+    (get_or_create_country, (" ukraine ",), CountryModel(id=1, name="Ukraine")),
+    (get_or_create_region, ("LVIV", 1), RegionModel(id=1, name="Lviv", country_id=1)),
+    (get_or_create_brand, ("bmw",), BrandModel(id=1, name="BMW")),
+])
+async def test_get_or_create_reuses_normalized_name(mock_db, create, args, existing):
+    mock_db.scalar.return_value = existing
+    mock_db.add = MagicMock()
+
+    result = await create(mock_db, *args)
+
+    assert result is existing
+    mock_db.add.assert_not_called()
+    stmt = mock_db.scalar.await_args.args[0]
+    assert normalize_name(args[0]) in stmt.compile().params.values()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('create, existing', [
+    (create_city, CityModel(id=1, name="Kyiv", region_id=1)),
+    (create_carmodel, CarModel(id=1, name="X5", brand_id=1)),
+])
+async def test_create_skips_existing_normalized_name(mock_db, create, existing):
+    mock_db.scalar.return_value = existing
+    mock_db.add = MagicMock()
+
+    await create(mock_db, existing.name.upper(), 1)
+
+    mock_db.add.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_handle_event_missing_keys():
     data = {